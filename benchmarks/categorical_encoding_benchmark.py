@@ -0,0 +1,181 @@
+"""Fit time, artifact size and scoring latency per categorical encoding.
+
+Fits the training pipeline of ``LoanPredictionModel`` on a synthetic frame
+in the cleaned schema, where ``emp_title`` follows a Zipf distribution
+over tens of thousands of titles, with ``emp_title`` one-hot encoded in
+full and frequency-capped at each ``--min-frequency``:
+
+    python benchmarks/categorical_encoding_benchmark.py --rows 200000 \\
+        --min-frequency 5 20 100 --output encoding.json
+
+Artifact sizes are the pickled pipeline, the exported scorer JSON and the
+memory-mapped scorer directory. Latencies are CPU time per request of the
+sklearn pipeline on a one-row frame, ``FeatureAssembler`` on a record and
+the vectorised scorer on batches of ``--batch-size`` rows.
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import argparse
+import tempfile
+from typing import Any, Dict, List, Tuple, Optional
+
+import numpy as np
+import pandas as pd
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path[:0] = [
+    os.path.join(REPO_DIR, 'fastapi_backend'),
+    os.path.join(REPO_DIR, 'src', 'pipelines'),
+]
+
+# pylint: disable=wrong-import-position
+from sklearn.base import clone
+from sklearn.metrics import roc_auc_score
+from sklearn.pipeline import make_pipeline
+from sklearn.linear_model import LogisticRegression
+
+from train import LoanPredictionModel, train_val_test_indices
+from scorer import LinearScorer, FeatureAssembler, MappedLinearScorer
+from schema import TARGET, CLEAN_DTYPES
+from export_scorer import export_linear_scorer
+
+N_TITLES = 100000
+
+
+def make_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic cleaned frame whose label depends on the common job titles."""
+    rng = np.random.default_rng(seed)
+    columns: Dict[str, Any] = {}
+    for name, dtype in CLEAN_DTYPES.items():
+        if name == 'emp_title':
+            ranks = np.minimum(rng.zipf(1.1, n_rows), N_TITLES) - 1
+            columns[name] = pd.Categorical(
+                np.char.add('title-', ranks.astype(str)).astype(object)
+            )
+        elif dtype == 'category':
+            columns[name] = pd.Categorical(
+                rng.choice([f'{name}-{i}' for i in range(8)], n_rows)
+            )
+        elif dtype.startswith('float'):
+            columns[name] = rng.gamma(2.0, 10.0, n_rows).astype(dtype)
+        elif name != TARGET:
+            columns[name] = rng.poisson(5, n_rows).astype(dtype)
+    df = pd.DataFrame(columns)
+    title_effects = np.zeros(N_TITLES)
+    title_effects[:200] = rng.normal(0, 0.7, 200)
+    title_rank = df['emp_title'].str.slice(6).astype(int).to_numpy()
+    logit = -3 + 0.05 * df['interest_rate'] + title_effects[title_rank]
+    df[TARGET] = (rng.random(n_rows) < 1 / (1 + np.exp(-logit))).astype('int8')
+    return df
+
+
+def cpu_us(fn, n_calls: int) -> float:
+    for _ in range(min(n_calls, 20)):
+        fn()
+    started = time.process_time()
+    for _ in range(n_calls):
+        fn()
+    return (time.process_time() - started) / n_calls * 1e6
+
+
+def directory_bytes(directory: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+    )
+
+
+def scoring_latency(
+    pipeline: Any, X_test: pd.DataFrame, args
+) -> Tuple[Dict[str, float], int]:
+    """CPU time per request of each scoring path, and the mapped scorer size."""
+    scorer = LinearScorer(export_linear_scorer(pipeline, threshold=0.5))
+    with tempfile.TemporaryDirectory() as mapped_dir:
+        MappedLinearScorer.write(scorer, mapped_dir)
+        mapped_bytes = directory_bytes(mapped_dir)
+        mapped = MappedLinearScorer(mapped_dir)
+
+        row = X_test.head(1)
+        record = json.loads(row.to_json(orient='records'))[0]
+        batch = X_test.head(args.batch_size)
+        assembler = FeatureAssembler(mapped)
+        latency = {
+            'sklearn_row_us': cpu_us(
+                lambda: pipeline.predict_proba(row), args.requests // 10
+            ),
+            'assembler_record_us': cpu_us(
+                lambda: assembler.predict_proba(record), args.requests
+            ),
+            'scorer_batch_us_per_row': cpu_us(
+                lambda: mapped.predict_proba(batch), args.requests // 100
+            )
+            / len(batch),
+        }
+    return latency, mapped_bytes
+
+
+def run_strategy(
+    df: pd.DataFrame,
+    splits: List[np.ndarray],
+    min_frequency: Optional[int],
+    args,
+) -> Dict[str, Any]:
+    loan_model = LoanPredictionModel(
+        df,
+        frequency_encoded_features=['emp_title'] if min_frequency else [],
+        min_category_frequency=min_frequency or 1,
+    )
+    (X_train, y_train), _, (X_test, y_test) = (
+        loan_model.take(indices) for indices in splits
+    )
+
+    started = time.perf_counter()
+    pipeline = make_pipeline(
+        clone(loan_model.preprocessor), LogisticRegression(**loan_model.params)
+    ).fit(X_train, y_train)
+    fit_s = time.perf_counter() - started
+    latency, mapped_bytes = scoring_latency(pipeline, X_test, args)
+
+    encoder_width = pipeline[0].transform(X_test.head(1)).shape[1]
+    return {
+        'encoding': f'frequency:{min_frequency}' if min_frequency else 'onehot',
+        'design_columns': int(encoder_width),
+        'fit_s': fit_s,
+        'test_auc': float(roc_auc_score(y_test, pipeline.predict_proba(X_test)[:, 1])),
+        'pipeline_bytes': len(pickle.dumps(pipeline)),
+        'scorer_json_bytes': len(json.dumps(export_linear_scorer(pipeline, 0.5))),
+        'mapped_scorer_bytes': mapped_bytes,
+        'latency': latency,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--min-frequency', type=int, nargs='+', default=[5, 20, 100])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--output', default='')
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    splits = train_val_test_indices(df[TARGET], 0.7, 0.15, 0.15, random_state=42)
+    print(
+        f"{df['emp_title'].nunique()} distinct job titles in {len(df)} rows",
+        file=sys.stderr,
+    )
+    results = []
+    for min_frequency in [None, *args.min_frequency]:
+        results.append(run_strategy(df, splits, min_frequency, args))
+        print(json.dumps(results[-1]))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
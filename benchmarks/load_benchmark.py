@@ -0,0 +1,322 @@
+"""Load test of the FastAPI backend, run in-process.
+
+The app is served through httpx's ASGI transport with its lifespan hook,
+backed by a synthetic model in a local artifact directory, a SQLite
+prediction log and local reference data, so no AWS access is needed.
+Each scenario sends a fixed number of requests from ``--concurrency``
+concurrent clients and reports throughput, latency percentiles, CPU time
+and RSS. Client and app share the process, so CPU time includes the
+client side:
+
+    python benchmarks/load_benchmark.py --scenarios predict batch \\
+        --requests 2000 --concurrency 32 --output results.json
+
+Pass ``--compare`` with an earlier results file to print the change in
+throughput and latency. Serving settings such as MICRO_BATCHING or
+PREDICTION_LOG_BATCH_SIZE are read from the environment as usual. The
+/monitor-* scenarios need Evidently installed.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from typing import Any, Dict, List, Callable, Awaitable
+
+import numpy as np
+import pandas as pd
+import sqlalchemy
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARKS_DIR)
+FASTAPI_BACKEND_DIR = os.path.join(REPO_DIR, 'fastapi_backend')
+PIPELINES_DIR = os.path.join(REPO_DIR, 'src', 'pipelines')
+sys.path[:0] = [FASTAPI_BACKEND_DIR, PIPELINES_DIR]
+
+# pylint: disable=wrong-import-position
+from models import (
+    LOAN_DTYPES,
+    NUMERICAL_FEATURES,
+    CATEGORICAL_FEATURES,
+    LoanData,
+)
+from prediction_log import metadata
+from reference_profile import PROFILE_FILENAME, ReferenceProfile
+
+SCENARIOS = ('predict', 'batch', 'monitor-model', 'monitor-target')
+BUCKET_NAME = 'benchmark-bucket'
+REFERENCE_DATA_KEY_PATH = 'reference/reference.parquet'
+
+Request = Callable[[Any, int], Awaitable[Any]]
+
+
+def make_records(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic loan records with a target that depends on a few features."""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, annotation in LoanData.__annotations__.items():
+        if annotation is str:
+            columns[name] = rng.choice([f'{name}-{i}' for i in range(20)], n_rows)
+        elif annotation is int:
+            columns[name] = rng.poisson(5, n_rows)
+        else:
+            columns[name] = rng.gamma(2.0, 10.0, n_rows).round(2)
+    df = pd.DataFrame(columns)
+    logit = -2 + 0.05 * df['interest_rate'] + (df['grade'] == 'grade-0')
+    df['loan_status'] = np.where(
+        rng.random(n_rows) < 1 / (1 + np.exp(-logit)), 'Charged Off', 'Current'
+    )
+    return df
+
+
+def make_artifacts(root: str, df: pd.DataFrame) -> None:
+    """Fit a small pipeline and log it the way train.py lays out run artifacts."""
+    # pylint: disable=import-outside-toplevel
+    import mlflow.sklearn
+    from sklearn.pipeline import make_pipeline
+    from sklearn.compose import make_column_transformer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    from export_scorer import export_linear_scorer
+
+    threshold = 0.5
+    X, y = df.drop(columns=['loan_status']), df['loan_status'] == 'Charged Off'
+    pipeline = make_pipeline(
+        make_column_transformer(
+            (StandardScaler(), NUMERICAL_FEATURES),
+            (OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_FEATURES),
+        ),
+        LogisticRegression(max_iter=1000),
+    ).fit(X, y)
+
+    mlflow.sklearn.save_model(
+        pipeline,
+        os.path.join(root, 'model'),
+        serialization_format='cloudpickle',
+        metadata={'threshold': threshold},
+    )
+    os.makedirs(os.path.join(root, 'scorer'))
+    with open(os.path.join(root, 'scorer', 'scorer.json'), 'w', encoding='utf-8') as f:
+        json.dump(export_linear_scorer(pipeline, threshold), f)
+    os.makedirs(os.path.join(root, 'reference_profile'))
+    ReferenceProfile.from_frame(df, NUMERICAL_FEATURES, CATEGORICAL_FEATURES).save(
+        os.path.join(root, 'reference_profile', PROFILE_FILENAME)
+    )
+
+
+def configure_environment(workdir: str, model_format: str, df: pd.DataFrame) -> None:
+    """Point the app at local artifacts, storage and a fresh SQLite database."""
+    database_url = f"sqlite:///{os.path.join(workdir, 'predictions.db')}"
+    metadata.create_all(sqlalchemy.create_engine(database_url))
+    storage_root = os.path.join(workdir, 'storage')
+    reference_path = os.path.join(storage_root, BUCKET_NAME, REFERENCE_DATA_KEY_PATH)
+    os.makedirs(os.path.dirname(reference_path))
+    df.to_parquet(reference_path)
+    make_artifacts(os.path.join(workdir, 'artifacts'), df)
+
+    os.environ.update(
+        {
+            'DATABASE_URL': database_url,
+            'MODEL_FORMAT': model_format,
+            'MODEL_ARTIFACT_URI': os.path.join(workdir, 'artifacts'),
+            'MODEL_CACHE_DIR': os.path.join(workdir, 'model-cache'),
+            'REPORTS_DIR': os.path.join(workdir, 'reports'),
+            'STORAGE_BACKEND': 'local',
+            'STORAGE_LOCAL_ROOT': storage_root,
+            'STORAGE_CACHE_DIR': os.path.join(workdir, 'storage-cache'),
+            'BUCKET_NAME': BUCKET_NAME,
+            'REFERENCE_DATA_KEY_PATH': REFERENCE_DATA_KEY_PATH,
+        }
+    )
+
+
+def resource_usage() -> Dict[str, float]:
+    """CPU seconds used by the process and its current and peak RSS in MB."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    with open('/proc/self/statm', encoding='utf-8') as f:
+        rss_pages = int(f.read().split()[1])
+    return {
+        'cpu_s': usage.ru_utime + usage.ru_stime,
+        'rss_mb': rss_pages * os.sysconf('SC_PAGE_SIZE') / 2**20,
+        'peak_rss_mb': usage.ru_maxrss / 1024,
+    }
+
+
+def make_requests(records: List[Dict[str, Any]], args) -> Dict[str, Request]:
+    async def predict(client, i):
+        return await client.post('/predict', json=records[i % len(records)])
+
+    async def batch(client, i):
+        start = i * args.batch_size % len(records)
+        body = records[start : start + args.batch_size]
+        return await client.post('/predict/batch', json=body)
+
+    async def monitor_model(client, _):
+        return await client.get(
+            '/monitor-model', params={'window_size': args.window_size}
+        )
+
+    async def monitor_target(client, _):
+        return await client.get(
+            '/monitor-target', params={'window_size': args.window_size}
+        )
+
+    return {
+        'predict': predict,
+        'batch': batch,
+        'monitor-model': monitor_model,
+        'monitor-target': monitor_target,
+    }
+
+
+async def run_scenario(
+    client, request: Request, n_requests: int, concurrency: int
+) -> Dict[str, Any]:
+    latencies_ms: List[float] = []
+    errors: Dict[str, int] = {}
+    next_request = iter(range(n_requests))
+
+    async def worker():
+        for i in next_request:
+            started = time.perf_counter()
+            try:
+                response = await request(client, i)
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            latencies_ms.append((time.perf_counter() - started) * 1000)
+            if status != '200':
+                errors[status] = errors.get(status, 0) + 1
+
+    before = resource_usage()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    after = resource_usage()
+
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        'requests': n_requests,
+        'concurrency': concurrency,
+        'errors': errors,
+        'elapsed_s': elapsed,
+        'throughput_rps': n_requests / elapsed,
+        'latency_ms': {
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99),
+            'max': float(max(latencies_ms)),
+        },
+        'cpu_s': after['cpu_s'] - before['cpu_s'],
+        'cpu_ms_per_request': (after['cpu_s'] - before['cpu_s']) / n_requests * 1000,
+        'rss_mb': after['rss_mb'],
+        'peak_rss_mb': after['peak_rss_mb'],
+    }
+
+
+async def run(args, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # pylint: disable=import-outside-toplevel
+    import httpx
+
+    import app as app_module
+
+    app = app_module.app
+    requests = make_requests(records, args)
+    results: Dict[str, Any] = {}
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        results['startup_s'] = time.perf_counter() - started
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url='http://benchmark', timeout=None
+        ) as client:
+            scenarios = {}
+            for name in args.scenarios:
+                n_requests = args.requests
+                if name.startswith('monitor'):
+                    n_requests = args.monitor_requests
+                scenarios[name] = await run_scenario(
+                    client, requests[name], n_requests, args.concurrency
+                )
+                print(name, json.dumps(scenarios[name]))
+            results['scenarios'] = scenarios
+            response = await client.get('/metrics/prediction-log')
+            results['prediction_log'] = response.json()
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def compare(results: Dict[str, Any], baseline_path: str) -> None:
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"Compared with {baseline_path} ({baseline.get('commit', '')[:10]}):")
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        changes = [
+            f"throughput {current['throughput_rps'] / previous['throughput_rps']:.2f}x"
+        ]
+        for percentile in ('p50', 'p95', 'p99'):
+            ratio = (
+                current['latency_ms'][percentile] / previous['latency_ms'][percentile]
+            )
+            changes.append(f"{percentile} {ratio:.2f}x")
+        print(f"  {name}: {', '.join(changes)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--monitor-requests', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--window-size', type=int, default=3000)
+    parser.add_argument(
+        '--model-format', choices=('scorer', 'sklearn'), default='scorer'
+    )
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--output', default='')
+    parser.add_argument('--compare', default='')
+    args = parser.parse_args()
+
+    df = make_records(args.rows).astype(LOAN_DTYPES)
+    records = json.loads(df.to_json(orient='records'))
+    results = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'config': vars(args),
+    }
+    with tempfile.TemporaryDirectory(prefix='load-benchmark-') as workdir:
+        configure_environment(workdir, args.model_format, df)
+        results.update(asyncio.run(run(args, records)))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Per-request CPU time of the /predict decode and scoring path.
+
+Compares the previous path (pydantic validation, ``.dict()``, a one-row
+DataFrame and the vectorised scorer) with ``decode_record`` and the
+``FeatureAssembler``, on a synthetic flattened scorer over every LoanData
+feature. HTTP handling is identical for both and is left out:
+
+    python benchmarks/predict_path_benchmark.py --requests 20000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+FASTAPI_BACKEND_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), 'fastapi_backend')
+sys.path.insert(0, FASTAPI_BACKEND_DIR)
+
+# pylint: disable=wrong-import-position
+from models import NUMERICAL_FEATURES, CATEGORICAL_FEATURES, LoanData
+from scorer import LinearScorer, FeatureAssembler
+from record_decoder import decode_record
+
+FIELD_VALUES = {str: 'B', int: 3, float: 1.5}
+
+
+def make_scorer(n_categories: int) -> LinearScorer:
+    rng = np.random.default_rng(0)
+    return LinearScorer(
+        {
+            'numerical_features': NUMERICAL_FEATURES,
+            'numerical_weights': rng.normal(0, 0.01, len(NUMERICAL_FEATURES)).tolist(),
+            'categorical_weights': {
+                column: {
+                    f'{column}-{i}': float(rng.normal(0, 0.5))
+                    for i in range(n_categories)
+                }
+                for column in CATEGORICAL_FEATURES
+            },
+            'intercept': -1.0,
+            'threshold': 0.5,
+        }
+    )
+
+
+def dataframe_path(body: bytes, scorer: LinearScorer) -> float:
+    data_dict = LoanData.parse_raw(body).dict()
+    X = pd.DataFrame([list(data_dict.values())], columns=data_dict.keys())
+    return float(scorer.predict_proba(X)[0, 1])
+
+
+def fast_path(body: bytes, assembler: FeatureAssembler) -> float:
+    return assembler.predict_proba(decode_record(body))
+
+
+def cpu_us_per_request(fn, body: bytes, model, n_requests: int) -> float:
+    for _ in range(min(n_requests, 100)):
+        fn(body, model)
+    started = time.process_time()
+    for _ in range(n_requests):
+        fn(body, model)
+    return (time.process_time() - started) / n_requests * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--categories', type=int, default=1000)
+    parser.add_argument('--output', default='')
+    args = parser.parse_args()
+
+    scorer = make_scorer(args.categories)
+    record = {
+        name: FIELD_VALUES[annotation]
+        for name, annotation in LoanData.__annotations__.items()
+    }
+    body = json.dumps(record).encode()
+    assembler = FeatureAssembler(scorer)
+    assert np.isclose(dataframe_path(body, scorer), fast_path(body, assembler))
+
+    before = cpu_us_per_request(dataframe_path, body, scorer, args.requests)
+    after = cpu_us_per_request(fast_path, body, assembler, args.requests)
+    results = {
+        'requests': args.requests,
+        'dataframe_path_cpu_us': before,
+        'fast_path_cpu_us': after,
+        'speedup': before / after,
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Time to first prediction of the FastAPI backend.
+
+Each run starts a fresh interpreter that imports the app, runs its lifespan
+startup and serves one /predict request. The first run starts with an empty
+model artifact cache, later runs reuse it. By default a synthetic flattened
+scorer and a SQLite prediction log are used, so no AWS access is needed:
+
+    python benchmarks/startup_benchmark.py --runs 5 --output startup.json
+
+Pass --artifact-uri (and --model-format sklearn) to time a real MLflow run.
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+import sqlalchemy
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+FASTAPI_BACKEND_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), 'fastapi_backend')
+sys.path.insert(0, FASTAPI_BACKEND_DIR)
+
+# pylint: disable=wrong-import-position
+from models import NUMERICAL_FEATURES, LoanData
+from prediction_log import metadata
+
+FIELD_VALUES = {str: 'A', int: 1, float: 1.0}
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.app) as client:
+    ready = time.perf_counter()
+    response = client.post('/predict', json=json.loads(sys.argv[1]))
+    response.raise_for_status()
+    predicted = time.perf_counter()
+print(json.dumps({
+    'import_s': imported - started,
+    'startup_s': ready - imported,
+    'first_prediction_s': predicted - ready,
+    'time_to_first_prediction_s': predicted - started,
+}))
+"""
+
+
+def make_scorer_artifacts(root: str) -> str:
+    os.makedirs(os.path.join(root, 'scorer'))
+    scorer = {
+        'numerical_features': NUMERICAL_FEATURES,
+        'numerical_weights': [0.01] * len(NUMERICAL_FEATURES),
+        'categorical_weights': {'grade': {'A': -0.5, 'G': 0.5}},
+        'intercept': -1.0,
+        'threshold': 0.5,
+    }
+    with open(os.path.join(root, 'scorer', 'scorer.json'), 'w', encoding='utf-8') as f:
+        json.dump(scorer, f)
+    return root
+
+
+def run_once(env: dict, record: dict) -> dict:
+    process = subprocess.run(
+        [sys.executable, '-c', CHILD, json.dumps(record)],
+        cwd=FASTAPI_BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--artifact-uri', default='')
+    parser.add_argument('--model-format', default='scorer')
+    parser.add_argument('--output', default='')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='startup-benchmark-')
+    database_url = f"sqlite:///{os.path.join(workdir, 'predictions.db')}"
+    metadata.create_all(sqlalchemy.create_engine(database_url))
+    env = {
+        **os.environ,
+        'DATABASE_URL': database_url,
+        'MODEL_FORMAT': args.model_format,
+        'MODEL_ARTIFACT_URI': args.artifact_uri
+        or make_scorer_artifacts(os.path.join(workdir, 'artifacts')),
+        'MODEL_CACHE_DIR': os.path.join(workdir, 'model-cache'),
+        'REPORTS_DIR': os.path.join(workdir, 'reports'),
+        'STORAGE_BACKEND': 'local',
+        'STORAGE_LOCAL_ROOT': os.path.join(workdir, 'storage'),
+    }
+    record = {
+        name: FIELD_VALUES[annotation]
+        for name, annotation in LoanData.__annotations__.items()
+    }
+
+    runs = []
+    for i in range(args.runs):
+        result = run_once(env, record)
+        result['model_cache'] = 'cold' if i == 0 else 'warm'
+        runs.append(result)
+        print(json.dumps(result))
+
+    warm = [run['time_to_first_prediction_s'] for run in runs[1:]]
+    summary = {
+        'runs': runs,
+        'cold_time_to_first_prediction_s': runs[0]['time_to_first_prediction_s'],
+        'warm_median_time_to_first_prediction_s': (
+            statistics.median(warm) if warm else None
+        ),
+    }
+    print(json.dumps({k: v for k, v in summary.items() if k != 'runs'}, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+"""Peak memory of building LoanPredictionModel and splitting its data.
+
+Each variant runs in a fresh interpreter on a synthetic frame in the
+cleaned schema, by default as many rows as the full Lending Club loan
+history. ``before`` is the previous path (``df.drop`` for the features,
+two ``value_counts`` and two chained ``train_test_split`` calls on the
+frames); ``after`` is ``LoanPredictionModel``, ``train_val_test_indices``
+and ``take``. Peak RSS is measured from after the frame is built, so it
+is the memory the variant adds on top of the data:
+
+    python benchmarks/training_memory_benchmark.py --rows 2260000 --preprocess
+
+``--preprocess`` also fits the preprocessor on the train split and
+transforms all three splits, as training does; the classifier fit is the
+same for both variants and is left out.
+"""
+
+import os
+import sys
+import json
+import time
+import ctypes
+import argparse
+import resource
+import subprocess
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINES_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), 'src', 'pipelines')
+sys.path.insert(0, PIPELINES_DIR)
+
+# pylint: disable=wrong-import-position
+from schema import TARGET, CLEAN_DTYPES
+
+VARIANTS = ('before', 'after')
+# Distinct values per categorical column, roughly as in the Lending Club data
+CARDINALITIES = {'emp_title': 20000, 'state': 50, 'sub_grade': 35, 'issue_month': 36}
+
+
+def make_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, dtype in CLEAN_DTYPES.items():
+        if name == TARGET:
+            columns[name] = (rng.random(n_rows) < 0.15).astype(dtype)
+        elif dtype == 'category':
+            values = [f'{name}-{i}' for i in range(CARDINALITIES.get(name, 8))]
+            columns[name] = pd.Categorical.from_codes(
+                rng.integers(0, len(values), n_rows), values
+            )
+        elif dtype.startswith('float'):
+            columns[name] = rng.gamma(2.0, 10.0, n_rows).astype(dtype)
+        else:
+            columns[name] = rng.poisson(5, n_rows).astype(dtype)
+    return pd.DataFrame(columns)
+
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's peak RSS counter; False where that is unsupported.
+
+    Free heap memory is first handed back to the OS, so that memory freed
+    while building the frame is not reused unseen by the measured code.
+    """
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+        with open('/proc/self/clear_refs', 'w', encoding='utf-8') as f:
+            f.write('5')
+        return True
+    except (OSError, AttributeError):
+        return False
+
+
+def rss_mb() -> Dict[str, float]:
+    status = {}
+    with open('/proc/self/status', encoding='utf-8') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            status[key] = value.split()
+    return {
+        'rss_mb': int(status['VmRSS'][0]) / 1024,
+        'peak_rss_mb': int(status['VmHWM'][0]) / 1024,
+    }
+
+
+def class_weights_before(df: pd.DataFrame) -> Dict[int, float]:
+    count_majority_class = df[TARGET].value_counts()[0]
+    count_minority_class = df[TARGET].value_counts()[1]
+    total_samples = count_majority_class + count_minority_class
+    return {
+        0: total_samples / (2 * count_majority_class),
+        1: total_samples / (2 * count_minority_class),
+    }
+
+
+def split_before(df: pd.DataFrame) -> Any:
+    # pylint: disable=import-outside-toplevel
+    from sklearn.model_selection import train_test_split
+
+    X, y = df.drop(columns=[TARGET]), df[TARGET]
+    class_weights = class_weights_before(df)
+    X_train_val, X_test, y_train_val, y_test = train_test_split(
+        X, y, test_size=0.15, random_state=42, stratify=y
+    )
+    # Only test_size, as the sizes given together could not be satisfied
+    X_train, X_val, y_train, y_val = train_test_split(
+        X_train_val,
+        y_train_val,
+        test_size=0.15 / 0.85,
+        random_state=42,
+        stratify=y_train_val,
+    )
+    return X, class_weights, (X_train, X_val, X_test, y_train, y_val, y_test)
+
+
+def split_after(df: pd.DataFrame) -> Any:
+    # pylint: disable=import-outside-toplevel
+    from train import LoanPredictionModel, train_val_test_indices
+
+    loan_model = LoanPredictionModel(df)
+    train_idx, val_idx, test_idx = train_val_test_indices(
+        loan_model.y, 0.7, 0.15, 0.15, random_state=42
+    )
+    X_train, y_train = loan_model.take(train_idx)
+    X_val, y_val = loan_model.take(val_idx)
+    X_test, y_test = loan_model.take(test_idx)
+    return loan_model, (X_train, X_val, X_test, y_train, y_val, y_test)
+
+
+def preprocess(splits: Any) -> Any:
+    # pylint: disable=import-outside-toplevel
+    from sklearn.compose import make_column_transformer
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    X_train, X_val, X_test = splits[:3]
+    preprocessor = make_column_transformer(
+        (StandardScaler(with_mean=False), X_train.select_dtypes('number').columns),
+        (
+            OneHotEncoder(handle_unknown='ignore'),
+            X_train.select_dtypes('category').columns,
+        ),
+    )
+    Xt_train = preprocessor.fit_transform(X_train)
+    return Xt_train, preprocessor.transform(X_val), preprocessor.transform(X_test)
+
+
+def run_child(variant: str, n_rows: int, with_preprocessing: bool) -> Dict[str, Any]:
+    df = make_frame(n_rows)
+    # Import the training code before measuring, as its modules are not data
+    import train  # pylint: disable=import-outside-toplevel,unused-import
+
+    if not reset_peak_rss():
+        raise RuntimeError("Peak RSS cannot be reset on this platform")
+    frame = rss_mb()
+    started = time.perf_counter()
+    kept = split_before(df) if variant == 'before' else split_after(df)
+    split_s = time.perf_counter() - started
+    split = rss_mb()
+    result = {
+        'variant': variant,
+        'rows': n_rows,
+        'frame_mb': float(df.memory_usage(deep=True).sum() / 2**20),
+        'split_s': split_s,
+        'split_peak_rss_mb': split['peak_rss_mb'] - frame['rss_mb'],
+        'split_retained_rss_mb': split['rss_mb'] - frame['rss_mb'],
+    }
+    if with_preprocessing:
+        started = time.perf_counter()
+        kept = (kept, preprocess(kept[-1]))
+        result['preprocess_s'] = time.perf_counter() - started
+        result['peak_rss_mb'] = rss_mb()['peak_rss_mb'] - frame['rss_mb']
+    result['max_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2260000)
+    parser.add_argument('--preprocess', action='store_true')
+    parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=VARIANTS)
+    parser.add_argument('--child', choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument('--output', default='')
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.rows, args.preprocess)))
+        return
+
+    results = []
+    for variant in args.variants:
+        command = [
+            sys.executable,
+            __file__,
+            '--child',
+            variant,
+            '--rows',
+            str(args.rows),
+        ]
+        if args.preprocess:
+            command.append('--preprocess')
+        output = subprocess.run(command, capture_output=True, text=True, check=True)
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+        print(json.dumps(results[-1]))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
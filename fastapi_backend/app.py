@@ -1,25 +1,48 @@
 # Standard library imports
 import os
 import json
+import posixpath
+import time
+import asyncio
 import logging
+from io import BytesIO
+from contextlib import asynccontextmanager
+from typing import Dict, List, Tuple, Iterator, Optional
 from datetime import datetime
 
 # Third party imports
 import boto3
-import mlflow
+import numpy as np
 import pandas as pd
 import uvicorn
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import File, FastAPI, Request, UploadFile, HTTPException
+from pydantic import ValidationError
 from databases import Database
-from evidently import ColumnMapping
-from sqlalchemy import Table, Column, String, DateTime, MetaData
-from evidently.report import Report
-from evidently.metrics import DatasetDriftMetric, DatasetMissingValuesMetric
-from fastapi.responses import FileResponse
-from evidently.metric_preset import TargetDriftPreset, ClassificationPreset
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 # Local/application-specific imports
-from models import LoanData
+from models import NUMERICAL_FEATURES, CATEGORICAL_FEATURES, LoanData
+from storage import get_storage
+from batching import MicroBatcher
+from record_decoder import decode_record
+from prediction_log import (
+    PredictionLogWriter,
+    predictions,
+    latest_prediction_id,
+    load_last_predictions,
+)
+from reports import REPORT_TYPES, ReportService
+from model_registry import (
+    ServedModel,
+    ModelManager,
+    FileRegistrySource,
+    MlflowRegistrySource,
+    load_served_model,
+)
+from drift import StreamingDriftMonitor
+from reference_profile import PROFILE_FILENAME, ReferenceProfile
 
 
 # Set up a connection to the Postgres RDS instance.
@@ -41,34 +64,38 @@ def get_db_credentials(secret_name: str) -> dict:
     return json.loads(secret['SecretString'])
 
 
-# Fetch FastAPI DB credentials
-fastapi_db_credentials = get_db_credentials('fastapi_db_credentials')
-
-DB_USER = fastapi_db_credentials["username"]
-DB_PASSWORD = fastapi_db_credentials["password"]
-RDS_ENDPOINT = get_rds_endpoint('fastapi_db')
-
-# Set up the connection string to the Postgres RDS instance using the fetched data
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{RDS_ENDPOINT}:5432/fastapi_db"
+def resolve_database_url() -> str:
+    """DATABASE_URL if set, else the RDS instance with Secrets Manager credentials."""
+    if os.getenv('DATABASE_URL'):
+        return os.environ['DATABASE_URL']
+    fastapi_db_credentials = get_db_credentials('fastapi_db_credentials')
+    db_user = fastapi_db_credentials["username"]
+    db_password = fastapi_db_credentials["password"]
+    rds_endpoint = get_rds_endpoint('fastapi_db')
+    return f"postgresql://{db_user}:{db_password}@{rds_endpoint}:5432/fastapi_db"
 
 
-database = Database(DATABASE_URL)
-metadata = MetaData()
-
-predictions = Table(
-    "predictions",
-    metadata,
-    Column("created_at", DateTime, primary_key=True),
-    Column("input", String),
-    Column("output", String),
-)
+# Connection, prediction log and served model are set up by the lifespan hook,
+# so importing the module makes no network calls
+database: Optional[Database] = None
+prediction_log: Optional[PredictionLogWriter] = None
+model_manager: Optional[ModelManager] = None
+report_service: Optional[ReportService] = None
 
 # Constants for S3 data fetching
 BUCKET_NAME = os.environ.get("BUCKET_NAME", "artifacts-and-data-bp")
 REFERENCE_DATA_KEY_PATH = os.environ.get("REFERENCE_DATA_KEY_PATH", "/reference")
+# make_dataset.py uploads the profile of the reference data next to it
+REFERENCE_PROFILE_KEY_PATH = os.environ.get(
+    "REFERENCE_PROFILE_KEY_PATH",
+    posixpath.join(posixpath.dirname(REFERENCE_DATA_KEY_PATH), PROFILE_FILENAME),
+)
+
+# Reference data is read through a local disk cache validated against the S3 ETag
+storage = get_storage()
 
-# Initialize the S3 client
-s3 = boto3.client('s3')
+# Parsed reference frames by local path, with the file mtime they were read at
+reference_data_cache: Dict[str, Tuple[int, pd.DataFrame]] = {}
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -76,63 +103,312 @@ logging.basicConfig(
 )
 
 RUN_ID = str(os.getenv('RUN_ID', 'decc0e5be9024909bd87d1c9112e237b'))
-logged_model = f's3://{BUCKET_NAME}/3/{RUN_ID}/artifacts/model'
+# Root of the served run's artifacts, overridable e.g. with a local directory
+logged_artifacts = os.getenv(
+    'MODEL_ARTIFACT_URI', f's3://{BUCKET_NAME}/3/{RUN_ID}/artifacts'
+)
+
+# 'sklearn' serves the full MLflow pipeline, 'scorer' the flattened NumPy scorer
+MODEL_FORMAT = os.getenv('MODEL_FORMAT', 'sklearn')
+
+# Hot-swapping of newly promoted models: '' serves RUN_ID only, 'mlflow' polls
+# the model registry and 'file' a local JSON stand-in for it
+MODEL_REGISTRY = os.getenv('MODEL_REGISTRY', '')
+MODEL_NAME = os.getenv('MODEL_NAME', 'loan-prediction')
+MODEL_STAGE = os.getenv('MODEL_STAGE', 'Production')
+MODEL_REGISTRY_FILE = os.getenv('MODEL_REGISTRY_FILE', './model_registry.json')
+MODEL_POLL_INTERVAL_S = float(os.getenv('MODEL_POLL_INTERVAL_S', '60'))
+# Rows of recent traffic a new model version must score before it is served
+CANARY_SIZE = int(os.getenv('CANARY_SIZE', '100'))
+# Downloaded model artifacts are kept here and reused by later starts
+MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', '/tmp/loan-model-cache')
+
+# Number of uvicorn worker processes when run as a script
+WEB_WORKERS = int(os.getenv('WEB_WORKERS', '1'))
+# Memory-map the scorer parameters from MODEL_CACHE_DIR so that all workers
+# share one copy of them (MODEL_FORMAT=scorer only). Prediction logging and
+# the streaming drift scores remain per worker.
+SHARED_WEIGHTS = os.getenv('SHARED_WEIGHTS', 'false').lower() == 'true'
+
+# Number of rows scored per pipeline call on the batch endpoints
+BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', '10000'))
+
+PREDICTION_LABELS = np.array(["Not Charged Off", "Charged Off"])
+LOAN_DATA_COLUMNS = list(LoanData.__fields__)
+STRING_COLUMNS = [
+    name for name, annotation in LoanData.__annotations__.items() if annotation is str
+]
+NUMERIC_COLUMNS = [name for name in LOAN_DATA_COLUMNS if name not in STRING_COLUMNS]
+
+# Opt-in dynamic batching of concurrent /predict requests
+MICRO_BATCHING = os.getenv('MICRO_BATCHING', 'false').lower() == 'true'
+MICRO_BATCH_MAX_SIZE = int(os.getenv('MICRO_BATCH_MAX_SIZE', '64'))
+MICRO_BATCH_MAX_WAIT_MS = float(os.getenv('MICRO_BATCH_MAX_WAIT_MS', '2'))
+
+# Prediction log rows are inserted in bulk every N rows or T milliseconds
+PREDICTION_LOG_BATCH_SIZE = int(os.getenv('PREDICTION_LOG_BATCH_SIZE', '500'))
+PREDICTION_LOG_FLUSH_MS = float(os.getenv('PREDICTION_LOG_FLUSH_MS', '200'))
+PREDICTION_LOG_MAX_QUEUE = int(os.getenv('PREDICTION_LOG_MAX_QUEUE', '10000'))
+
+# Streaming drift scores over the last DRIFT_WINDOW_SIZE logged predictions
+DRIFT_WINDOW_SIZE = int(os.getenv('DRIFT_WINDOW_SIZE', '3000'))
+DRIFT_PSI_THRESHOLD = float(os.getenv('DRIFT_PSI_THRESHOLD', '0.2'))
+DRIFT_SHARE = float(os.getenv('DRIFT_SHARE', '0.5'))
+
+# Set up at startup and after every model swap, against the served model's
+# reference profile
+drift_monitor: Optional[StreamingDriftMonitor] = None
+drift_task: Optional[asyncio.Task] = None
+
+# Evidently reports are generated in a worker process and cached per window
+REPORTS_DIR = os.getenv('REPORTS_DIR', '../reports')
+REPORT_CACHE_TTL_S = float(os.getenv('REPORT_CACHE_TTL_S', '300'))
+
+
+# Queue a prediction for the buffered bulk writer
+async def save_to_database(
+    input_data: dict, output: dict, latency_ms: float, model_version: str
+) -> None:
+    await prediction_log.log(
+        {
+            'created_at': datetime.now(),
+            **input_data,
+            **output,
+            'model_version': model_version,
+            'latency_ms': latency_ms,
+        }
+    )
+    if drift_monitor is not None:
+        drift_monitor.update(input_data)
+
 
+def load_reference_data_profile() -> ReferenceProfile:
+    """Profile of the reference data, for models logged without a profile.
 
-# Background Task for Saving Predictions
-async def save_to_database(input_data: dict, output: dict) -> None:
-    query = predictions.insert().values(
-        created_at=datetime.now(), input=str(input_data), output=str(output)
+    The profile uploaded with the reference data is read when there is one;
+    profiling the full reference data is the last resort.
+    """
+    try:
+        return ReferenceProfile.load(
+            storage.fetch(BUCKET_NAME, REFERENCE_PROFILE_KEY_PATH)
+        )
+    except Exception as e:
+        logger.warning("No profile uploaded with the reference data: %s", e)
+
+    reference_data = load_data_from_s3(BUCKET_NAME, REFERENCE_DATA_KEY_PATH)
+    return ReferenceProfile.from_frame(
+        reference_data,
+        [column for column in NUMERICAL_FEATURES if column in reference_data],
+        [column for column in CATEGORICAL_FEATURES if column in reference_data],
+        target='loan_status',
     )
-    await database.execute(query)
 
 
-# Function to fetch the last predictions from the database
-async def load_last_predictions(window_size: int) -> pd.DataFrame:
-    query = (
-        predictions.select()
-        .order_by(predictions.c.created_at.desc())
-        .limit(window_size)
+async def init_drift_monitor(served: ServedModel) -> None:
+    """Monitor drift against the served model's reference profile, with the
+    window warmed up from the log."""
+    global drift_monitor  # pylint: disable=global-statement
+    profile = served.profile
+    if profile is None:
+        try:
+            profile = await run_in_threadpool(load_reference_data_profile)
+        except Exception:
+            logger.warning("No reference data, streaming drift detection is disabled")
+            drift_monitor = None
+            return
+
+    monitor = StreamingDriftMonitor(
+        profile,
+        window_size=DRIFT_WINDOW_SIZE,
+        psi_threshold=DRIFT_PSI_THRESHOLD,
+        drift_share=DRIFT_SHARE,
     )
-    rows = await database.fetch_all(query)
-    return pd.DataFrame(rows)
+    recent = await load_last_predictions(database, DRIFT_WINDOW_SIZE)
+    monitor.update_frame(recent.iloc[::-1])
+    drift_monitor = monitor
+
+
+def start_drift_monitor(served: ServedModel) -> None:
+    """Rebuild the drift monitor for a newly served model in the background.
+
+    Drift is measured against the training data of the model being served;
+    a monitor still warming up for the previous model is abandoned.
+    """
+    global drift_task  # pylint: disable=global-statement
+    if drift_task is not None:
+        drift_task.cancel()
+    drift_task = asyncio.create_task(init_drift_monitor(served))
 
 
 # Function to fetch data from S3
 def load_data_from_s3(bucket_name, key_path):
     try:
-        obj = s3.get_object(Bucket=bucket_name, Key=key_path)
-        return pd.read_parquet(obj['Body'])
+        path = storage.fetch(bucket_name, key_path)
+        mtime = os.stat(path).st_mtime_ns
+        cached = reference_data_cache.get(path)
+        if cached is None or cached[0] != mtime:
+            reference_data_cache[path] = (mtime, pd.read_parquet(path))
+        return reference_data_cache[path][1]
     except Exception as e:
         logger.error("Error loading data from S3: %s", e)
         raise
 
 
-def get_column_mapping(target_col, prediction_col, num_features, cat_features):
-    column_mapping = ColumnMapping()
-    column_mapping.target = target_col
-    column_mapping.prediction = prediction_col
-    column_mapping.numerical_features = num_features
-    column_mapping.categorical_features = cat_features
-    return column_mapping
+def read_batch_file(file: UploadFile) -> pd.DataFrame:
+    """Read an uploaded CSV or Parquet file into a dataframe of loan records."""
+    content = file.file.read()
+    if file.filename.endswith('.parquet'):
+        df = pd.read_parquet(BytesIO(content))
+    elif file.filename.endswith('.csv'):
+        df = pd.read_csv(BytesIO(content), dtype=dict.fromkeys(STRING_COLUMNS, str))
+    else:
+        raise HTTPException(
+            status_code=415, detail="Batch file must be a .csv or .parquet file"
+        )
+
+    missing_columns = set(LOAN_DATA_COLUMNS) - set(df.columns)
+    if missing_columns:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Missing columns: {sorted(missing_columns)}",
+        )
+    # Values are scored as read: casting to the compact LOAN_DTYPES costs more
+    # than scoring and would wrap integers outside their narrow range
+    non_numeric = [
+        column
+        for column in NUMERIC_COLUMNS
+        if not pd.api.types.is_numeric_dtype(df[column])
+    ]
+    if non_numeric:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Non-numeric values in columns: {non_numeric}",
+        )
+    return df[LOAN_DATA_COLUMNS]
+
+
+def iter_batch_predictions(X: pd.DataFrame, chunk_size: int) -> Iterator[str]:
+    """Score the frame chunk by chunk and yield the results as JSON lines."""
+    # The whole batch is scored by one model version, even across a hot swap
+    served = model_manager.current
+    for start in range(0, len(X), chunk_size):
+        probabilities = served.predict_proba(X.iloc[start : start + chunk_size])
+        labels = PREDICTION_LABELS[(probabilities > served.threshold).astype(int)]
+        yield "".join(
+            f'{{"index": {index}, "prediction": "{label}", "probability": {probability!r}}}\n'
+            for index, (label, probability) in enumerate(
+                zip(labels, probabilities.tolist()), start=start
+            )
+        )
+
+
+def predict_proba(X: pd.DataFrame) -> Tuple[ServedModel, np.ndarray]:
+    """Return the current model and its charged-off probability for each row
+    of the frame."""
+    served = model_manager.current
+    return served, served.predict_proba(X)
+
+
+def load_model_version(version: str, artifact_uri: str):
+    return load_served_model(
+        version, artifact_uri, MODEL_FORMAT, MODEL_CACHE_DIR, SHARED_WEIGHTS
+    )
+
 
+def load_initial_model(registry_source) -> ServedModel:
+    """Load the version the registry currently names, or RUN_ID without one.
 
-# model = mlflow.pyfunc.load_model(logged_model)
-model = mlflow.sklearn.load_model(logged_model)
+    Starting from the registry's own version id keeps the watcher from
+    loading the same model again on its first poll.
+    """
+    latest = registry_source.latest() if registry_source is not None else None
+    version, artifact_uri = latest or (RUN_ID, logged_artifacts)
+    return load_model_version(version, artifact_uri)
 
-app = FastAPI()
 
+async def load_canary_batch() -> pd.DataFrame:
+    """Recent traffic from the prediction log, or reference rows before any."""
+    recent = await load_last_predictions(database, CANARY_SIZE)
+    if recent.empty:
+        reference_data = await run_in_threadpool(
+            load_data_from_s3, BUCKET_NAME, REFERENCE_DATA_KEY_PATH
+        )
+        recent = reference_data.head(CANARY_SIZE)
+    return recent[LOAN_DATA_COLUMNS]
+
+
+def get_registry_source():
+    if MODEL_REGISTRY == 'mlflow':
+        return MlflowRegistrySource(MODEL_NAME, MODEL_STAGE)
+    if MODEL_REGISTRY == 'file':
+        return FileRegistrySource(MODEL_REGISTRY_FILE)
+    return None
 
-@app.on_event("startup")
-async def startup():
-    await database.connect()
 
+batcher = (
+    MicroBatcher(
+        predict_proba,
+        LOAN_DATA_COLUMNS,
+        max_batch_size=MICRO_BATCH_MAX_SIZE,
+        max_wait_ms=MICRO_BATCH_MAX_WAIT_MS,
+    )
+    if MICRO_BATCHING
+    else None
+)
 
-@app.on_event("shutdown")
-async def shutdown():
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # pylint: disable-next=global-statement
+    global database, prediction_log, model_manager, report_service
+    registry_source = get_registry_source()
+    # Secrets and the model are fetched concurrently, both off the event loop
+    database_url, initial_model = await asyncio.gather(
+        run_in_threadpool(resolve_database_url),
+        run_in_threadpool(load_initial_model, registry_source),
+    )
+    database = Database(database_url)
+    await database.connect()
+    prediction_log = PredictionLogWriter(
+        database,
+        predictions,
+        batch_size=PREDICTION_LOG_BATCH_SIZE,
+        flush_interval_ms=PREDICTION_LOG_FLUSH_MS,
+        max_queue_size=PREDICTION_LOG_MAX_QUEUE,
+    )
+    await prediction_log.start()
+    model_manager = ModelManager(
+        initial_model,
+        registry_source,
+        load_model_version,
+        load_canary_batch,
+        poll_interval_s=MODEL_POLL_INTERVAL_S,
+        on_swap=start_drift_monitor,
+    )
+    if registry_source is not None:
+        await model_manager.start()
+    if batcher is not None:
+        await batcher.start()
+    report_service = ReportService(REPORTS_DIR, ttl_s=REPORT_CACHE_TTL_S)
+    # Drift monitoring is not needed to serve predictions, so it warms up in
+    # the background rather than delaying the first request
+    start_drift_monitor(initial_model)
+
+    yield
+
+    await model_manager.stop()
+    drift_task.cancel()
+    if batcher is not None:
+        await batcher.stop()
+    report_service.shutdown()
+    # Flush buffered prediction log rows before the connection goes away
+    await prediction_log.stop()
     await database.disconnect()
 
 
+app = FastAPI(lifespan=lifespan)
+
+
 @app.get('/')
 def index():
     return {'message': 'Hello'}
@@ -143,85 +419,163 @@ def get_home():
     return {'message': 'You are Home'}
 
 
-@app.post('/predict')
-def predict_chargedoff(data: LoanData, background_tasks: BackgroundTasks):
-    data_dict = data.dict()
-    X = pd.DataFrame([list(data_dict.values())], columns=data_dict.keys())
-    prediction = model.predict(X)
+@app.get('/metrics/batching')
+def get_batching_metrics():
+    if batcher is None:
+        raise HTTPException(status_code=404, detail="Micro-batching is disabled")
+    return batcher.metrics.snapshot(batcher.queue_depth)
 
-    preds = "Charged Off" if prediction[0] else "Not Charged Off"
-    background_tasks.add_task(save_to_database, input_data=data_dict, output=preds)
-    return {'prediction': preds}
 
+@app.get('/metrics/drift')
+def get_drift_scores():
+    if drift_monitor is None:
+        raise HTTPException(
+            status_code=404, detail="Streaming drift detection is disabled"
+        )
+    return drift_monitor.scores()
 
-@app.get('/monitor-model')
-async def monitor_model_performance(window_size: int = 3000) -> FileResponse:
-    current_data = await load_last_predictions(window_size)
-    reference_data = load_data_from_s3(BUCKET_NAME, REFERENCE_DATA_KEY_PATH)
 
-    categorical_features = current_data.select_dtypes(
-        include=['object']
-    ).columns.tolist()
-    numerical_features = current_data.select_dtypes(
-        include=['int64', 'float64']
-    ).columns.tolist()
-
-    column_mapping = get_column_mapping(
-        target_col="loan_status",
-        prediction_col="prediction",
-        num_features=numerical_features,
-        cat_features=categorical_features,
+@app.get('/model')
+def get_model_status():
+    return model_manager.status()
+
+
+# On the event loop, where the swap starts the new drift monitor
+@app.post('/model/rollback')
+async def rollback_model():
+    try:
+        model_manager.rollback()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    return model_manager.status()
+
+
+@app.get('/metrics/prediction-log')
+def get_prediction_log_metrics():
+    return prediction_log.stats()
+
+
+# The body is decoded by decode_record rather than by FastAPI, so the LoanData
+# schema is declared explicitly for the docs
+@app.post(
+    '/predict',
+    openapi_extra={
+        'requestBody': {
+            'content': {'application/json': {'schema': LoanData.schema()}},
+            'required': True,
+        }
+    },
+)
+async def predict_chargedoff(request: Request):
+    started = time.perf_counter()
+    try:
+        data_dict = decode_record(await request.body())
+    except ValidationError as e:
+        errors = [{**error, 'loc': ('body', *error['loc'])} for error in e.errors()]
+        raise RequestValidationError(errors) from e
+    if batcher is not None:
+        # The model is the one that scored the batch, which may have been
+        # swapped in after the request arrived
+        served, probability = await batcher.submit(data_dict)
+    else:
+        served = model_manager.current
+        if served.assembler is not None:
+            # Scoring one record with the flattened scorer takes microseconds,
+            # less than a hop to the threadpool
+            probability = served.assembler.predict_proba(data_dict)
+        else:
+            X = pd.DataFrame([list(data_dict.values())], columns=data_dict.keys())
+            probability = float((await run_in_threadpool(served.predict_proba, X))[0])
+
+    preds = "Charged Off" if probability > served.threshold else "Not Charged Off"
+    output = {'prediction': preds, 'probability': probability}
+    latency_ms = (time.perf_counter() - started) * 1000
+    await save_to_database(
+        input_data=data_dict,
+        output=output,
+        latency_ms=latency_ms,
+        model_version=served.version,
     )
+    return {**output, 'threshold': served.threshold}
+
 
-    model_performance_report = Report(
-        metrics=[
-            DatasetDriftMetric(),
-            DatasetMissingValuesMetric(),
-            ClassificationPreset(probas_threshold=0.05050505050505051),
-        ]
+@app.post('/predict/batch')
+def predict_chargedoff_batch(data: List[LoanData]) -> StreamingResponse:
+    X = pd.DataFrame([record.dict() for record in data], columns=LOAN_DATA_COLUMNS)
+    return StreamingResponse(
+        iter_batch_predictions(X, BATCH_CHUNK_SIZE), media_type='application/x-ndjson'
     )
 
-    model_performance_report.run(
-        reference_data=reference_data,
-        current_data=current_data,
-        column_mapping=column_mapping,
+
+@app.post('/predict/batch/file')
+def predict_chargedoff_batch_file(file: UploadFile = File(...)) -> StreamingResponse:
+    X = read_batch_file(file)
+    return StreamingResponse(
+        iter_batch_predictions(X, BATCH_CHUNK_SIZE), media_type='application/x-ndjson'
     )
 
-    report_path = '../reports/model_performance.html'
-    model_performance_report.save_html(report_path)
-    return FileResponse(report_path)
 
+def submit_report(report_type: str, window_size: int, prediction_id: Optional[int]):
+    """Start (or reuse the cached) report job for the current prediction window."""
 
-@app.get('/monitor-target')
-async def monitor_target_drift(window_size: int = 3000) -> FileResponse:
-    current_data = await load_last_predictions(window_size)
-    reference_data = load_data_from_s3(BUCKET_NAME, REFERENCE_DATA_KEY_PATH)
+    served = model_manager.current
 
-    categorical_features = current_data.select_dtypes(
-        include=['object']
-    ).columns.tolist()
-    numerical_features = current_data.select_dtypes(
-        include=['int64', 'float64']
-    ).columns.tolist()
-
-    column_mapping = get_column_mapping(
-        target_col="loan_status",
-        prediction_col="prediction",
-        num_features=numerical_features,
-        cat_features=categorical_features,
-    )
+    async def prepare():
+        current_data = await load_last_predictions(database, window_size)
+        reference_path = await run_in_threadpool(
+            storage.fetch, BUCKET_NAME, REFERENCE_DATA_KEY_PATH
+        )
+        return current_data, reference_path, served.threshold
 
-    target_drift_report = Report(metrics=[TargetDriftPreset()])
-    target_drift_report.run(
-        reference_data=reference_data,
-        current_data=current_data,
-        column_mapping=column_mapping,
-    )
+    key = (report_type, window_size, prediction_id, served.version)
+    return report_service.submit(report_type, key, prepare)
 
-    report_path = '../reports/target_drift.html'
-    target_drift_report.save_html(report_path)
-    return FileResponse(report_path)
+
+@app.post('/reports/{report_type}', status_code=202)
+async def create_report(report_type: str, window_size: int = 3000):
+    if report_type not in REPORT_TYPES:
+        raise HTTPException(status_code=404, detail="Unknown report type")
+    job = submit_report(report_type, window_size, await latest_prediction_id(database))
+    return job.to_dict()
+
+
+@app.get('/reports/jobs/{job_id}')
+def get_report_job(job_id: str):
+    job = report_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired report job")
+    return job.to_dict()
+
+
+@app.get('/reports/jobs/{job_id}/html')
+def get_report_html(job_id: str):
+    job = report_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired report job")
+    if job.status != 'done':
+        return JSONResponse(job.to_dict(), status_code=409)
+    return FileResponse(job.path, media_type='text/html')
+
+
+async def report_response(report_type: str, window_size: int) -> FileResponse:
+    job = submit_report(report_type, window_size, await latest_prediction_id(database))
+    await report_service.wait(job)
+    if job.status != 'done':
+        raise HTTPException(status_code=500, detail=job.error)
+    return FileResponse(job.path, media_type='text/html')
+
+
+# Kept for existing clients; waits for the report without blocking the loop
+@app.get('/monitor-model')
+async def monitor_model_performance(window_size: int = 3000) -> FileResponse:
+    return await report_response('model', window_size)
+
+
+@app.get('/monitor-target')
+async def monitor_target_drift(window_size: int = 3000) -> FileResponse:
+    return await report_response('target', window_size)
 
 
 if __name__ == '__main__':
-    uvicorn.run(app, host='0.0.0.0', port=9696)
+    # Multiple workers need the app as an import string
+    uvicorn.run('app:app', host='0.0.0.0', port=9696, workers=WEB_WORKERS)
@@ -0,0 +1,211 @@
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Tuple, Callable, Optional
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+STOPPED = "Micro-batcher stopped"
+
+# A queued request: (record, future awaiting its model and probability,
+# enqueue time)
+QueueItem = Tuple[Dict[str, Any], asyncio.Future, float]
+
+
+async def collect_batch(
+    queue: asyncio.Queue,
+    max_batch_size: int,
+    max_wait: float,
+    batch: Optional[List[Any]] = None,
+) -> List[Any]:
+    """Wait for one item, then gather more until the batch is full or
+    ``max_wait`` seconds have passed since the first one arrived.
+
+    Items are appended to ``batch`` when one is given, so a caller that is
+    cancelled while collecting still holds the items taken off the queue.
+    """
+    loop = asyncio.get_running_loop()
+    if batch is None:
+        batch = []
+    batch.append(await queue.get())
+    deadline = loop.time() + max_wait
+    while len(batch) < max_batch_size:
+        if not queue.empty():
+            batch.append(queue.get_nowait())
+            continue
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+def fail_pending(batch: List[QueueItem], error: Exception) -> None:
+    """Fail the futures of ``batch`` that have no result yet."""
+    for _, future, _ in batch:
+        if not future.done():
+            future.set_exception(error)
+
+
+class BatchingMetrics:
+    """Queue depth, batch-size histogram and added-latency statistics."""
+
+    def __init__(self, max_batch_size: int, latency_window: int = 10000):
+        # Power-of-two buckets: 1, 2-3, 4-7, ... up to max_batch_size
+        self.max_batch_size = max_batch_size
+        self.bucket_edges = [1]
+        while self.bucket_edges[-1] * 2 <= max_batch_size:
+            self.bucket_edges.append(self.bucket_edges[-1] * 2)
+        self.batch_size_counts = [0] * len(self.bucket_edges)
+        self.added_latencies_ms = deque(maxlen=latency_window)
+        self.n_batches = 0
+        self.n_requests = 0
+
+    def record_batch(self, batch_size: int, added_latencies_ms: List[float]) -> None:
+        bucket = int(np.searchsorted(self.bucket_edges, batch_size, side='right')) - 1
+        self.batch_size_counts[bucket] += 1
+        self.added_latencies_ms.extend(added_latencies_ms)
+        self.n_batches += 1
+        self.n_requests += batch_size
+
+    def snapshot(self, queue_depth: int) -> Dict[str, Any]:
+        """Return the current metrics as a JSON-serializable dict."""
+        histogram = {}
+        for i, lower in enumerate(self.bucket_edges):
+            if i + 1 < len(self.bucket_edges):
+                upper = self.bucket_edges[i + 1] - 1
+            else:
+                upper = self.max_batch_size
+            label = str(lower) if upper == lower else f"{lower}-{upper}"
+            histogram[label] = self.batch_size_counts[i]
+
+        latencies = np.asarray(self.added_latencies_ms)
+        if latencies.size:
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            added_latency = {
+                'p50': float(p50),
+                'p95': float(p95),
+                'p99': float(p99),
+                'max': float(latencies.max()),
+            }
+        else:
+            added_latency = {}
+
+        return {
+            'queue_depth': queue_depth,
+            'batches': self.n_batches,
+            'requests': self.n_requests,
+            'mean_batch_size': (
+                self.n_requests / self.n_batches if self.n_batches else 0
+            ),
+            'batch_size_histogram': histogram,
+            'added_latency_ms': added_latency,
+        }
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-record predictions into batched model calls.
+
+    Requests are queued and collected into a batch until either
+    ``max_batch_size`` records are waiting or ``max_wait_ms`` has elapsed since
+    the first record of the batch arrived. The batch is scored with a single
+    ``predict_fn`` call in the default executor, which returns the model it
+    scored with and the probabilities; each caller receives that model and
+    its own probability. Requests still waiting when the batcher is stopped
+    fail with a ``RuntimeError``.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[pd.DataFrame], Tuple[Any, np.ndarray]],
+        columns: List[str],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        max_queue_size: int = 10000,
+    ):
+        self.predict_fn = predict_fn
+        self.columns = columns
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.metrics = BatchingMetrics(max_batch_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            "Micro-batching enabled (max_batch_size=%d, max_wait_ms=%.1f)",
+            self.max_batch_size,
+            self.max_wait * 1000,
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        while self._queue is not None and not self._queue.empty():
+            fail_pending([self._queue.get_nowait()], RuntimeError(STOPPED))
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, record: Dict[str, Any]) -> Tuple[Any, float]:
+        """Queue a record and wait for the model that scored it and its
+        predicted probability."""
+        if self._task is None:
+            raise RuntimeError("Micro-batcher has not been started")
+        future = asyncio.get_running_loop().create_future()
+        # With max_queue_size requests already waiting to be scored, the request
+        # waits here, so overload shows up as latency rather than memory growth
+        await self._queue.put((record, future, time.perf_counter()))
+        if self._task is None:
+            # Stopped while waiting for room in the queue
+            raise RuntimeError(STOPPED)
+        return await future
+
+    async def _run(self) -> None:
+        batch: List[QueueItem] = []
+        try:
+            while True:
+                batch = []
+                await collect_batch(
+                    self._queue, self.max_batch_size, self.max_wait, batch
+                )
+                await self._score(batch)
+        except asyncio.CancelledError:
+            # Requests being collected or scored would otherwise wait forever
+            fail_pending(batch, RuntimeError(STOPPED))
+            raise
+
+    async def _score(self, batch: List[QueueItem]) -> None:
+        started = time.perf_counter()
+        self.metrics.record_batch(
+            len(batch), [(started - enqueued) * 1000 for _, _, enqueued in batch]
+        )
+
+        X = pd.DataFrame([record for record, _, _ in batch], columns=self.columns)
+        loop = asyncio.get_running_loop()
+        try:
+            model, probabilities = await loop.run_in_executor(None, self.predict_fn, X)
+        except Exception as e:
+            logger.error("Error scoring micro-batch: %s", e)
+            fail_pending(batch, e)
+            return
+
+        for (_, future, _), probability in zip(batch, probabilities):
+            if not future.done():
+                future.set_result((model, float(probability)))
@@ -0,0 +1,127 @@
+import math
+from typing import Any, Dict, Mapping
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from reference_profile import ReferenceProfile
+
+# Floor for bin proportions so empty bins do not make PSI infinite
+MIN_PROPORTION = 1e-4
+
+
+def _proportions(counts: np.ndarray) -> np.ndarray:
+    proportions = np.clip(counts / max(counts.sum(), 1), MIN_PROPORTION, None)
+    return proportions / proportions.sum()
+
+
+def population_stability_index(reference: np.ndarray, current: np.ndarray) -> float:
+    expected, actual = _proportions(reference), _proportions(current)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def binned_ks_test(reference: np.ndarray, current: np.ndarray) -> Dict[str, float]:
+    """Two-sample Kolmogorov-Smirnov test on ordered bin counts."""
+    from scipy import stats  # pylint: disable=import-outside-toplevel
+
+    n_reference, n_current = reference.sum(), current.sum()
+    if n_reference == 0 or n_current == 0:
+        return {'ks_statistic': 0.0, 'ks_p_value': 1.0}
+    statistic = float(
+        np.max(
+            np.abs(np.cumsum(reference) / n_reference - np.cumsum(current) / n_current)
+        )
+    )
+    effective_n = n_reference * n_current / (n_reference + n_current)
+    p_value = float(stats.kstwobign.sf(math.sqrt(effective_n) * statistic))
+    return {'ks_statistic': statistic, 'ks_p_value': p_value}
+
+
+def chi_square_test(reference: np.ndarray, current: np.ndarray) -> Dict[str, float]:
+    """Goodness of fit of the current category counts to the reference."""
+    from scipy import stats  # pylint: disable=import-outside-toplevel
+
+    expected = _proportions(reference) * current.sum()
+    statistic = float(np.sum((current - expected) ** 2 / expected))
+    p_value = float(stats.chi2.sf(statistic, df=max(len(current) - 1, 1)))
+    return {'chi2_statistic': statistic, 'chi2_p_value': p_value}
+
+
+class StreamingDriftMonitor:
+    """Drift scores of a sliding window of predictions against a reference.
+
+    Every logged record updates the per-feature bin counts of the window
+    in O(features), so the scores can be read at any time without rescanning
+    either the window or the reference data. A feature counts as drifted
+    when its PSI exceeds ``psi_threshold``, and the dataset once at least
+    ``drift_share`` of the features have drifted.
+    """
+
+    def __init__(
+        self,
+        profile: ReferenceProfile,
+        window_size: int = 3000,
+        psi_threshold: float = 0.2,
+        drift_share: float = 0.5,
+        min_samples: int = 100,
+    ):
+        self.profile = profile
+        self.window_size = window_size
+        self.psi_threshold = psi_threshold
+        self.drift_share = drift_share
+        self.min_samples = min_samples
+        self.current_counts = [
+            np.zeros(profile.n_bins(feature), dtype=np.int64)
+            for feature in profile.features
+        ]
+        self._window: deque = deque()
+
+    def _add(self, bins: np.ndarray) -> None:
+        if len(self._window) == self.window_size:
+            for counts, evicted in zip(self.current_counts, self._window.popleft()):
+                counts[evicted] -= 1
+        self._window.append(bins)
+        for counts, added in zip(self.current_counts, bins):
+            counts[added] += 1
+
+    def update(self, record: Mapping[str, Any]) -> None:
+        self._add(self.profile.bin_record(record))
+
+    def update_frame(self, df: pd.DataFrame) -> None:
+        """Add the rows of a frame, oldest first, e.g. to warm up the window."""
+        if df.empty:
+            return
+        bins = np.column_stack(
+            [
+                self.profile.bin_column(feature, df[feature])
+                for feature in self.profile.features
+            ]
+        )
+        for row in bins[-self.window_size :]:
+            self._add(row)
+
+    def scores(self) -> Dict[str, Any]:
+        n_current = len(self._window)
+        features = {}
+        if n_current >= self.min_samples:
+            for feature, current in zip(self.profile.features, self.current_counts):
+                reference = self.profile.counts[feature]
+                result = {'psi': population_stability_index(reference, current)}
+                if feature in self.profile.numerical_edges:
+                    # The trailing missing-value bin has no place in the ordering
+                    result.update(binned_ks_test(reference[:-1], current[:-1]))
+                else:
+                    result.update(chi_square_test(reference, current))
+                result['drifted'] = result['psi'] > self.psi_threshold
+                features[feature] = result
+
+        n_drifted = sum(result['drifted'] for result in features.values())
+        share_drifted = n_drifted / len(features) if features else 0.0
+        return {
+            'n_current': n_current,
+            'n_drifted_features': n_drifted,
+            'share_drifted_features': share_drifted,
+            'drift_detected': bool(features) and share_drifted >= self.drift_share,
+            'features': features,
+        }
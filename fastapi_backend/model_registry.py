@@ -0,0 +1,322 @@
+import os
+import json
+import time
+import shutil
+import asyncio
+import hashlib
+import logging
+import tempfile
+from typing import Any, Dict, Tuple, Callable, Optional, Awaitable
+
+import numpy as np
+import pandas as pd
+
+from scorer import LinearScorer, FeatureAssembler, MappedLinearScorer
+from reference_profile import PROFILE_FILENAME, ReferenceProfile
+
+logger = logging.getLogger(__name__)
+
+# Used for models logged before the tuned threshold was stored with them
+DEFAULT_THRESHOLD = 0.5
+
+
+class ServedModel:
+    """A loaded model together with its decision threshold, version and the
+    reference profile of its training data, if one was logged."""
+
+    def __init__(
+        self,
+        model: Any,
+        threshold: float,
+        version: str,
+        profile: Optional[ReferenceProfile] = None,
+    ):
+        self.model = model
+        self.threshold = threshold
+        self.version = version
+        self.profile = profile
+        # Single records are scored without a DataFrame by flattened scorers
+        self.assembler = (
+            FeatureAssembler(model) if isinstance(model, LinearScorer) else None
+        )
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        """Return the charged-off probability for each row of the frame."""
+        return self.model.predict_proba(X)[:, 1]
+
+
+def fetch_artifact(artifact_uri: str, cache_dir: Optional[str] = None) -> str:
+    """Local path of an MLflow artifact, reusing earlier downloads in ``cache_dir``.
+
+    Logged run artifacts do not change, so a cached copy is used without
+    revalidation.
+    """
+    import mlflow  # pylint: disable=import-outside-toplevel
+
+    if not cache_dir:
+        return mlflow.artifacts.download_artifacts(artifact_uri)
+    entry_dir = os.path.join(
+        cache_dir, hashlib.sha256(artifact_uri.encode()).hexdigest()[:32]
+    )
+    path = os.path.join(entry_dir, os.path.basename(artifact_uri.rstrip('/')))
+    if os.path.exists(path):
+        return path
+
+    # Renamed into the cache only once the download is complete, so a worker
+    # never loads a model from a half-written entry
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=cache_dir, prefix='.tmp-')
+    try:
+        mlflow.artifacts.download_artifacts(artifact_uri, dst_path=tmp_dir)
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        # Another worker cached the same artifact in the meantime
+        pass
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return path
+
+
+def map_scorer(scorer_path: str) -> MappedLinearScorer:
+    """Memory-map the scorer artifact at ``scorer_path``.
+
+    The parameter arrays are written next to the artifact by the first
+    worker to load it; later workers attach to the same files.
+    """
+    directory = os.path.join(os.path.dirname(scorer_path), 'scorer_mapped')
+    if not os.path.exists(directory):
+        tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(scorer_path), prefix='.tmp-')
+        try:
+            MappedLinearScorer.write(LinearScorer.load(scorer_path), tmp_dir)
+            os.rename(tmp_dir, directory)
+        except OSError:
+            # Another worker wrote the arrays in the meantime
+            pass
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return MappedLinearScorer(directory)
+
+
+def load_threshold(model_uri: str) -> float:
+    """Read the tuned decision threshold from the logged model metadata."""
+    import mlflow  # pylint: disable=import-outside-toplevel
+
+    metadata = mlflow.models.Model.load(model_uri).metadata or {}
+    if 'threshold' not in metadata:
+        logger.warning(
+            "No threshold in model metadata, using default %s", DEFAULT_THRESHOLD
+        )
+    return float(metadata.get('threshold', DEFAULT_THRESHOLD))
+
+
+def load_profile(
+    artifact_uri: str, cache_dir: Optional[str] = None
+) -> Optional[ReferenceProfile]:
+    """The reference profile logged under a run's artifact URI, if there is one."""
+    try:
+        return ReferenceProfile.load(
+            fetch_artifact(
+                f'{artifact_uri}/reference_profile/{PROFILE_FILENAME}', cache_dir
+            )
+        )
+    except Exception as e:
+        logger.warning("No reference profile logged with the model: %s", e)
+        return None
+
+
+def load_served_model(
+    version: str,
+    artifact_uri: str,
+    model_format: str,
+    cache_dir: Optional[str] = None,
+    shared_weights: bool = False,
+) -> ServedModel:
+    """Load the model or flattened scorer logged under a run's artifact URI,
+    along with the run's reference profile.
+
+    With ``shared_weights`` the scorer parameters are memory-mapped so that
+    all workers on the host share one copy; the sklearn pipeline is always
+    loaded per process.
+    """
+    if model_format == 'scorer':
+        scorer_path = fetch_artifact(f'{artifact_uri}/scorer/scorer.json', cache_dir)
+        model = (
+            map_scorer(scorer_path)
+            if shared_weights
+            else LinearScorer.load(scorer_path)
+        )
+        return ServedModel(
+            model, model.threshold, version, load_profile(artifact_uri, cache_dir)
+        )
+
+    import mlflow.sklearn  # pylint: disable=import-outside-toplevel
+
+    model_path = fetch_artifact(f'{artifact_uri}/model', cache_dir)
+    return ServedModel(
+        mlflow.sklearn.load_model(model_path),
+        load_threshold(model_path),
+        version,
+        load_profile(artifact_uri, cache_dir),
+    )
+
+
+class MlflowRegistrySource:
+    """Latest version of a registered model in the given stage."""
+
+    def __init__(self, name: str, stage: str = 'Production'):
+        self.name = name
+        self.stage = stage
+        from mlflow.tracking import (  # pylint: disable=import-outside-toplevel
+            MlflowClient,
+        )
+
+        self.client = MlflowClient()
+
+    def latest(self) -> Optional[Tuple[str, str]]:
+        versions = self.client.get_latest_versions(self.name, stages=[self.stage])
+        if not versions:
+            return None
+        version = max(versions, key=lambda v: int(v.version))
+        return f'{self.name}/{version.version}', f'runs:/{version.run_id}'
+
+
+class FileRegistrySource:
+    """Local stand-in for the registry: a JSON file naming the model to serve.
+
+    The file holds ``{"version": ..., "artifact_uri": ...}`` where the
+    artifact URI is the root of the run's artifacts.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def latest(self) -> Optional[Tuple[str, str]]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        return str(entry['version']), entry['artifact_uri']
+
+
+def validate_on_canary(served: ServedModel, canary: pd.DataFrame) -> None:
+    """Score the canary batch, which also warms the model, and check the output."""
+    probabilities = np.asarray(served.predict_proba(canary), dtype=float)
+    if probabilities.shape != (len(canary),):
+        raise ValueError(
+            f"Expected {len(canary)} probabilities, got {probabilities.shape}"
+        )
+    if not np.all(np.isfinite(probabilities)):
+        raise ValueError("Non-finite probabilities on the canary batch")
+    if np.any((probabilities < 0) | (probabilities > 1)):
+        raise ValueError("Probabilities outside [0, 1] on the canary batch")
+
+
+class ModelManager:
+    """Serves the current model and swaps in new registry versions in the background.
+
+    A watcher task polls the registry source every ``poll_interval_s``
+    seconds. New versions are loaded and validated on a canary batch in a
+    worker thread, off the request path, and then swapped in with a single
+    reference assignment, so every request sees either the old or the new
+    model. The previous model stays loaded for an instant ``rollback``.
+    ``on_swap`` is called with the newly served model after a swap or
+    rollback.
+    """
+
+    def __init__(
+        self,
+        initial: ServedModel,
+        source: Any,
+        loader: Callable[[str, str], ServedModel],
+        canary_fn: Callable[[], Awaitable[pd.DataFrame]],
+        poll_interval_s: float = 60,
+        on_swap: Optional[Callable[[ServedModel], None]] = None,
+    ):
+        self.current = initial
+        self.previous: Optional[ServedModel] = None
+        self.source = source
+        self.loader = loader
+        self.canary_fn = canary_fn
+        self.poll_interval_s = poll_interval_s
+        self.on_swap = on_swap
+        # Versions that failed validation or were rolled back are not retried
+        self.rejected = set()
+        self.last_check: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval_s)
+            try:
+                await self.check()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error("Error checking the model registry: %s", e)
+
+    async def check(self) -> bool:
+        """Swap in the latest registry version if it is new and valid."""
+        loop = asyncio.get_running_loop()
+        self.last_check = time.time()
+        latest = await loop.run_in_executor(None, self.source.latest)
+        if latest is None:
+            return False
+        version, artifact_uri = latest
+        if version == self.current.version or version in self.rejected:
+            return False
+
+        logger.info("Loading model version %s", version)
+        try:
+            candidate = await loop.run_in_executor(
+                None, self.loader, version, artifact_uri
+            )
+            canary = await self.canary_fn()
+            await loop.run_in_executor(None, validate_on_canary, candidate, canary)
+        except Exception as e:
+            self.rejected.add(version)
+            self.last_error = f"Version {version} rejected: {e}"
+            logger.error(self.last_error)
+            return False
+
+        self.previous, self.current = self.current, candidate
+        self.last_error = None
+        logger.info("Swapped model version %s for %s", self.previous.version, version)
+        self._swapped()
+        return True
+
+    def _swapped(self) -> None:
+        if self.on_swap is not None:
+            self.on_swap(self.current)
+
+    def rollback(self) -> ServedModel:
+        """Serve the previous model again and stop the watcher re-applying this one."""
+        if self.previous is None:
+            raise RuntimeError("No previous model version to roll back to")
+        self.rejected.add(self.current.version)
+        self.current, self.previous = self.previous, self.current
+        logger.info("Rolled back from model version %s", self.previous.version)
+        self._swapped()
+        return self.current
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'version': self.current.version,
+            'threshold': self.current.threshold,
+            'previous_version': self.previous.version if self.previous else None,
+            'rejected_versions': sorted(self.rejected),
+            'last_check': self.last_check,
+            'last_error': self.last_error,
+        }
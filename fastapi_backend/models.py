@@ -53,3 +53,30 @@ class LoanData(BaseModel):
     paid_principal: float
     paid_interest: float
     paid_late_fees: float
+
+
+# Compact pandas dtypes for frames of LoanData records: strings become
+# categoricals, counts int16 and amounts float32, with wider integers where
+# values can exceed the int16 range. Mirrored in src/pipelines/schema.py.
+DEFAULT_DTYPES = {str: 'category', int: 'int16', float: 'float32'}
+DTYPE_OVERRIDES = {
+    'total_credit_limit': 'int32',
+    'total_credit_utilized': 'int32',
+    'total_collection_amount_ever': 'int32',
+    'total_debit_limit': 'int32',
+    'loan_amount': 'int32',
+}
+LOAN_DTYPES = {
+    name: DTYPE_OVERRIDES.get(name, DEFAULT_DTYPES[annotation])
+    for name, annotation in LoanData.__annotations__.items()
+}
+
+# Monitored features, i.e. the LoanData fields other than the target
+CATEGORICAL_FEATURES = [
+    column
+    for column, dtype in LOAN_DTYPES.items()
+    if dtype == 'category' and column != 'loan_status'
+]
+NUMERICAL_FEATURES = [
+    column for column, dtype in LOAN_DTYPES.items() if dtype != 'category'
+]
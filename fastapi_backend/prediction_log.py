@@ -0,0 +1,188 @@
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import (
+    Float,
+    Index,
+    Table,
+    Column,
+    String,
+    Integer,
+    DateTime,
+    MetaData,
+    func,
+    select,
+)
+
+from models import LoanData
+from batching import collect_batch
+
+logger = logging.getLogger(__name__)
+
+COLUMN_TYPES = {str: String, int: Integer, float: Float}
+# pandas dtypes holding any value of those columns; the compact LOAN_DTYPES
+# would wrap integers that the API accepted and the table stored
+COLUMN_DTYPES = {str: 'category', int: 'int32', float: 'float64'}
+
+metadata = MetaData()
+
+# One typed column per LoanData field next to the prediction and its context
+predictions = Table(
+    "predictions",
+    metadata,
+    # Surrogate key: concurrent requests can share a created_at timestamp
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("created_at", DateTime, nullable=False),
+    *[
+        Column(name, COLUMN_TYPES[annotation])
+        for name, annotation in LoanData.__annotations__.items()
+    ],
+    Column("prediction", String),
+    Column("probability", Float),
+    Column("model_version", String),
+    Column("latency_ms", Float),
+    Index("ix_predictions_created_at", "created_at"),
+)
+
+PREDICTION_DTYPES = {
+    'created_at': 'datetime64[ns]',
+    **{
+        name: COLUMN_DTYPES[annotation]
+        for name, annotation in LoanData.__annotations__.items()
+    },
+    'prediction': 'category',
+    'probability': 'float32',
+    'model_version': 'category',
+    'latency_ms': 'float32',
+}
+
+
+async def load_last_predictions(database: Any, window_size: int) -> pd.DataFrame:
+    """Read the most recent logged predictions into a typed frame."""
+    columns = list(PREDICTION_DTYPES)
+    query = (
+        select(*[predictions.c[column] for column in columns])
+        .order_by(predictions.c.created_at.desc())
+        .limit(window_size)
+    )
+    rows = await database.fetch_all(query)
+    records = [tuple(row.values()) for row in rows]
+    return pd.DataFrame.from_records(records, columns=columns).astype(PREDICTION_DTYPES)
+
+
+async def latest_prediction_id(database: Any) -> Optional[int]:
+    return await database.fetch_val(select(func.max(predictions.c.id)))
+
+
+# Queued by stop() to make the writer flush what it has and exit
+_STOP = object()
+
+
+class PredictionLogWriter:
+    """Buffers prediction log rows and inserts them in bulk.
+
+    Rows are written with a single ``executemany`` once ``batch_size`` rows
+    are queued or ``flush_interval_ms`` has passed since the oldest one
+    arrived. The queue is bounded, so ``log`` waits when the database falls
+    behind instead of letting the backlog grow without limit. A batch the
+    database rejects is retried one row at a time, so only the offending
+    rows are dropped.
+    """
+
+    def __init__(
+        self,
+        database: Any,
+        table: Table = predictions,
+        batch_size: int = 500,
+        flush_interval_ms: float = 200,
+        max_queue_size: int = 10000,
+    ):
+        self.database = database
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.n_written = 0
+        self.n_dropped = 0
+        self.n_flushes = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush all queued rows, then stop the writer task."""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def log(self, row: Dict[str, Any]) -> None:
+        if self._task is None:
+            raise RuntimeError("Prediction log writer has not been started")
+        # Waits for the writer to drain the queue when inserts fall behind
+        await self._queue.put(row)
+
+    async def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        try:
+            # Rolled back as a whole on failure, so the retry writes no row twice
+            async with self.database.transaction():
+                await self.database.execute_many(query=self.table.insert(), values=rows)
+        except Exception as e:
+            logger.warning(
+                "Error writing %d prediction log rows, retrying one at a time: %s",
+                len(rows),
+                e,
+            )
+            await self._insert_each(rows)
+            return
+        self.n_written += len(rows)
+        self.n_flushes += 1
+        logger.debug(
+            "Wrote %d prediction log rows in %.1f ms",
+            len(rows),
+            (time.perf_counter() - started) * 1000,
+        )
+
+    async def _insert_each(self, rows: List[Dict[str, Any]]) -> None:
+        n_dropped, error = 0, None
+        for row in rows:
+            try:
+                await self.database.execute(query=self.table.insert(), values=row)
+            except Exception as e:
+                n_dropped, error = n_dropped + 1, e
+        self.n_written += len(rows) - n_dropped
+        self.n_dropped += n_dropped
+        self.n_flushes += 1
+        if n_dropped:
+            logger.error("Dropped %d prediction log rows: %s", n_dropped, error)
+
+    async def _run(self) -> None:
+        stopping = False
+        while not (stopping and self._queue.empty()):
+            batch = await collect_batch(
+                self._queue, self.batch_size, self.flush_interval
+            )
+            stopping = stopping or any(row is _STOP for row in batch)
+            rows = [row for row in batch if row is not _STOP]
+            if rows:
+                await self._flush(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'queue_depth': self.queue_depth,
+            'rows_written': self.n_written,
+            'rows_dropped': self.n_dropped,
+            'flushes': self.n_flushes,
+        }
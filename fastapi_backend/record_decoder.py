@@ -0,0 +1,41 @@
+import json
+from typing import Any, Dict, Optional
+
+from models import LoanData
+
+FIELD_TYPES = dict(LoanData.__annotations__)
+
+
+def _fast_record(payload: Any) -> Optional[Dict[str, Any]]:
+    """The LoanData fields of ``payload`` if every value already has its
+    field's type (or is an int for a float field), else None."""
+    if not isinstance(payload, dict):
+        return None
+    record = {}
+    for name, field_type in FIELD_TYPES.items():
+        value = payload.get(name)
+        value_type = type(value)
+        if value_type is field_type:
+            record[name] = value
+        elif field_type is float and value_type is int:
+            record[name] = float(value)
+        else:
+            return None
+    return record
+
+
+def decode_record(body: bytes) -> Dict[str, Any]:
+    """Decode and validate a /predict request body into a LoanData dict.
+
+    Well-typed bodies, which is what clients send, are checked field by
+    field without building the pydantic model. Anything else, from numeric
+    strings to missing fields or invalid JSON, goes through ``LoanData`` so
+    coercions and validation errors are unchanged.
+    """
+    try:
+        record = _fast_record(json.loads(body))
+    except ValueError:
+        record = None
+    if record is None:
+        return LoanData.parse_raw(body).dict()
+    return record
@@ -0,0 +1,194 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+import multiprocessing
+from typing import Any, Dict, Tuple, Callable, Optional, Awaitable
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+import pandas as pd
+
+from models import NUMERICAL_FEATURES, CATEGORICAL_FEATURES
+
+logger = logging.getLogger(__name__)
+
+REPORT_TYPES = ('model', 'target')
+
+# Parsed reference frames by local path and mtime, per worker process
+_reference_cache: Dict[str, Tuple[int, pd.DataFrame]] = {}
+
+
+def _read_reference(path: str) -> pd.DataFrame:
+    mtime = os.stat(path).st_mtime_ns
+    cached = _reference_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        _reference_cache[path] = (mtime, pd.read_parquet(path))
+    return _reference_cache[path][1]
+
+
+def build_report(
+    report_type: str,
+    current_data: pd.DataFrame,
+    reference_path: str,
+    threshold: float,
+    output_path: str,
+) -> str:
+    """Run an Evidently report and save it as HTML; executed in a worker process."""
+    # pylint: disable=import-outside-toplevel
+    from evidently import ColumnMapping
+    from evidently.report import Report
+    from evidently.metrics import DatasetDriftMetric, DatasetMissingValuesMetric
+    from evidently.metric_preset import TargetDriftPreset, ClassificationPreset
+
+    column_mapping = ColumnMapping()
+    column_mapping.target = "loan_status"
+    column_mapping.prediction = "prediction"
+    column_mapping.numerical_features = NUMERICAL_FEATURES
+    column_mapping.categorical_features = CATEGORICAL_FEATURES
+
+    if report_type == 'model':
+        metrics = [
+            DatasetDriftMetric(),
+            DatasetMissingValuesMetric(),
+            ClassificationPreset(probas_threshold=threshold),
+        ]
+    elif report_type == 'target':
+        metrics = [TargetDriftPreset()]
+    else:
+        raise ValueError(f"Unknown report type: {report_type}")
+
+    report = Report(metrics=metrics)
+    report.run(
+        reference_data=_read_reference(reference_path),
+        current_data=current_data,
+        column_mapping=column_mapping,
+    )
+    report.save_html(output_path)
+    return output_path
+
+
+class ReportJob:
+    """State of one report generation, shared by all requests for its key."""
+
+    def __init__(self, job_id: str, key: Tuple, report_type: str, path: str):
+        self.job_id = job_id
+        self.key = key
+        self.report_type = report_type
+        self.path = path
+        self.status = 'pending'
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        # Updated whenever the job is requested, so a report being served
+        # is not expired under the request
+        self.last_accessed = self.created_at
+        self.task: Optional[asyncio.Task] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'report_type': self.report_type,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class ReportService:
+    """Generates Evidently reports in a worker pool and caches the results.
+
+    Jobs are cached by key, e.g. (report type, window size, latest
+    prediction id, model version), so repeated requests for unchanged data
+    share one report. Finished reports expire once they have not been
+    requested for ``ttl_s`` seconds, and failed ones are retried on the next
+    request.
+    """
+
+    def __init__(
+        self,
+        reports_dir: str,
+        ttl_s: float = 300,
+        executor: Optional[Executor] = None,
+        build_fn: Callable[..., str] = build_report,
+    ):
+        self.reports_dir = reports_dir
+        self.ttl_s = ttl_s
+        # Spawned workers do not inherit the event loop or database connections
+        self.executor = executor or ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context('spawn')
+        )
+        self.build_fn = build_fn
+        self.jobs: Dict[str, ReportJob] = {}
+        self._jobs_by_key: Dict[Tuple, str] = {}
+        os.makedirs(reports_dir, exist_ok=True)
+
+    def _expire(self) -> None:
+        now = time.time()
+        for job in list(self.jobs.values()):
+            if job.finished_at is not None and now - job.last_accessed > self.ttl_s:
+                del self.jobs[job.job_id]
+                if self._jobs_by_key.get(job.key) == job.job_id:
+                    del self._jobs_by_key[job.key]
+                if os.path.exists(job.path):
+                    os.remove(job.path)
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        self._expire()
+        job = self.jobs.get(job_id)
+        if job is not None:
+            job.last_accessed = time.time()
+        return job
+
+    def submit(
+        self,
+        report_type: str,
+        key: Tuple,
+        prepare: Callable[[], Awaitable[Tuple]],
+    ) -> ReportJob:
+        """Return the cached job for ``key`` or start a new one.
+
+        ``prepare`` is awaited only for new jobs and returns the remaining
+        ``build_fn`` arguments (current data, reference path, threshold).
+        """
+        self._expire()
+        job_id = self._jobs_by_key.get(key)
+        if job_id is not None and self.jobs[job_id].status != 'failed':
+            job = self.jobs[job_id]
+            job.last_accessed = time.time()
+            return job
+
+        job_id = uuid.uuid4().hex
+        path = os.path.join(self.reports_dir, f'{report_type}-{job_id}.html')
+        job = ReportJob(job_id, key, report_type, path)
+        self.jobs[job_id] = job
+        self._jobs_by_key[key] = job_id
+        job.task = asyncio.create_task(self._run(job, prepare))
+        return job
+
+    async def _run(
+        self, job: ReportJob, prepare: Callable[[], Awaitable[Tuple]]
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            args = await prepare()
+            job.status = 'running'
+            await loop.run_in_executor(
+                self.executor, self.build_fn, job.report_type, *args, job.path
+            )
+            job.status = 'done'
+        except Exception as e:
+            logger.error("Error generating %s report: %s", job.report_type, e)
+            job.status = 'failed'
+            job.error = str(e)
+        job.finished_at = time.time()
+
+    async def wait(self, job: ReportJob) -> ReportJob:
+        if job.task is not None:
+            await asyncio.shield(job.task)
+        job.last_accessed = time.time()
+        return job
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
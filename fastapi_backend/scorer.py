@@ -0,0 +1,180 @@
+import os
+import json
+from typing import Any, Dict, Union, Mapping
+
+import numpy as np
+import pandas as pd
+
+Records = Union[pd.DataFrame, np.ndarray, Mapping[str, Any]]
+
+MAPPED_META_FILENAME = 'scorer.json'
+
+
+class LinearScorer:
+    """NumPy evaluation of a logistic regression pipeline flattened by
+    ``src/pipelines/export_scorer.py``.
+
+    Accepts a single record dict, a DataFrame, a NumPy record array or a
+    mapping of column name to values, and mirrors the ``predict`` and
+    ``predict_proba`` interface of the sklearn pipeline it was exported from.
+    Categories missing from a column's lookup get the column's default
+    weight, that of its infrequent categories, or zero.
+    """
+
+    def __init__(self, artifact: Dict[str, Any]):
+        self.numerical_features = artifact['numerical_features']
+        self.numerical_weights = np.asanyarray(
+            artifact['numerical_weights'], dtype=float
+        )
+        self.categorical_weights = artifact['categorical_weights']
+        self.categorical_defaults = artifact.get('categorical_defaults', {})
+        self.intercept = artifact['intercept']
+        self.threshold = artifact['threshold']
+
+    @classmethod
+    def load(cls, path: str) -> "LinearScorer":
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def decision_function(self, X: Records) -> np.ndarray:
+        if isinstance(X, Mapping):
+            # A single record dict is scored as a one-row batch
+            if np.ndim(next(iter(X.values()))) == 0:
+                X = {column: [value] for column, value in X.items()}
+            n_rows = len(next(iter(X.values())))
+        else:
+            n_rows = len(X)
+
+        scores = np.full(n_rows, self.intercept)
+        if self.numerical_features:
+            numerical = np.column_stack(
+                [
+                    np.asarray(X[column], dtype=float)
+                    for column in self.numerical_features
+                ]
+            )
+            scores += numerical @ self.numerical_weights
+
+        for column in self.categorical_weights:
+            scores += self._category_weights(column, X[column], n_rows)
+        return scores
+
+    def _category_weights(self, column: str, values: Any, n_rows: int) -> np.ndarray:
+        lookup = self.categorical_weights[column]
+        default = self.categorical_defaults.get(column, 0.0)
+        if isinstance(values, pd.Series):
+            return values.map(lookup).to_numpy(dtype=float, na_value=default)
+        return np.fromiter(
+            (lookup.get(value, default) for value in values), float, n_rows
+        )
+
+    def category_weight(self, column: str, value: Any) -> float:
+        return self.categorical_weights[column].get(
+            value, self.categorical_defaults.get(column, 0.0)
+        )
+
+    def predict_proba(self, X: Records) -> np.ndarray:
+        # Numerically stable logistic sigmoid
+        probabilities = np.exp(-np.logaddexp(0, -self.decision_function(X)))
+        return np.column_stack([1 - probabilities, probabilities])
+
+    def predict(self, X: Records) -> np.ndarray:
+        return (self.decision_function(X) > 0).astype(int)
+
+
+class MappedLinearScorer(LinearScorer):
+    """``LinearScorer`` over parameter arrays memory-mapped from ``.npy`` files.
+
+    Worker processes that open the same directory share a single read-only
+    copy of the weights and category tables through the page cache, instead
+    of each holding its own. Categories are stored sorted and looked up with
+    a binary search.
+    """
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, MAPPED_META_FILENAME), encoding='utf-8') as f:
+            meta = json.load(f)
+        meta['numerical_weights'] = self._load(directory, 'numerical_weights')
+        meta['categorical_weights'] = {
+            column: (
+                self._load(directory, f'categories_{i}'),
+                self._load(directory, f'weights_{i}'),
+            )
+            for i, column in enumerate(meta['categorical_features'])
+        }
+        super().__init__(meta)
+
+    @staticmethod
+    def _load(directory: str, name: str) -> np.ndarray:
+        return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+
+    @staticmethod
+    def write(scorer: LinearScorer, directory: str) -> None:
+        """Save the parameters of ``scorer`` in the layout read by this class."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(
+            os.path.join(directory, 'numerical_weights.npy'),
+            np.asarray(scorer.numerical_weights, dtype=float),
+        )
+        for i, lookup in enumerate(scorer.categorical_weights.values()):
+            categories = np.array(sorted(lookup), dtype=str)
+            np.save(os.path.join(directory, f'categories_{i}.npy'), categories)
+            np.save(
+                os.path.join(directory, f'weights_{i}.npy'),
+                np.array([lookup[category] for category in categories], dtype=float),
+            )
+        meta = {
+            'numerical_features': scorer.numerical_features,
+            'categorical_features': list(scorer.categorical_weights),
+            'categorical_defaults': scorer.categorical_defaults,
+            'intercept': scorer.intercept,
+            'threshold': scorer.threshold,
+        }
+        with open(
+            os.path.join(directory, MAPPED_META_FILENAME), 'w', encoding='utf-8'
+        ) as f:
+            json.dump(meta, f)
+
+    def category_weight(self, column: str, value: Any) -> float:
+        categories, weights = self.categorical_weights[column]
+        index = int(np.searchsorted(categories, value))
+        if index < categories.size and categories[index] == value:
+            return float(weights[index])
+        return self.categorical_defaults.get(column, 0.0)
+
+    def _category_weights(self, column: str, values: Any, n_rows: int) -> np.ndarray:
+        categories, weights = self.categorical_weights[column]
+        default = self.categorical_defaults.get(column, 0.0)
+        if not categories.size:
+            return np.full(n_rows, default)
+        values = np.asarray(values, dtype=str)
+        index = np.minimum(np.searchsorted(categories, values), categories.size - 1)
+        return np.where(categories[index] == values, weights[index], default)
+
+
+class FeatureAssembler:
+    """Scores single records with a ``LinearScorer`` without building a frame.
+
+    The record's numerical values and category weights are written into
+    vectors preallocated in the scorer's column order, so a request costs a
+    few dict lookups and one dot product. Not thread-safe: call it from the
+    event loop only.
+    """
+
+    def __init__(self, scorer: LinearScorer):
+        self.scorer = scorer
+        self.numerical = np.zeros(len(scorer.numerical_features))
+        self.categorical = np.zeros(len(scorer.categorical_weights))
+
+    def predict_proba(self, record: Mapping[str, Any]) -> float:
+        scorer = self.scorer
+        for i, column in enumerate(scorer.numerical_features):
+            self.numerical[i] = record[column]
+        for i, column in enumerate(scorer.categorical_weights):
+            self.categorical[i] = scorer.category_weight(column, record[column])
+        score = (
+            scorer.intercept
+            + self.numerical @ scorer.numerical_weights
+            + self.categorical.sum()
+        )
+        return float(np.exp(-np.logaddexp(0, -score)))
@@ -1,19 +1,26 @@
 import os
 import json
 import datetime
+from typing import Any, Dict, Optional
 
 import boto3
 import httpx
 import pandas as pd
 from prefect import flow, task, get_run_logger
 from databases import Database
-from sqlalchemy import Table, Column, String, DateTime, MetaData
 from evidently.tabs import DataDriftTab
 from prefect.schedules import IntervalSchedule
 from evidently.dashboard import Dashboard
 
+from prediction_window import load_last_predictions
+
 logger = get_run_logger()
 
+FASTAPI_APP_HOST = os.environ.get("FASTAPI_APP_HOST", "fastapi_app")
+# 'streaming' reads the backend's incremental drift scores, 'evidently'
+# recomputes a data drift report over the prediction window
+DRIFT_METHOD = os.environ.get("DRIFT_METHOD", "streaming")
+
 
 # Set up a connection to the Postgres RDS instance.
 # Get the RDS instance information, including the endpoint
@@ -46,32 +53,12 @@ DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{RDS_ENDPOINT}:5432/fastap
 
 
 database = Database(DATABASE_URL)
-metadata = MetaData()
-
-predictions = Table(
-    "predictions",
-    metadata,
-    Column("created_at", DateTime, primary_key=True),
-    Column("input", String),
-    Column("output", String),
-)
-
-
-# Function to fetch the last predictions from the database
-async def load_last_predictions(window_size: int) -> pd.DataFrame:
-    query = (
-        predictions.select()
-        .order_by(predictions.c.created_at.desc())
-        .limit(window_size)
-    )
-    rows = await database.fetch_all(query)
-    return pd.DataFrame(rows)
 
 
 @task
-async def load_current_data(window_size: int) -> pd.DataFrame:
+async def load_current_data(window_size: int, dtypes: Dict[str, Any]) -> pd.DataFrame:
     current_data = await load_last_predictions(
-        window_size
+        database, window_size, dtypes
     )  # Fetch current data from the database
     return current_data
 
@@ -89,19 +76,23 @@ def load_data_from_s3(bucket_name, key_path):
 
 @task
 def detect_drift(reference_data: pd.DataFrame, current_data: pd.DataFrame) -> bool:
+    # The logged loan_status is the submitted text, not the reference's 0/1
+    # label, so only the loan features are compared
     column_mapping = {
-        'numerical_features': reference_data.select_dtypes(
-            include=['int64', 'float64']
+        'numerical_features': current_data.select_dtypes(
+            include=['number']
         ).columns.tolist(),
-        'categorical_features': reference_data.select_dtypes(
-            include=['object']
+        'categorical_features': current_data.select_dtypes(
+            include=['category']
         ).columns.tolist(),
-        'target': 'loan_status',
+        'target': None,
     }
 
     data_drift_dashboard = Dashboard(tabs=[DataDriftTab])
     data_drift_dashboard.calculate(
-        reference_data, current_data, column_mapping=column_mapping
+        reference_data[current_data.columns],
+        current_data,
+        column_mapping=column_mapping,
     )
     drift_detected = (
         data_drift_dashboard.get_by_tab_name("Data Drift").get_metrics()["data_drift"][
@@ -112,6 +103,22 @@ def detect_drift(reference_data: pd.DataFrame, current_data: pd.DataFrame) -> bo
     return drift_detected
 
 
+@task
+def fetch_streaming_drift() -> bool:
+    """Read the drift scores the backend maintains as predictions arrive."""
+    try:
+        response = httpx.get(f"http://{FASTAPI_APP_HOST}:9696/metrics/drift")
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        raise RuntimeError(f"Error fetching drift scores: {e}") from e
+    scores = response.json()
+    logger.info(
+        f"{scores['n_drifted_features']} drifted features over "
+        f"{scores['n_current']} predictions"
+    )
+    return scores['drift_detected']
+
+
 @task
 def run_training_pipeline():
     try:
@@ -120,14 +127,25 @@ def run_training_pipeline():
         response.raise_for_status()
     except httpx.HTTPError as e:
         raise RuntimeError(f"Error triggering training: {e}") from e
+    # Training runs in the background; its status is at /training-jobs/<job_id>
+    job = response.json()
+    if job['deduplicated']:
+        logger.info(f"Training job {job['job_id']} is already {job['status']}")
+    else:
+        logger.info(f"Queued training job {job['job_id']}")
 
 
 @flow
 def drift_detection_and_retraining(
-    reference_data: pd.DataFrame, database_window_size: int
+    reference_data: Optional[pd.DataFrame], database_window_size: int
 ):
-    current_data = load_current_data(database_window_size)
-    drift = detect_drift(reference_data, current_data)
+    if DRIFT_METHOD == 'streaming':
+        drift = fetch_streaming_drift()
+    else:
+        current_data = load_current_data(
+            database_window_size, reference_data.dtypes.to_dict()
+        )
+        drift = detect_drift(reference_data, current_data)
     if drift:
         run_training_pipeline()
 
@@ -138,8 +156,13 @@ def main():
         "REFERENCE_DATA_KEY_PATH", "default_reference_data_key_path"
     )
 
-    # Load reference data using the load_data_from_s3 function
-    reference_data = load_data_from_s3(ARTIFACT_BUCKET_NAME, REFERENCE_DATA_KEY_PATH)
+    # The streaming path compares against the backend's reference profile, so
+    # the raw reference rows are only needed for the Evidently dashboard
+    reference_data = (
+        load_data_from_s3(ARTIFACT_BUCKET_NAME, REFERENCE_DATA_KEY_PATH)
+        if DRIFT_METHOD == 'evidently'
+        else None
+    )
 
     schedule = IntervalSchedule(
         start_date=datetime.datetime.utcnow() + datetime.timedelta(seconds=1),
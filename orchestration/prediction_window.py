@@ -0,0 +1,51 @@
+from typing import Any, Dict
+
+import pandas as pd
+from sqlalchemy import table, column, select
+
+# Logged with every prediction by the FastAPI backend but not model inputs:
+# loan_status is stored as the submitted text, not the reference's 0/1 label
+NON_FEATURE_COLUMNS = {
+    'id',
+    'created_at',
+    'loan_status',
+    'prediction',
+    'probability',
+    'model_version',
+    'latency_ms',
+}
+
+
+def feature_dtypes(reference_dtypes: Dict[str, Any]) -> Dict[str, str]:
+    """Dtypes to read the logged loan features with, from the reference data's.
+
+    Categorical features get a plain ``'category'``, so categories missing
+    from the reference data are kept rather than turned into NaN, and
+    numerical ones a width that fits any value of the table's columns.
+    """
+    return {
+        name: 'float64' if pd.api.types.is_numeric_dtype(dtype) else 'category'
+        for name, dtype in reference_dtypes.items()
+        if name not in NON_FEATURE_COLUMNS
+    }
+
+
+async def load_last_predictions(
+    database: Any, window_size: int, reference_dtypes: Dict[str, Any]
+) -> pd.DataFrame:
+    """Read the loan features of the most recent predictions into a typed frame.
+
+    The orchestration image does not ship the backend's ``prediction_log``
+    module, so the features are those of the reference data.
+    """
+    dtypes = feature_dtypes(reference_dtypes)
+    columns = list(dtypes)
+    query = (
+        select(*[column(name) for name in columns])
+        .select_from(table('predictions'))
+        .order_by(column('created_at').desc())
+        .limit(window_size)
+    )
+    rows = await database.fetch_all(query)
+    records = [tuple(row.values()) for row in rows]
+    return pd.DataFrame.from_records(records, columns=columns).astype(dtypes)
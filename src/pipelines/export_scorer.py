@@ -0,0 +1,114 @@
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from sklearn.pipeline import Pipeline
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+
+def _scaler_weights(scaler: StandardScaler, coef: np.ndarray) -> Dict[str, np.ndarray]:
+    """Fold the scaler statistics into the coefficients of its columns."""
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones_like(coef)
+    weights = coef / scale
+    mean = scaler.mean_ if scaler.with_mean else np.zeros_like(coef)
+    return {'weights': weights, 'intercept_shift': -float(np.dot(weights, mean))}
+
+
+def encoder_categories(encoder: OneHotEncoder) -> List[Tuple[List[Any], bool]]:
+    """Per feature of a fitted encoder, the categories with their own output
+    column and whether an infrequent-categories column follows them."""
+    infrequent = getattr(encoder, 'infrequent_categories_', None)
+    if infrequent is None:
+        infrequent = [None] * len(encoder.categories_)
+    features = []
+    for categories, rare in zip(encoder.categories_, infrequent):
+        if rare is None:
+            features.append((list(categories), False))
+        else:
+            rare = set(rare)
+            features.append(([c for c in categories if c not in rare], True))
+    return features
+
+
+def _export_scaler(
+    scaler: StandardScaler, columns: List[str], coef: np.ndarray, artifact: Dict
+) -> int:
+    """Add the non-zero numerical weights of a scaler's columns to ``artifact``
+    and return the number of coefficients they take."""
+    folded = _scaler_weights(scaler, coef[: len(columns)])
+    artifact['intercept'] += folded['intercept_shift']
+    for column, weight in zip(columns, folded['weights']):
+        if weight != 0:
+            artifact['numerical_features'].append(column)
+            artifact['numerical_weights'].append(float(weight))
+    return len(columns)
+
+
+def _export_encoder(
+    encoder: OneHotEncoder, columns: List[str], coef: np.ndarray, artifact: Dict
+) -> int:
+    """Add the category lookups and infrequent-category defaults of a one-hot
+    encoder's columns to ``artifact`` and return the number of coefficients
+    they take."""
+    offset = 0
+    for column, (categories, has_infrequent) in zip(
+        columns, encoder_categories(encoder)
+    ):
+        weights = coef[offset : offset + len(categories)]
+        offset += len(categories)
+        default = 0.0
+        if has_infrequent:
+            default = float(coef[offset])
+            offset += 1
+        lookup = {
+            str(category): float(weight)
+            for category, weight in zip(categories, weights)
+            if weight != default
+        }
+        if lookup or default:
+            artifact['categorical_weights'][column] = lookup
+        if default:
+            artifact['categorical_defaults'][column] = default
+    return offset
+
+
+def export_linear_scorer(pipeline: Pipeline, threshold: float) -> Dict[str, Any]:
+    """Flatten a fitted scaler/one-hot/logistic-regression pipeline.
+
+    Scaler statistics are folded into the numerical weights, one-hot columns
+    become per-category weight lookups and features with a zero coefficient
+    (common under L1 regularization) are dropped. The weight of an encoder's
+    infrequent-categories column becomes the column's default, which also
+    applies to categories unseen in training. The result is JSON
+    serializable and is evaluated by ``LinearScorer`` in the FastAPI backend.
+    """
+    preprocessor, classifier = pipeline.steps[0][1], pipeline.steps[-1][1]
+    if not isinstance(preprocessor, ColumnTransformer) or len(pipeline.steps) != 2:
+        raise ValueError("Expected a (ColumnTransformer, classifier) pipeline")
+
+    coef = classifier.coef_.ravel()
+    artifact: Dict[str, Any] = {
+        'numerical_features': [],
+        'numerical_weights': [],
+        'categorical_weights': {},
+        'categorical_defaults': {},
+        'intercept': float(classifier.intercept_[0]),
+        'threshold': float(threshold),
+    }
+
+    offset = 0
+    for _, transformer, columns in preprocessor.transformers_:
+        if transformer == 'drop':
+            continue
+        if isinstance(transformer, StandardScaler):
+            offset += _export_scaler(transformer, columns, coef[offset:], artifact)
+        elif isinstance(transformer, OneHotEncoder) and transformer.drop is None:
+            offset += _export_encoder(transformer, columns, coef[offset:], artifact)
+        else:
+            raise ValueError(f"Unsupported transformer: {transformer!r}")
+
+    if offset != coef.size:
+        raise ValueError(
+            f"Transformer output width {offset} does not match {coef.size} coefficients"
+        )
+    return artifact
@@ -0,0 +1,252 @@
+import time
+import logging
+from typing import Any, Dict, List, Tuple, Optional
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import mlflow
+import pandas as pd
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.metrics import average_precision_score
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+
+from preprocessing_cache import (
+    PreprocessingCache,
+    make_cache_key,
+    data_fingerprint,
+    transformer_config,
+)
+
+logger = logging.getLogger(__name__)
+
+# (X_train, y_train, X_val, y_val) with the fold's preprocessor already applied
+Fold = Tuple[sparse.spmatrix, np.ndarray, sparse.spmatrix, np.ndarray]
+FOLD_PARTS = ('X_train', 'y_train', 'X_val', 'y_val')
+
+# Transformed folds, set once per worker process by _init_worker
+_FOLDS: List[Fold] = []
+
+
+def _init_worker(folds: List[Fold]) -> None:
+    global _FOLDS  # pylint: disable=global-statement
+    _FOLDS = folds
+
+
+def _evaluate_candidate(params: Dict[str, Any], n_rows: Optional[int]) -> float:
+    """Mean validation average precision over the cached folds."""
+    scores = []
+    for X_train, y_train, X_val, y_val in _FOLDS:
+        classifier = LogisticRegression(**params)
+        classifier.fit(X_train[:n_rows], y_train[:n_rows])
+        scores.append(
+            average_precision_score(y_val, classifier.predict_proba(X_val)[:, 1])
+        )
+    return float(np.mean(scores))
+
+
+def build_folds(
+    preprocessor: Any,
+    X: pd.DataFrame,
+    y: pd.Series,
+    n_folds: int = 3,
+    random_state: int = 42,
+    cache: Optional[PreprocessingCache] = None,
+) -> List[Fold]:
+    """Fit the preprocessor once per fold and keep the transformed matrices.
+
+    Training rows of each fold are shuffled so that successive halving can
+    take a prefix as a random subsample.
+    """
+    if cache is not None:
+        key = make_cache_key(
+            'folds',
+            data_fingerprint(X, y),
+            transformer_config(preprocessor),
+            n_folds,
+            random_state,
+        )
+        entry = cache.get(key)
+        if entry is not None:
+            return [
+                tuple(entry[f'fold{i}_{part}'] for part in FOLD_PARTS)
+                for i in range(n_folds)
+            ]
+
+    rng = np.random.default_rng(random_state)
+    y = np.asarray(y)
+    folds = []
+    splitter = StratifiedKFold(
+        n_splits=n_folds, shuffle=True, random_state=random_state
+    )
+    for train_idx, val_idx in splitter.split(X, y):
+        train_idx = rng.permutation(train_idx)
+        fold_preprocessor = clone(preprocessor).fit(X.iloc[train_idx])
+        folds.append(
+            (
+                sparse.csr_matrix(fold_preprocessor.transform(X.iloc[train_idx])),
+                y[train_idx],
+                sparse.csr_matrix(fold_preprocessor.transform(X.iloc[val_idx])),
+                y[val_idx],
+            )
+        )
+
+    if cache is not None:
+        cache.put(
+            key,
+            {
+                f'fold{i}_{part}': value
+                for i, fold in enumerate(folds)
+                for part, value in zip(FOLD_PARTS, fold)
+            },
+        )
+    return folds
+
+
+def generate_candidates(
+    strategy: str,
+    n_candidates: int,
+    c_range: Tuple[float, float] = (1e-3, 10.0),
+    penalties: Tuple[str, ...] = ('l1', 'l2'),
+    random_state: int = 42,
+) -> List[Dict[str, Any]]:
+    """Log-spaced (grid) or log-uniform (random/halving) C values per penalty."""
+    n_per_penalty = max(1, n_candidates // len(penalties))
+    log_low, log_high = np.log10(c_range[0]), np.log10(c_range[1])
+    if strategy == 'grid':
+        c_values = np.logspace(log_low, log_high, n_per_penalty)
+    elif strategy in ('random', 'halving'):
+        rng = np.random.default_rng(random_state)
+        c_values = 10 ** rng.uniform(log_low, log_high, n_per_penalty)
+    else:
+        raise ValueError(f"Unknown search strategy: {strategy}")
+    return [{'C': float(c), 'penalty': p} for p in penalties for c in c_values]
+
+
+class HyperparameterSearch:
+    """Search C and penalty of the logistic regression across a process pool.
+
+    Every trial is logged as a nested MLflow run under a parent search run.
+    Once ``time_budget_s`` is spent, pending trials are cancelled, running
+    ones are abandoned without waiting for them, and the best candidate
+    evaluated so far is returned.
+    """
+
+    def __init__(
+        self,
+        base_params: Dict[str, Any],
+        strategy: str = 'random',
+        n_candidates: int = 20,
+        n_folds: int = 3,
+        time_budget_s: float = 1800,
+        n_jobs: Optional[int] = None,
+        eta: int = 3,
+        random_state: int = 42,
+        cache: Optional[PreprocessingCache] = None,
+    ):
+        self.base_params = base_params
+        self.strategy = strategy
+        self.n_candidates = n_candidates
+        self.n_folds = n_folds
+        self.time_budget_s = time_budget_s
+        self.n_jobs = n_jobs
+        self.eta = eta
+        self.random_state = random_state
+        self.cache = cache
+
+    def run(
+        self, preprocessor: Any, X_train: pd.DataFrame, y_train: pd.Series
+    ) -> Dict[str, Any]:
+        """Return the base parameters updated with the best C and penalty."""
+        deadline = time.monotonic() + self.time_budget_s
+        folds = build_folds(
+            preprocessor,
+            X_train,
+            y_train,
+            self.n_folds,
+            self.random_state,
+            self.cache,
+        )
+        candidates = generate_candidates(
+            self.strategy, self.n_candidates, random_state=self.random_state
+        )
+
+        pool = ProcessPoolExecutor(
+            max_workers=self.n_jobs, initializer=_init_worker, initargs=(folds,)
+        )
+        try:
+            with mlflow.start_run(run_name=f'{self.strategy}-search'):
+                if self.strategy == 'halving':
+                    results = self._successive_halving(
+                        pool, candidates, folds, deadline
+                    )
+                else:
+                    results = self._evaluate(pool, candidates, None, deadline)
+
+                if not results:
+                    logger.warning("No search trial finished within the time budget")
+                    return self.base_params
+                best_params, best_score = max(results, key=lambda result: result[1])
+                mlflow.log_params({f'best_{k}': v for k, v in best_params.items()})
+                mlflow.log_metric('best_cv_average_precision', best_score)
+        finally:
+            # Leaving the pool's context would wait for trials still running
+            # past the deadline
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        logger.info("Best hyperparameters %s (score %.4f)", best_params, best_score)
+        return {**self.base_params, **best_params}
+
+    def _evaluate(
+        self,
+        pool: ProcessPoolExecutor,
+        candidates: List[Dict[str, Any]],
+        n_rows: Optional[int],
+        deadline: float,
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        futures = {
+            pool.submit(_evaluate_candidate, {**self.base_params, **c}, n_rows): c
+            for c in candidates
+        }
+        results = []
+        try:
+            for future in as_completed(futures, timeout=deadline - time.monotonic()):
+                candidate = futures[future]
+                try:
+                    score = future.result()
+                except ValueError as e:
+                    # e.g. a halving subsample containing a single class
+                    logger.warning("Trial %s failed: %s", candidate, e)
+                    continue
+                results.append((candidate, score))
+                with mlflow.start_run(nested=True):
+                    mlflow.log_params({**candidate, 'n_rows': n_rows or 'all'})
+                    mlflow.log_metric('cv_average_precision', score)
+        except FuturesTimeoutError:
+            logger.warning("Search time budget exhausted, cancelling pending trials")
+            for future in futures:
+                future.cancel()
+        return results
+
+    def _successive_halving(
+        self,
+        pool: ProcessPoolExecutor,
+        candidates: List[Dict[str, Any]],
+        folds: List[Fold],
+        deadline: float,
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """Evaluate on growing subsamples, keeping the top 1/eta each rung."""
+        n_rungs = max(1, int(np.ceil(np.log(len(candidates)) / np.log(self.eta))))
+        n_train = min(fold[0].shape[0] for fold in folds)
+        results: List[Tuple[Dict[str, Any], float]] = []
+        for rung in range(n_rungs):
+            n_rows = int(n_train / self.eta ** (n_rungs - 1 - rung))
+            rung_results = self._evaluate(pool, candidates, n_rows, deadline)
+            if not rung_results:
+                break
+            results = rung_results
+            ranked = sorted(results, key=lambda result: result[1], reverse=True)
+            candidates = [c for c, _ in ranked[: max(1, len(ranked) // self.eta)]]
+        return results
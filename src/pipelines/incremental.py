@@ -0,0 +1,215 @@
+import os
+import copy
+import json
+from typing import Any, Dict, List, Tuple, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+RESERVOIR_ROWS_FILENAME = 'reservoir.parquet'
+RESERVOIR_STATE_FILENAME = 'reservoir.json'
+
+# saga supports warm starts with both L1 and L2 penalties, liblinear does not
+WARM_START_PARAMS = {'solver': 'saga', 'warm_start': True, 'max_iter': 1000}
+# Regularization of a base LogisticRegression that its continuation keeps
+CONTINUED_PARAMS = ('C', 'penalty', 'l1_ratio')
+
+
+class ReservoirSample:
+    """Uniform sample of at most ``capacity`` rows from every row seen so far.
+
+    Rows arrive in batches; each of the ``n_seen`` rows has the same chance
+    of being in the sample (Algorithm R). The random draws are seeded by
+    ``seed`` and ``n_seen``, so updates are reproducible.
+    """
+
+    def __init__(self, capacity: int, seed: int = 42):
+        self.capacity = capacity
+        self.seed = seed
+        self.n_seen = 0
+        self.rows = pd.DataFrame()
+
+    def update(self, df: pd.DataFrame) -> None:
+        n_rows, n_new = len(self.rows), len(df)
+        # Rows that fit in the free slots are always kept
+        n_fill = min(n_new, self.capacity - n_rows)
+        take = np.arange(n_rows + n_fill)
+
+        rng = np.random.default_rng([self.seed, self.n_seen])
+        positions = self.n_seen + np.arange(n_fill, n_new)
+        slots = rng.integers(0, positions + 1)
+        replaced = np.flatnonzero(slots < self.capacity)
+        # A slot drawn more than once keeps the latest row
+        _, last = np.unique(slots[replaced][::-1], return_index=True)
+        replaced = replaced[::-1][last]
+        take[slots[replaced]] = n_rows + n_fill + replaced
+
+        combined = pd.concat([self.rows, df], ignore_index=True) if n_rows else df
+        self.rows = combined.iloc[take].reset_index(drop=True)
+        self.n_seen += n_new
+
+    def save(self, directory: str) -> None:
+        self.rows.to_parquet(os.path.join(directory, RESERVOIR_ROWS_FILENAME))
+        state = {'capacity': self.capacity, 'seed': self.seed, 'n_seen': self.n_seen}
+        with open(
+            os.path.join(directory, RESERVOIR_STATE_FILENAME), 'w', encoding='utf-8'
+        ) as f:
+            json.dump(state, f)
+
+    @classmethod
+    def load(cls, directory: str) -> "ReservoirSample":
+        with open(
+            os.path.join(directory, RESERVOIR_STATE_FILENAME), encoding='utf-8'
+        ) as f:
+            state = json.load(f)
+        reservoir = cls(state['capacity'], state['seed'])
+        reservoir.n_seen = state['n_seen']
+        reservoir.rows = pd.read_parquet(
+            os.path.join(directory, RESERVOIR_ROWS_FILENAME)
+        )
+        return reservoir
+
+
+def _extend_categories(
+    known: np.ndarray, values: pd.Series, weights: np.ndarray
+) -> Tuple[List[Any], np.ndarray]:
+    """Append the categories of ``values`` missing from ``known``, with zero
+    weights. A missing-value category stays last, as OneHotEncoder requires."""
+    known = list(known)
+    missing = known[-1:] if known and pd.isna(known[-1]) else []
+    present = known[: len(known) - len(missing)]
+    new = sorted(set(values.dropna().unique()) - set(present))
+    n_present = len(present)
+    extended_weights = np.concatenate(
+        [weights[:n_present], np.zeros(len(new)), weights[n_present:]]
+    )
+    return present + new + missing, extended_weights
+
+
+def _extend_scaler(
+    scaler: StandardScaler, X: pd.DataFrame, coef: np.ndarray
+) -> Tuple[StandardScaler, np.ndarray, float]:
+    """Scaler updated with ``X``, its coefficients rescaled for the update and
+    the intercept shift that compensates a centred scaler's moved mean."""
+    updated = copy.deepcopy(scaler).partial_fit(X)
+    weights = coef
+    if scaler.scale_ is not None:
+        weights = coef * updated.scale_ / scaler.scale_
+    shift = 0.0
+    if scaler.with_mean:
+        moved = updated.mean_ - scaler.mean_
+        if updated.scale_ is not None:
+            moved = moved / updated.scale_
+        shift = float(np.dot(weights, moved))
+    return updated, weights, shift
+
+
+def _is_frequency_capped(encoder: OneHotEncoder) -> bool:
+    return encoder.min_frequency is not None or encoder.max_categories is not None
+
+
+def _extend_encoder(
+    encoder: OneHotEncoder, X: pd.DataFrame, coef: np.ndarray
+) -> Tuple[OneHotEncoder, np.ndarray]:
+    """Unfitted encoder whose vocabularies include the new categories of
+    ``X``, with the coefficients laid out for them."""
+    categories, weights = [], []
+    offset = 0
+    for column, known in zip(X.columns, encoder.categories_):
+        extended, column_weights = _extend_categories(
+            known, X[column], coef[offset : offset + len(known)]
+        )
+        categories.append(extended)
+        weights.append(column_weights)
+        offset += len(known)
+    return clone(encoder).set_params(categories=categories), np.concatenate(weights)
+
+
+def _extend_transformer(
+    transformer: Any, X: pd.DataFrame, coef: np.ndarray
+) -> Tuple[Any, Optional[Any], np.ndarray, float]:
+    """Unfitted transformer to fit on the new data, the fitted one to keep
+    instead (if any), its coefficients and the intercept shift."""
+    if isinstance(transformer, StandardScaler):
+        scaler, weights, shift = _extend_scaler(transformer, X, coef)
+        return clone(transformer), scaler, weights, shift
+    if isinstance(transformer, OneHotEncoder) and transformer.drop is None:
+        if _is_frequency_capped(transformer):
+            # New categories fall into the infrequent column the encoder has
+            return clone(transformer), transformer, coef, 0.0
+        encoder, weights = _extend_encoder(transformer, X, coef)
+        return encoder, None, weights, 0.0
+    raise ValueError(f"Unsupported transformer: {transformer!r}")
+
+
+def _extend_preprocessor(
+    base_preprocessor: ColumnTransformer, X: pd.DataFrame, coef: np.ndarray
+) -> Tuple[ColumnTransformer, np.ndarray, float]:
+    """Preprocessor fitted to continue ``base_preprocessor`` on ``X``, the
+    base coefficients mapped onto its columns and the intercept shift."""
+    transformers, fitted, weights = [], {}, []
+    intercept_shift = 0.0
+    for name, transformer, columns in base_preprocessor.transformers_:
+        if transformer == 'drop':
+            continue
+        unfitted, kept, column_weights, shift = _extend_transformer(
+            transformer, X[columns], coef[base_preprocessor.output_indices_[name]]
+        )
+        transformers.append((name, unfitted, columns))
+        if kept is not None:
+            fitted[name] = kept
+        weights.append(column_weights)
+        intercept_shift += shift
+
+    preprocessor = clone(base_preprocessor).set_params(transformers=transformers)
+    preprocessor.fit(X)
+    # Keep the updated scalers and the capped encoders rather than ones
+    # refitted on X alone
+    preprocessor.transformers_ = [
+        (name, fitted.get(name, transformer), columns)
+        for name, transformer, columns in preprocessor.transformers_
+    ]
+    return preprocessor, np.concatenate(weights), intercept_shift
+
+
+def warm_start_params(base_classifier: Any, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Parameters of the classifier continuing ``base_classifier``.
+
+    A LogisticRegression base keeps its own regularization, whatever
+    ``params`` say, so the update continues the model it was tuned as;
+    other bases, such as the out-of-core SGD models, use ``params``.
+    """
+    if isinstance(base_classifier, LogisticRegression):
+        base_params = base_classifier.get_params()
+        params = {**params, **{name: base_params[name] for name in CONTINUED_PARAMS}}
+    return {**params, **WARM_START_PARAMS}
+
+
+def extend_pipeline(
+    base_pipeline: Pipeline, X: pd.DataFrame, params: Dict[str, Any]
+) -> Tuple[ColumnTransformer, LogisticRegression]:
+    """Preprocessor and warm-started classifier continuing ``base_pipeline``.
+
+    The scaler statistics are updated with ``X`` and the one-hot
+    vocabularies extended with its unseen categories. Frequency-capped
+    encoders are kept as they are, mapping new categories to their
+    infrequent column. The base coefficients are mapped onto the new
+    columns, rescaled for the updated scaler and zero for new categories, so
+    before fitting the classifier scores exactly like the base pipeline, and
+    fitting continues from there, with the regularization given by
+    ``warm_start_params``.
+    """
+    base_classifier = base_pipeline[-1]
+    preprocessor, weights, intercept_shift = _extend_preprocessor(
+        base_pipeline.steps[0][1], X, base_classifier.coef_.ravel()
+    )
+    classifier = LogisticRegression(**warm_start_params(base_classifier, params))
+    # LogisticRegression starts from existing coefficients when warm_start is set
+    classifier.coef_ = weights.reshape(1, -1)
+    classifier.intercept_ = base_classifier.intercept_ + intercept_shift
+    return preprocessor, classifier
@@ -1,20 +1,46 @@
 import os
+import logging
+from typing import Dict, List, Optional
 
-import boto3
-import kaggle
+import numpy as np
 import pandas as pd
+import fastparquet
+
+from schema import (
+    TARGET,
+    RAW_CSV_DTYPES,
+    NUMERICAL_FEATURES,
+    CATEGORICAL_FEATURES,
+    apply_schema,
+)
+from storage import get_storage
+from reference_profile import PROFILE_FILENAME, ReferenceProfile
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 DATA_PATH = os.environ.get("DATA_PATH", "../../data")
 ARTIFACT_BUCKET_NAME = os.environ.get("ARTIFACT_BUCKET_NAME", "artifacts-and-data-bp")
 REFERENCE_DATA_KEY_PATH = os.environ.get(
     "REFERENCE_DATA_KEY_PATH", "default_reference_data_key_path"
 )
+# Rows per chunk when processing the CSV in streaming mode; 0 loads it at once
+CSV_CHUNK_SIZE = int(os.environ.get("CSV_CHUNK_SIZE", 0))
 
+COLUMNS_TO_IMPUTE = [
+    'emp_length',
+    'debt_to_income',
+    'months_since_last_delinq',
+    'months_since_90d_late',
+    'months_since_last_credit_inquiry',
+]
 
-def download_kaggle_dataset(
-    data_path: str = DATA_PATH
-) -> None:
+
+def download_kaggle_dataset(data_path: str = DATA_PATH) -> None:
     """Download dataset from Kaggle using provided credentials."""
+    # Authenticates on import, so the module stays importable without credentials
+    import kaggle  # pylint: disable=import-outside-toplevel
+
     kaggle.api.dataset_download_files(
         'utkarshx27/lending-club-loan-dataset', path=data_path, unzip=True
     )
@@ -24,16 +50,59 @@ def upload_to_s3(
     filename: str, destination_path: str, bucket_name: str = ARTIFACT_BUCKET_NAME
 ) -> None:
     """Upload a file to the specified S3 bucket."""
-    s3 = boto3.client('s3')
-    s3.upload_file(
+    get_storage().upload(
         filename,
         bucket_name,
         os.path.join(destination_path, os.path.basename(filename)),
     )
 
 
-def clean_and_process_data(df: pd.DataFrame) -> pd.DataFrame:
-    """Clean and preprocess the given DataFrame."""
+def median_from_counts(counts: pd.Series) -> float:
+    """Exact median of the values described by a value -> count series.
+
+    NaN when there are no values, as for the median of an all-NaN column.
+    """
+    if counts.empty:
+        return float('nan')
+    counts = counts.sort_index()
+    cumulative = counts.cumsum().to_numpy()
+    values = counts.index.to_numpy(dtype=float)
+    total = int(cumulative[-1])
+    lower = values[np.searchsorted(cumulative, (total - 1) // 2, side='right')]
+    upper = values[np.searchsorted(cumulative, total // 2, side='right')]
+    return float((lower + upper) / 2)
+
+
+def compute_imputation_medians(
+    csv_path: str, columns: List[str], chunksize: int
+) -> Dict[str, float]:
+    """Compute exact column medians in one pass over the CSV.
+
+    Per-chunk value counts are merged, so memory grows with the number of
+    distinct values rather than the number of rows.
+    """
+    counts = {column: pd.Series(dtype='float64') for column in columns}
+    for chunk in pd.read_csv(
+        csv_path,
+        usecols=columns,
+        dtype={column: RAW_CSV_DTYPES[column] for column in columns},
+        chunksize=chunksize,
+    ):
+        for column in columns:
+            counts[column] = counts[column].add(
+                chunk[column].value_counts(), fill_value=0
+            )
+    return {column: median_from_counts(counts[column]) for column in columns}
+
+
+def clean_and_process_data(
+    df: pd.DataFrame, medians: Optional[Dict[str, float]] = None
+) -> pd.DataFrame:
+    """Clean and preprocess the given DataFrame.
+
+    Missing values are imputed with ``medians`` when given (e.g. computed over
+    the full dataset in streaming mode), otherwise with the medians of ``df``.
+    """
     df2 = df.drop(
         columns=[
             'annual_income_joint',
@@ -41,32 +110,45 @@ def clean_and_process_data(df: pd.DataFrame) -> pd.DataFrame:
             'debt_to_income_joint',
         ]
     )
-    columns_to_impute = [
-        'emp_length',
-        'debt_to_income',
-        'months_since_last_delinq',
-        'months_since_90d_late',
-        'months_since_last_credit_inquiry',
-    ]
-
-    for column in columns_to_impute:
-        median_value = df2[column].median()
-        df2[column].fillna(median_value, inplace=True)
+
+    for column in COLUMNS_TO_IMPUTE:
+        median_value = df2[column].median() if medians is None else medians[column]
+        df2[column] = df2[column].fillna(median_value)
 
     # Handle missing values and categorical mapping
-    df2['emp_title'] = df2['emp_title'].fillna('unemployed')
+    emp_title = df2['emp_title']
+    if isinstance(emp_title.dtype, pd.CategoricalDtype):
+        if 'unemployed' not in emp_title.cat.categories:
+            emp_title = emp_title.cat.add_categories('unemployed')
+    df2['emp_title'] = emp_title.fillna('unemployed')
     df2['num_accounts_120d_past_due'] = df2['num_accounts_120d_past_due'].fillna(0)
-    df2['loan_status'].replace(
-        {
-            'In Grace Period': 'Late',
-            'Late (31-120 days)': 'Late',
-            'Late (16-30 days)': 'Late',
-        },
-        inplace=True,
-    )
+    # Every status other than 'Charged Off' (including the late ones) is negative
     df2['loan_status'] = (df2['loan_status'] == 'Charged Off').astype(int)
 
-    return df2
+    return apply_schema(df2)
+
+
+def process_csv_in_chunks(csv_path: str, output_path: str, chunksize: int) -> None:
+    """Clean the CSV chunk by chunk into a parquet file with one row group per chunk.
+
+    A first pass computes the imputation medians and a second pass cleans
+    and appends each chunk, so peak memory is bounded by the chunk size.
+    """
+    medians = compute_imputation_medians(csv_path, COLUMNS_TO_IMPUTE, chunksize)
+    logger.info("Imputation medians: %s", medians)
+
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    for i, chunk in enumerate(
+        pd.read_csv(csv_path, index_col=0, dtype=RAW_CSV_DTYPES, chunksize=chunksize)
+    ):
+        fastparquet.write(
+            output_path,
+            clean_and_process_data(chunk, medians),
+            write_index=False,
+            append=i > 0,
+        )
+        logger.info("Wrote row group %d (%d rows)", i, len(chunk))
 
 
 def main() -> None:
@@ -74,18 +156,31 @@ def main() -> None:
     # Download the dataset from Kaggle
     download_kaggle_dataset()
 
-    # Load data into DataFrame
-    df = pd.read_csv(os.path.join(DATA_PATH, 'loans_full_schema.csv'), index_col=0)
+    csv_path = os.path.join(DATA_PATH, 'loans_full_schema.csv')
+    local_filename = os.path.join(DATA_PATH, 'loans_full_schema_clean.parquet')
 
-    # Clean and preprocess data
-    df_cleaned = clean_and_process_data(df)
+    if CSV_CHUNK_SIZE > 0:
+        # Stream the CSV through cleaning into a row-group-partitioned parquet file
+        process_csv_in_chunks(csv_path, local_filename, CSV_CHUNK_SIZE)
+    else:
+        # Load data into DataFrame
+        df = pd.read_csv(csv_path, index_col=0, dtype=RAW_CSV_DTYPES)
 
-    # Save cleaned data locally in parquet format
-    local_filename = os.path.join(DATA_PATH, 'loans_full_schema_clean.parquet')
-    df_cleaned.to_parquet(local_filename, index=None)
+        # Clean and preprocess data
+        df_cleaned = clean_and_process_data(df)
+
+        # Save cleaned data locally in parquet format
+        df_cleaned.to_parquet(local_filename, index=None)
+
+    # Summarize the cleaned data for monitoring, one column in memory at a time
+    profile_path = os.path.join(DATA_PATH, PROFILE_FILENAME)
+    ReferenceProfile.from_parquet(
+        local_filename, NUMERICAL_FEATURES, CATEGORICAL_FEATURES, target=TARGET
+    ).save(profile_path)
 
-    # Upload the cleaned data to S3
+    # Upload the cleaned data and its profile to S3
     upload_to_s3(local_filename, REFERENCE_DATA_KEY_PATH)
+    upload_to_s3(profile_path, REFERENCE_DATA_KEY_PATH)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,275 @@
+from typing import Any, Dict, List, Tuple, Iterator, Optional
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import fastparquet
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.compose import make_column_transformer
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from schema import TARGET, apply_schema
+from incremental import ReservoirSample
+
+TRAIN, VAL, TEST = 0, 1, 2
+
+
+def iter_row_groups(
+    path: str, order: Optional[np.ndarray] = None
+) -> Iterator[pd.DataFrame]:
+    """Read a parquet file one row group at a time, in the cleaned schema.
+
+    Row groups are read in file order, or in ``order`` when given.
+    """
+    parquet_file = fastparquet.ParquetFile(path)
+    if order is None:
+        order = range(len(parquet_file.row_groups))
+    for i in order:
+        yield apply_schema(parquet_file[int(i)].to_pandas())
+
+
+def assign_splits(
+    df: pd.DataFrame, random_state: int, train_size: float, val_size: float
+) -> np.ndarray:
+    """TRAIN, VAL or TEST for every row of ``df``, from a hash of its values.
+
+    A row lands in the same split whichever row group it is read from and
+    however often it is read, so splits never have to be materialized.
+    """
+    hashes = pd.util.hash_pandas_object(
+        df, index=False, hash_key=f'{random_state:016d}'
+    ).to_numpy()
+    # Top 53 bits of the hash as a uniform draw in [0, 1)
+    draws = (hashes >> np.uint64(11)) / 2.0**53
+    cuts = [train_size, train_size + val_size]
+    return np.searchsorted(cuts, draws, side='right').astype(np.int8)
+
+
+def balanced_class_weights(class_counts: np.ndarray) -> Dict[int, float]:
+    """Weights inversely proportional to the class counts, as 'balanced' does."""
+    total = class_counts.sum()
+    return {
+        label: float(total / (len(class_counts) * count))
+        for label, count in enumerate(class_counts)
+    }
+
+
+class StreamingLoanModel:
+    """Logistic regression fitted over a parquet file one row group at a time.
+
+    ``fit_statistics`` reads the training rows once for the scaler
+    statistics, one-hot vocabularies and class counts. ``fit`` then runs
+    ``epochs`` passes of minibatch SGD on the log loss, visiting the row
+    groups in a new random order every epoch. ``params`` are the
+    LogisticRegression ``C`` and ``penalty``, mapped onto SGD's per-sample
+    regularization. Categories of ``frequency_encoded_features`` seen fewer
+    than ``min_category_frequency`` times share one infrequent column, as in
+    ``LoanPredictionModel``. Peak memory is bounded by the largest row group.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        params: Dict[str, Any],
+        epochs: int = 5,
+        random_state: int = 42,
+        train_size: float = 0.7,
+        val_size: float = 0.15,
+        frequency_encoded_features: Optional[List[str]] = None,
+        min_category_frequency: int = 20,
+    ):
+        self.path = path
+        self.params = params
+        self.epochs = epochs
+        self.random_state = random_state
+        self.train_size = train_size
+        self.val_size = val_size
+        self.frequency_encoded_features = frequency_encoded_features or []
+        self.min_category_frequency = min_category_frequency
+        self.numerical_features: List[str] = []
+        self.categorical_features: List[str] = []
+        # Centred, unlike the in-memory pipeline: SGD converges slowly when it
+        # has to learn a large intercept. Exported scorers fold the mean in.
+        self.scaler = StandardScaler()
+        # Vocabularies of the one-hot encoded features, and category counts
+        # of the frequency-capped ones with missing values counted under NaN
+        self.categories: Dict[str, set] = {}
+        self.category_counts: Dict[str, Counter] = {}
+        self.has_missing: Dict[str, bool] = {}
+        self.class_counts = np.zeros(2, dtype=np.int64)
+        self.n_row_groups = 0
+        self.preprocessor: Any = None
+        self.classifier: Optional[SGDClassifier] = None
+
+    def _split_chunks(
+        self, splits: Tuple[int, ...], order: Optional[np.ndarray] = None
+    ) -> Iterator[Tuple[int, pd.DataFrame, pd.Series]]:
+        for df in iter_row_groups(self.path, order):
+            assigned = assign_splits(
+                df, self.random_state, self.train_size, self.val_size
+            )
+            for split in splits:
+                rows = df[assigned == split]
+                if not rows.empty:
+                    yield split, rows.drop(columns=TARGET), rows[TARGET]
+
+    def _init_features(self, X: pd.DataFrame) -> None:
+        self.numerical_features = X.select_dtypes(include=['number']).columns.tolist()
+        self.categorical_features = X.select_dtypes(
+            include=['object', 'category']
+        ).columns.tolist()
+        for column in self.categorical_features:
+            if column in self.frequency_encoded_features:
+                self.category_counts[column] = Counter()
+            else:
+                self.categories[column] = set()
+                self.has_missing[column] = False
+
+    def _update_categories(self, X: pd.DataFrame) -> None:
+        for column, counts in self.category_counts.items():
+            value_counts = X[column].value_counts()
+            counts.update(value_counts[value_counts > 0].to_dict())
+            counts[np.nan] += int(X[column].isna().sum())
+        for column, categories in self.categories.items():
+            categories.update(X[column].dropna().unique())
+            self.has_missing[column] |= bool(X[column].isna().any())
+
+    def fit_statistics(self, reservoir: Optional[ReservoirSample] = None) -> None:
+        """First pass: fit the scaler and vocabularies on the training rows.
+
+        A given ``reservoir`` is updated with every row of the file.
+        """
+        sample = None
+        for df in iter_row_groups(self.path):
+            self.n_row_groups += 1
+            if reservoir is not None:
+                reservoir.update(df)
+            train = df[
+                assign_splits(df, self.random_state, self.train_size, self.val_size)
+                == TRAIN
+            ]
+            if train.empty:
+                continue
+            X = train.drop(columns=TARGET)
+            if sample is None:
+                self._init_features(X)
+                sample = X.iloc[:1]
+            self.scaler.partial_fit(X[self.numerical_features])
+            self._update_categories(X)
+            self.class_counts += np.bincount(train[TARGET], minlength=2)
+
+        if not self.class_counts.all():
+            raise ValueError("Both classes need training rows")
+        self.preprocessor = self._build_preprocessor(sample)
+
+    def _fit_capped_encoder(self, column: str) -> OneHotEncoder:
+        """Encoder fitted as if on the whole training split, from the counts.
+
+        Each category is repeated as often as it was seen, up to
+        ``min_category_frequency`` times, which yields the same frequent and
+        infrequent categories as the full column.
+        """
+        counts = self.category_counts[column]
+        values = [
+            category
+            for category, count in counts.items()
+            for _ in range(min(count, self.min_category_frequency))
+        ]
+        encoder = OneHotEncoder(
+            min_frequency=self.min_category_frequency,
+            handle_unknown='infrequent_if_exist',
+        )
+        return encoder.fit(pd.DataFrame({column: pd.Series(values, dtype=object)}))
+
+    def _build_preprocessor(self, sample: pd.DataFrame) -> Any:
+        """Column transformer with the streamed vocabularies and scaler."""
+        encoded = [
+            column
+            for column in self.categorical_features
+            if column not in self.category_counts
+        ]
+        categories = [
+            sorted(self.categories[column])
+            + ([np.nan] if self.has_missing[column] else [])
+            for column in encoded
+        ]
+        capped = {
+            column: self._fit_capped_encoder(column) for column in self.category_counts
+        }
+        preprocessor = make_column_transformer(
+            (StandardScaler(), self.numerical_features),
+            (OneHotEncoder(categories=categories, handle_unknown='ignore'), encoded),
+            *((clone(encoder), [column]) for column, encoder in capped.items()),
+        )
+        # Fitting fixes the output layout; the scaler and the capped encoders
+        # are then replaced by the ones fitted over the whole training split
+        preprocessor.fit(sample)
+        transformers, output_indices, offset = [], {}, 0
+        for name, transformer, columns in preprocessor.transformers_:
+            if isinstance(transformer, StandardScaler):
+                transformer = self.scaler
+            elif len(columns) == 1 and columns[0] in capped:
+                transformer = capped[columns[0]]
+            width = 0
+            if transformer != 'drop' and len(columns):
+                width = transformer.transform(sample[columns]).shape[1]
+            transformers.append((name, transformer, columns))
+            output_indices[name] = slice(offset, offset + width)
+            offset += width
+        preprocessor.transformers_ = transformers
+        preprocessor.output_indices_ = output_indices
+        return preprocessor
+
+    @property
+    def sgd_params(self) -> Dict[str, Any]:
+        return {
+            'loss': 'log_loss',
+            'penalty': self.params['penalty'],
+            # LogisticRegression's C weighs the summed loss, SGD's alpha the penalty
+            'alpha': 1.0 / (self.params['C'] * self.class_counts.sum()),
+            'class_weight': balanced_class_weights(self.class_counts),
+            # Averaged SGD with a 1/sqrt(t) step size converges to the batch
+            # solution within a few epochs; the default schedule does not
+            'learning_rate': 'invscaling',
+            'eta0': 0.1,
+            'power_t': 0.5,
+            'average': True,
+            'random_state': self.random_state,
+        }
+
+    def fit(self) -> "StreamingLoanModel":
+        """Train the classifier over ``epochs`` passes of the training rows."""
+        if self.preprocessor is None:
+            self.fit_statistics()
+        self.classifier = SGDClassifier(**self.sgd_params)
+        classes = np.arange(len(self.class_counts))
+        rng = np.random.default_rng(self.random_state)
+        for _ in range(self.epochs):
+            order = rng.permutation(self.n_row_groups)
+            for _, X, y in self._split_chunks((TRAIN,), order):
+                shuffled = rng.permutation(len(y))
+                Xt = self.preprocessor.transform(X)[shuffled]
+                self.classifier.partial_fit(Xt, y.to_numpy()[shuffled], classes=classes)
+        return self
+
+    def predict_splits(
+        self, splits: Tuple[int, ...] = (VAL, TEST)
+    ) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        """Labels and positive-class probabilities of ``splits``, in one pass."""
+        labels: Dict[int, List[np.ndarray]] = {split: [] for split in splits}
+        probabilities: Dict[int, List[np.ndarray]] = {split: [] for split in splits}
+        for split, X, y in self._split_chunks(splits):
+            labels[split].append(y.to_numpy())
+            probabilities[split].append(
+                self.classifier.predict_proba(self.preprocessor.transform(X))[:, 1]
+            )
+        return {
+            split: (np.concatenate(labels[split]), np.concatenate(probabilities[split]))
+            for split in splits
+        }
+
+    @property
+    def pipeline(self) -> Pipeline:
+        return make_pipeline(self.preprocessor, self.classifier)
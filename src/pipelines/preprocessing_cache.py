@@ -0,0 +1,114 @@
+import os
+import shutil
+import hashlib
+import logging
+import tempfile
+from typing import Any, Dict, Union, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+
+def data_fingerprint(*frames: Union[pd.DataFrame, pd.Series]) -> str:
+    """Hash the content, index and column names of the given frames or series."""
+    digest = hashlib.sha256()
+    for frame in frames:
+        columns = frame.columns if isinstance(frame, pd.DataFrame) else [frame.name]
+        digest.update(",".join(map(str, columns)).encode())
+        digest.update(
+            pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes()
+        )
+    return digest.hexdigest()
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Combine fingerprints and configuration values into a cache key."""
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def transformer_config(transformer: Any) -> str:
+    """Deterministic description of an (unfitted) transformer's parameters."""
+    return repr(sorted(transformer.get_params(deep=True).items()))
+
+
+class PreprocessingCache:
+    """Content-addressed local disk cache of transformed design matrices.
+
+    Each entry is a directory named after its key holding sparse matrices as
+    ``.npz``, arrays as ``.npy`` and any other object (e.g. a fitted
+    preprocessor) as a joblib pickle. Entries are evicted least recently used
+    first once the cache grows past ``max_size_bytes``.
+    """
+
+    def __init__(self, cache_dir: str, max_size_bytes: int = 5 * 1024**3):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry_dir = self._entry_dir(key)
+        if not os.path.isdir(entry_dir):
+            return None
+
+        entry = {}
+        for filename in os.listdir(entry_dir):
+            name, extension = os.path.splitext(filename)
+            path = os.path.join(entry_dir, filename)
+            if extension == '.npz':
+                entry[name] = sparse.load_npz(path)
+            elif extension == '.npy':
+                entry[name] = np.load(path, allow_pickle=False)
+            else:
+                entry[name] = joblib.load(path)
+        # Directory mtime records the last access for LRU eviction
+        os.utime(entry_dir)
+        logger.info("Preprocessing cache hit for %s", key[:12])
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        # The entry only appears under its key once every array is saved, so a
+        # concurrent get finds either all of it or a miss
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-')
+        for name, value in entry.items():
+            path = os.path.join(tmp_dir, name)
+            if sparse.issparse(value):
+                sparse.save_npz(f'{path}.npz', sparse.csr_matrix(value))
+            elif isinstance(value, np.ndarray) and value.dtype != object:
+                np.save(f'{path}.npy', value, allow_pickle=False)
+            else:
+                joblib.dump(value, f'{path}.pkl')
+
+        entry_dir = self._entry_dir(key)
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # Another process stored the same entry in the meantime
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry_dir = self._entry_dir(name)
+            if name.startswith('.tmp-') or not os.path.isdir(entry_dir):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(entry_dir, filename))
+                for filename in os.listdir(entry_dir)
+            )
+            entries.append((os.path.getmtime(entry_dir), size, entry_dir))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry_dir in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+            logger.info("Evicting preprocessing cache entry %s", entry_dir)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_size -= size
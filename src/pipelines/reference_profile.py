@@ -0,0 +1,230 @@
+import json
+import bisect
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Kept identical in src/pipelines/reference_profile.py and
+# fastapi_backend/reference_profile.py
+PROFILE_FILENAME = 'reference_profile.json'
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+class ReferenceProfile:
+    """Compact summary of the reference data that monitoring compares against.
+
+    Numerical features are binned at reference deciles and categorical
+    features get one bin per reference category. The last bin of every
+    feature collects missing values and categories unseen in the reference.
+    Quantiles, missing rates and the target rate are kept alongside, and the
+    whole profile round-trips through a small JSON artifact.
+    """
+
+    def __init__(
+        self,
+        numerical_edges: Dict[str, List[float]],
+        categories: Dict[str, List[str]],
+        counts: Dict[str, List[int]],
+        quantiles: Optional[Dict[str, Dict[str, float]]] = None,
+        missing_rates: Optional[Dict[str, float]] = None,
+        target_rate: Optional[float] = None,
+        n_rows: int = 0,
+    ):
+        self.numerical_edges = numerical_edges
+        self.categories = categories
+        self.counts = {
+            feature: np.asarray(values, dtype=np.int64)
+            for feature, values in counts.items()
+        }
+        self.quantiles = quantiles or {}
+        self.missing_rates = missing_rates or {}
+        self.target_rate = target_rate
+        self.n_rows = n_rows
+        self.features = list(numerical_edges) + list(categories)
+        self._lookups = {
+            feature: {category: i for i, category in enumerate(values)}
+            for feature, values in categories.items()
+        }
+
+    @classmethod
+    def from_columns(
+        cls,
+        read_column: Any,
+        numerical_features: Sequence[str],
+        categorical_features: Sequence[str],
+        target: Optional[str] = None,
+        n_bins: int = 10,
+    ) -> "ReferenceProfile":
+        """Build the profile reading one column at a time through ``read_column``."""
+        profile = cls({}, {}, {})
+        decile_points = np.linspace(0, 1, n_bins + 1)[1:-1]
+        for feature in numerical_features:
+            values = read_column(feature).to_numpy(dtype=float)
+            present = values[~np.isnan(values)]
+            profile.n_rows = len(values)
+            profile.missing_rates[feature] = float(np.isnan(values).mean())
+            if len(present):
+                profile.numerical_edges[feature] = np.unique(
+                    np.quantile(present, decile_points)
+                ).tolist()
+                profile.quantiles[feature] = dict(
+                    zip(map(str, QUANTILES), np.quantile(present, QUANTILES).tolist())
+                )
+            else:
+                profile.numerical_edges[feature] = []
+                profile.quantiles[feature] = {}
+            profile.counts[feature] = np.bincount(
+                profile.bin_column(feature, values),
+                minlength=profile.n_bins(feature),
+            )
+
+        for feature in categorical_features:
+            values = read_column(feature)
+            profile.n_rows = len(values)
+            profile.missing_rates[feature] = float(values.isna().mean())
+            profile.categories[feature] = sorted(map(str, values.dropna().unique()))
+            profile._lookups[feature] = {
+                category: i for i, category in enumerate(profile.categories[feature])
+            }
+            profile.counts[feature] = np.bincount(
+                profile.bin_column(feature, values),
+                minlength=profile.n_bins(feature),
+            )
+
+        if target is not None:
+            profile.target_rate = float(read_column(target).astype(float).mean())
+        profile.features = list(profile.numerical_edges) + list(profile.categories)
+        return profile
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        numerical_features: Sequence[str],
+        categorical_features: Sequence[str],
+        target: Optional[str] = None,
+        n_bins: int = 10,
+    ) -> "ReferenceProfile":
+        return cls.from_columns(
+            df.__getitem__, numerical_features, categorical_features, target, n_bins
+        )
+
+    @classmethod
+    def from_parquet(
+        cls,
+        path: str,
+        numerical_features: Sequence[str],
+        categorical_features: Sequence[str],
+        target: Optional[str] = None,
+        n_bins: int = 10,
+    ) -> "ReferenceProfile":
+        """Profile a parquet file holding a single column in memory at a time."""
+        return cls.from_columns(
+            lambda column: pd.read_parquet(path, columns=[column])[column],
+            numerical_features,
+            categorical_features,
+            target,
+            n_bins,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'n_rows': self.n_rows,
+            'target_rate': self.target_rate,
+            'numerical': {
+                feature: {
+                    'bin_edges': edges,
+                    'counts': self.counts[feature].tolist(),
+                    'quantiles': self.quantiles.get(feature, {}),
+                    'missing_rate': self.missing_rates.get(feature, 0.0),
+                }
+                for feature, edges in self.numerical_edges.items()
+            },
+            'categorical': {
+                feature: {
+                    'categories': categories,
+                    'counts': self.counts[feature].tolist(),
+                    'missing_rate': self.missing_rates.get(feature, 0.0),
+                }
+                for feature, categories in self.categories.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, profile: Dict[str, Any]) -> "ReferenceProfile":
+        features = {**profile['numerical'], **profile['categorical']}
+        return cls(
+            numerical_edges={
+                feature: entry['bin_edges']
+                for feature, entry in profile['numerical'].items()
+            },
+            categories={
+                feature: entry['categories']
+                for feature, entry in profile['categorical'].items()
+            },
+            counts={feature: entry['counts'] for feature, entry in features.items()},
+            quantiles={
+                feature: entry['quantiles']
+                for feature, entry in profile['numerical'].items()
+            },
+            missing_rates={
+                feature: entry['missing_rate'] for feature, entry in features.items()
+            },
+            target_rate=profile['target_rate'],
+            n_rows=profile['n_rows'],
+        )
+
+    def save(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> "ReferenceProfile":
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def frequencies(self, feature: str) -> Dict[str, float]:
+        """Share of the reference rows in each category of a categorical feature."""
+        counts = self.counts[feature]
+        return {
+            category: float(count / max(counts.sum(), 1))
+            for category, count in zip(self.categories[feature], counts)
+        }
+
+    def n_bins(self, feature: str) -> int:
+        if feature in self.numerical_edges:
+            return len(self.numerical_edges[feature]) + 2
+        return len(self.categories[feature]) + 1
+
+    def bin_column(self, feature: str, values: Any) -> np.ndarray:
+        """Bin indices of a column of values of one feature."""
+        missing_bin = self.n_bins(feature) - 1
+        if feature in self.numerical_edges:
+            values = np.asarray(values, dtype=float)
+            bins = np.searchsorted(self.numerical_edges[feature], values, 'right')
+            bins[np.isnan(values)] = missing_bin
+            return bins
+        values = pd.Series(np.asarray(values, dtype=object))
+        return (
+            values.where(values.isna(), values.astype(str))
+            .map(self._lookups[feature])
+            .fillna(missing_bin)
+            .to_numpy(dtype=np.int64)
+        )
+
+    def bin_record(self, record: Mapping[str, Any]) -> np.ndarray:
+        """Bin index of every feature of a single record."""
+        bins = np.empty(len(self.features), dtype=np.int64)
+        for i, feature in enumerate(self.features):
+            value = record.get(feature)
+            if feature in self.numerical_edges:
+                if pd.isna(value):
+                    bins[i] = len(self.numerical_edges[feature]) + 1
+                else:
+                    bins[i] = bisect.bisect_right(self.numerical_edges[feature], value)
+            else:
+                bins[i] = self._lookups[feature].get(
+                    str(value), len(self.categories[feature])
+                )
+        return bins
@@ -0,0 +1,90 @@
+from typing import Dict, Optional
+
+import pandas as pd
+
+# Compact dtypes of the LoanData fields, kept identical to LOAN_DTYPES in
+# fastapi_backend/models.py (checked by tests/test_schema.py).
+LOAN_DTYPES: Dict[str, str] = {
+    'emp_title': 'category',
+    'emp_length': 'float32',
+    'state': 'category',
+    'homeownership': 'category',
+    'annual_income': 'float32',
+    'verified_income': 'category',
+    'debt_to_income': 'float32',
+    'delinq_2y': 'int16',
+    'months_since_last_delinq': 'float32',
+    'earliest_credit_line': 'int16',
+    'inquiries_last_12m': 'int16',
+    'total_credit_lines': 'int16',
+    'open_credit_lines': 'int16',
+    'total_credit_limit': 'int32',
+    'total_credit_utilized': 'int32',
+    'num_collections_last_12m': 'int16',
+    'num_historical_failed_to_pay': 'int16',
+    'months_since_90d_late': 'float32',
+    'current_accounts_delinq': 'int16',
+    'total_collection_amount_ever': 'int32',
+    'current_installment_accounts': 'int16',
+    'accounts_opened_24m': 'int16',
+    'months_since_last_credit_inquiry': 'float32',
+    'num_satisfactory_accounts': 'int16',
+    'num_accounts_120d_past_due': 'float32',
+    'num_accounts_30d_past_due': 'int16',
+    'num_active_debit_accounts': 'int16',
+    'total_debit_limit': 'int32',
+    'num_total_cc_accounts': 'int16',
+    'num_open_cc_accounts': 'int16',
+    'num_cc_carrying_balance': 'int16',
+    'num_mort_accounts': 'int16',
+    'account_never_delinq_percent': 'float32',
+    'tax_liens': 'int16',
+    'public_record_bankrupt': 'int16',
+    'loan_purpose': 'category',
+    'application_type': 'category',
+    'loan_amount': 'int32',
+    'term': 'int16',
+    'interest_rate': 'float32',
+    'installment': 'float32',
+    'grade': 'category',
+    'sub_grade': 'category',
+    'issue_month': 'category',
+    'loan_status': 'category',
+    'initial_listing_status': 'category',
+    'disbursement_method': 'category',
+    'balance': 'float32',
+    'paid_total': 'float32',
+    'paid_principal': 'float32',
+    'paid_interest': 'float32',
+    'paid_late_fees': 'float32',
+}
+
+# Monitored features, compared against the reference profile, and the label
+TARGET = 'loan_status'
+CATEGORICAL_FEATURES = [
+    column
+    for column, dtype in LOAN_DTYPES.items()
+    if dtype == 'category' and column != TARGET
+]
+NUMERICAL_FEATURES = [
+    column for column, dtype in LOAN_DTYPES.items() if dtype != 'category'
+]
+
+# Raw Kaggle CSV: the LoanData fields plus the joint-application columns
+RAW_CSV_DTYPES: Dict[str, str] = {
+    **LOAN_DTYPES,
+    'annual_income_joint': 'float32',
+    'verification_income_joint': 'category',
+    'debt_to_income_joint': 'float32',
+}
+
+# Cleaned reference dataset, where loan_status is the 0/1 charged-off label
+CLEAN_DTYPES: Dict[str, str] = {**LOAN_DTYPES, 'loan_status': 'int8'}
+
+
+def apply_schema(
+    df: pd.DataFrame, dtypes: Optional[Dict[str, str]] = None
+) -> pd.DataFrame:
+    """Cast the columns of ``df`` that appear in ``dtypes`` (default CLEAN_DTYPES)."""
+    dtypes = CLEAN_DTYPES if dtypes is None else dtypes
+    return df.astype({c: dtype for c, dtype in dtypes.items() if c in df.columns})
@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import shutil
+import logging
+import tempfile
+from typing import Dict, Tuple, Optional
+
+import boto3
+import pandas as pd
+from boto3.s3.transfer import TransferConfig
+
+# Kept identical in src/pipelines/storage.py and fastapi_backend/storage.py
+logger = logging.getLogger(__name__)
+
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "s3")
+STORAGE_LOCAL_ROOT = os.environ.get("STORAGE_LOCAL_ROOT", "./storage")
+STORAGE_CACHE_DIR = os.environ.get("STORAGE_CACHE_DIR", "/tmp/loan-data-cache")
+# Set to target a MinIO or other S3-compatible endpoint
+S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL") or None
+TRANSFER_MAX_CONCURRENCY = int(os.environ.get("TRANSFER_MAX_CONCURRENCY", 10))
+TRANSFER_CHUNK_SIZE = int(os.environ.get("TRANSFER_CHUNK_SIZE", 16 * 1024**2))
+
+
+class S3Backend:
+    """S3 (or S3-compatible) object store with concurrent multipart transfers."""
+
+    def __init__(
+        self,
+        endpoint_url: Optional[str] = None,
+        max_concurrency: int = 10,
+        chunk_size: int = 16 * 1024**2,
+    ):
+        self.client = boto3.client('s3', endpoint_url=endpoint_url)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=chunk_size,
+            multipart_chunksize=chunk_size,
+            max_concurrency=max_concurrency,
+            use_threads=True,
+        )
+
+    def etag(self, bucket: str, key: str) -> str:
+        return self.client.head_object(Bucket=bucket, Key=key)['ETag']
+
+    def download(self, bucket: str, key: str, path: str) -> None:
+        self.client.download_file(bucket, key, path, Config=self.transfer_config)
+
+    def upload(self, path: str, bucket: str, key: str) -> None:
+        self.client.upload_file(path, bucket, key, Config=self.transfer_config)
+
+
+class LocalBackend:
+    """Object store stand-in where buckets are directories under ``root``."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, bucket: str, key: str) -> str:
+        return os.path.join(self.root, bucket, key.lstrip('/'))
+
+    def etag(self, bucket: str, key: str) -> str:
+        stat = os.stat(self._path(bucket, key))
+        return f'{stat.st_size}-{stat.st_mtime_ns}'
+
+    def download(self, bucket: str, key: str, path: str) -> None:
+        shutil.copyfile(self._path(bucket, key), path)
+
+    def upload(self, path: str, bucket: str, key: str) -> None:
+        destination = self._path(bucket, key)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.copyfile(path, destination)
+
+
+class CachedStorage:
+    """Read-through local disk cache in front of a storage backend.
+
+    Downloaded objects are kept under ``cache_dir`` together with the ETag
+    they were fetched with and are only downloaded again once the remote
+    ETag changes. The ETag is rechecked at most every ``revalidate_after_s``
+    seconds, so frequent readers do not hit the backend on every call.
+    """
+
+    def __init__(self, backend, cache_dir: str, revalidate_after_s: float = 60):
+        self.backend = backend
+        self.cache_dir = cache_dir
+        self.revalidate_after_s = revalidate_after_s
+        self._validated_at: Dict[Tuple[str, str], float] = {}
+
+    def _cache_path(self, bucket: str, key: str) -> str:
+        return os.path.join(self.cache_dir, bucket, key.lstrip('/'))
+
+    def fetch(self, bucket: str, key: str) -> str:
+        """Return the path of an up-to-date local copy of the object."""
+        path = self._cache_path(bucket, key)
+        meta_path = f'{path}.meta.json'
+        validated_at = self._validated_at.get((bucket, key))
+        if (
+            validated_at is not None
+            and time.monotonic() - validated_at < self.revalidate_after_s
+            and os.path.exists(path)
+        ):
+            return path
+
+        etag = self.backend.etag(bucket, key)
+        if os.path.exists(meta_path) and os.path.exists(path):
+            with open(meta_path, encoding='utf-8') as f:
+                cached_etag = json.load(f)['etag']
+        else:
+            cached_etag = None
+
+        if cached_etag != etag:
+            logger.info("Downloading %s/%s into the local cache", bucket, key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            os.close(fd)
+            try:
+                self.backend.download(bucket, key, tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({'etag': etag}, f)
+
+        self._validated_at[(bucket, key)] = time.monotonic()
+        return path
+
+    def upload(self, path: str, bucket: str, key: str) -> None:
+        self.backend.upload(path, bucket, key)
+        self._validated_at.pop((bucket, key), None)
+
+    def read_parquet(self, bucket: str, key: str) -> pd.DataFrame:
+        return pd.read_parquet(self.fetch(bucket, key))
+
+
+def get_storage() -> CachedStorage:
+    """Build the storage configured through the STORAGE_* environment variables."""
+    if STORAGE_BACKEND == 'local':
+        backend = LocalBackend(STORAGE_LOCAL_ROOT)
+    elif STORAGE_BACKEND == 's3':
+        backend = S3Backend(
+            endpoint_url=S3_ENDPOINT_URL,
+            max_concurrency=TRANSFER_MAX_CONCURRENCY,
+            chunk_size=TRANSFER_CHUNK_SIZE,
+        )
+    else:
+        raise ValueError(f"Unknown storage backend: {STORAGE_BACKEND}")
+    return CachedStorage(backend, STORAGE_CACHE_DIR)
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINES_DIR = os.path.dirname(TESTS_DIR)
+FASTAPI_BACKEND_DIR = os.path.join(PIPELINES_DIR, '..', '..', 'fastapi_backend')
+ORCHESTRATION_DIR = os.path.join(PIPELINES_DIR, '..', '..', 'orchestration')
+
+# The pipeline, backend and orchestration modules are flat scripts, imported
+# by file name
+sys.path[:0] = [
+    PIPELINES_DIR,
+    os.path.abspath(FASTAPI_BACKEND_DIR),
+    os.path.abspath(ORCHESTRATION_DIR),
+]
+
+
+@pytest.fixture
+def loan_df() -> pd.DataFrame:
+    """Small synthetic frame with the shape of the cleaned loan dataset."""
+    rng = np.random.default_rng(42)
+    n_rows = 2000
+    df = pd.DataFrame(
+        {
+            'emp_title': rng.choice(['engineer', 'teacher', 'nurse', 'driver'], n_rows),
+            'state': rng.choice(['CA', 'NY', 'TX'], n_rows),
+            'grade': rng.choice(list('ABCDEFG'), n_rows),
+            'annual_income': rng.lognormal(11, 0.5, n_rows),
+            'debt_to_income': rng.uniform(0, 40, n_rows),
+            'interest_rate': rng.uniform(5, 30, n_rows),
+            'term': rng.choice([36, 60], n_rows),
+            'delinq_2y': rng.poisson(0.3, n_rows),
+        }
+    )
+    logit = -4 + 0.15 * df['interest_rate'] + 0.5 * (df['grade'] > 'D')
+    df['loan_status'] = (rng.random(n_rows) < 1 / (1 + np.exp(-logit))).astype(int)
+    return df
@@ -0,0 +1,176 @@
+import io
+import os
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+import sqlalchemy
+from sklearn.pipeline import make_pipeline
+from sklearn.compose import make_column_transformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from models import NUMERICAL_FEATURES, CATEGORICAL_FEATURES, LoanData
+from export_scorer import export_linear_scorer
+from storage import LocalBackend, CachedStorage
+from prediction_log import metadata
+from reference_profile import PROFILE_FILENAME, ReferenceProfile
+
+pytest.importorskip('aiosqlite')
+pytest.importorskip('httpx')
+mlflow_sklearn = pytest.importorskip('mlflow.sklearn')
+TestClient = pytest.importorskip('fastapi.testclient').TestClient
+
+
+def make_records(n_rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    columns = {}
+    for name, annotation in LoanData.__annotations__.items():
+        if annotation is str:
+            columns[name] = rng.choice([f'{name}-{i}' for i in range(5)], n_rows)
+        elif annotation is int:
+            columns[name] = rng.poisson(5, n_rows)
+        else:
+            columns[name] = rng.gamma(2.0, 10.0, n_rows).round(2)
+    return pd.DataFrame(columns)
+
+
+def save_artifacts(root: str, df: pd.DataFrame, model_format: str) -> None:
+    """Fit a small pipeline and save it in the layout train.py logs runs in."""
+    rng = np.random.default_rng(1)
+    pipeline = make_pipeline(
+        make_column_transformer(
+            (StandardScaler(), NUMERICAL_FEATURES),
+            (OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_FEATURES),
+        ),
+        LogisticRegression(max_iter=1000),
+    ).fit(df, rng.random(len(df)) < 0.3)
+    if model_format == 'sklearn':
+        mlflow_sklearn.save_model(
+            pipeline,
+            os.path.join(root, 'model'),
+            serialization_format='cloudpickle',
+            metadata={'threshold': 0.3},
+        )
+    os.makedirs(os.path.join(root, 'scorer'))
+    with open(os.path.join(root, 'scorer', 'scorer.json'), 'w', encoding='utf-8') as f:
+        json.dump(export_linear_scorer(pipeline, 0.3), f)
+    os.makedirs(os.path.join(root, 'reference_profile'))
+    ReferenceProfile.from_frame(df, NUMERICAL_FEATURES, CATEGORICAL_FEATURES).save(
+        os.path.join(root, 'reference_profile', PROFILE_FILENAME)
+    )
+
+
+@pytest.fixture(name='records')
+def records_fixture():
+    return make_records(100)
+
+
+@pytest.fixture(name='client', params=['scorer', 'sklearn'])
+def client_fixture(request, records, tmp_path, monkeypatch):
+    import app  # pylint: disable=import-outside-toplevel
+
+    database_url = f"sqlite:///{tmp_path / 'predictions.db'}"
+    metadata.create_all(sqlalchemy.create_engine(database_url))
+    artifacts = str(tmp_path / 'artifacts')
+    save_artifacts(artifacts, records, request.param)
+    monkeypatch.setenv('DATABASE_URL', database_url)
+    monkeypatch.setattr(app, 'MODEL_FORMAT', request.param)
+    monkeypatch.setattr(app, 'logged_artifacts', artifacts)
+    # The served run is named by a local registry file, as a promoted version
+    registry_file = str(tmp_path / 'registry.json')
+    with open(registry_file, 'w', encoding='utf-8') as f:
+        json.dump({'version': 'v7', 'artifact_uri': artifacts}, f)
+    monkeypatch.setattr(app, 'MODEL_REGISTRY', 'file')
+    monkeypatch.setattr(app, 'MODEL_REGISTRY_FILE', registry_file)
+    monkeypatch.setattr(app, 'MODEL_CACHE_DIR', str(tmp_path / 'model-cache'))
+    monkeypatch.setattr(app, 'REPORTS_DIR', str(tmp_path / 'reports'))
+    monkeypatch.setattr(app, 'BATCH_CHUNK_SIZE', 32)
+    with TestClient(app.app) as client:
+        yield client
+
+
+def read_ndjson(response) -> pd.DataFrame:
+    assert response.status_code == 200, response.text
+    return pd.DataFrame([json.loads(line) for line in response.text.splitlines()])
+
+
+def test_batch_endpoints_match_single_predictions(client, records):
+    body = json.loads(records.to_json(orient='records'))
+    single = pd.DataFrame([client.post('/predict', json=row).json() for row in body])
+    csv = records.to_csv(index=False).encode()
+    parquet = io.BytesIO()
+    records.to_parquet(parquet)
+
+    from_json = read_ndjson(client.post('/predict/batch', json=body))
+    from_csv = read_ndjson(
+        client.post('/predict/batch/file', files={'file': ('loans.csv', csv)})
+    )
+    from_parquet = read_ndjson(
+        client.post(
+            '/predict/batch/file',
+            files={'file': ('loans.parquet', parquet.getvalue())},
+        )
+    )
+
+    assert from_json['index'].tolist() == list(range(len(records)))
+    for batch in (from_json, from_csv, from_parquet):
+        np.testing.assert_allclose(batch['probability'], single['probability'])
+        assert batch['prediction'].tolist() == single['prediction'].tolist()
+
+
+def test_batch_endpoints_reject_malformed_rows(client, records):
+    body = json.loads(records.head(3).to_json(orient='records'))
+    body[1]['loan_amount'] = 'a lot'
+    malformed = records.head(3).astype({'loan_amount': object})
+    malformed.loc[1, 'loan_amount'] = 'a lot'
+
+    response = client.post('/predict/batch', json=body)
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['loc'] == ['body', 1, 'loan_amount']
+
+    for frame, filename in (
+        (malformed, 'loans.csv'),
+        (records.drop(columns='grade'), 'loans.csv'),
+        (records, 'loans.json'),
+    ):
+        response = client.post(
+            '/predict/batch/file',
+            files={'file': (filename, frame.to_csv(index=False).encode())},
+        )
+        assert response.status_code == (415 if filename == 'loans.json' else 422)
+
+
+def test_registry_version_is_served_from_startup(client):
+    import app  # pylint: disable=import-outside-toplevel
+
+    assert client.get('/model').json()['version'] == 'v7'
+    # The first poll finds the version already served and does not reload it
+    assert not client.portal.call(app.model_manager.check)
+    assert app.model_manager.current.profile is not None
+
+
+def test_reference_profile_is_read_from_storage(records, tmp_path, monkeypatch):
+    import app  # pylint: disable=import-outside-toplevel
+
+    profile = ReferenceProfile.from_frame(
+        records, NUMERICAL_FEATURES, CATEGORICAL_FEATURES
+    )
+    profile.save(str(tmp_path / PROFILE_FILENAME))
+    storage = CachedStorage(
+        LocalBackend(str(tmp_path / 'store')), str(tmp_path / 'cache')
+    )
+    storage.upload(str(tmp_path / PROFILE_FILENAME), 'bucket', 'reference/profile.json')
+
+    def rescan(*_args):
+        raise AssertionError("The reference data should not be read")
+
+    monkeypatch.setattr(app, 'storage', storage)
+    monkeypatch.setattr(app, 'BUCKET_NAME', 'bucket')
+    monkeypatch.setattr(app, 'REFERENCE_PROFILE_KEY_PATH', 'reference/profile.json')
+    monkeypatch.setattr(app, 'load_data_from_s3', rescan)
+
+    loaded = app.load_reference_data_profile()
+    assert loaded.features == profile.features
+    assert loaded.counts.keys() == profile.counts.keys()
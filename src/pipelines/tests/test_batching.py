@@ -0,0 +1,111 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from batching import MicroBatcher
+
+
+def run_batcher(predict_fn, coroutine_fn, **kwargs):
+    async def run():
+        batcher = MicroBatcher(predict_fn, ['i'], **kwargs)
+        await batcher.start()
+        try:
+            return await coroutine_fn(batcher)
+        finally:
+            await batcher.stop()
+
+    return asyncio.run(run())
+
+
+def score(X):
+    return 'v1', X['i'].to_numpy() / 100
+
+
+def test_concurrent_requests_are_coalesced():
+    async def submit_all(batcher):
+        return await asyncio.gather(*(batcher.submit({'i': i}) for i in range(10)))
+
+    results = run_batcher(score, submit_all, max_batch_size=4, max_wait_ms=50)
+
+    assert results == [('v1', i / 100) for i in range(10)]
+
+
+def test_batch_sizes_and_max_wait_flush():
+    async def submit(batcher):
+        await asyncio.gather(*(batcher.submit({'i': i}) for i in range(10)))
+        started = time.perf_counter()
+        result = await batcher.submit({'i': 7})
+        return batcher.metrics.snapshot(0), result, time.perf_counter() - started
+
+    metrics, result, elapsed = run_batcher(
+        score, submit, max_batch_size=4, max_wait_ms=50
+    )
+
+    assert metrics['batch_size_histogram'] == {'1': 1, '2-3': 1, '4': 2}
+    # A lone request is scored once max_wait_ms has passed
+    assert result == ('v1', 0.07)
+    assert 0.04 < elapsed < 1
+
+
+def test_scoring_errors_fail_every_request_of_the_batch():
+    def fail_on_negative(X):
+        if (X['i'] < 0).any():
+            raise ValueError("negative")
+        return score(X)
+
+    async def submit(batcher):
+        failed = await asyncio.gather(
+            *(batcher.submit({'i': i}) for i in (-1, 2, 3)), return_exceptions=True
+        )
+        return failed, await batcher.submit({'i': 5})
+
+    failed, later = run_batcher(
+        fail_on_negative, submit, max_batch_size=8, max_wait_ms=20
+    )
+
+    assert all(isinstance(error, ValueError) for error in failed)
+    # The batcher keeps serving after a failed batch
+    assert later == ('v1', 0.05)
+
+
+def test_stop_fails_requests_being_collected_or_scored():
+    scoring, release = threading.Event(), threading.Event()
+
+    def blocking_score(X):
+        scoring.set()
+        release.wait(5)
+        return score(X)
+
+    async def stop_in_flight(max_batch_size, max_wait_ms):
+        batcher = MicroBatcher(
+            blocking_score,
+            ['i'],
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+        )
+        await batcher.start()
+        requests = [asyncio.create_task(batcher.submit({'i': i})) for i in range(3)]
+        await asyncio.sleep(0.05)
+        await batcher.stop()
+        try:
+            return await asyncio.wait_for(
+                asyncio.gather(*requests, return_exceptions=True), 1
+            )
+        finally:
+            release.set()
+
+    # The first two requests are being scored and the third is queued
+    results = asyncio.run(stop_in_flight(max_batch_size=2, max_wait_ms=1))
+    assert scoring.is_set()
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    # All three are waiting for the batch to fill
+    scoring.clear()
+    results = asyncio.run(stop_in_flight(max_batch_size=8, max_wait_ms=10_000))
+    assert not scoring.is_set()
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(MicroBatcher(score, ['i']).submit({'i': 1}))
@@ -0,0 +1,54 @@
+import numpy as np
+
+from drift import StreamingDriftMonitor
+from reference_profile import ReferenceProfile
+
+NUMERICAL = ['annual_income', 'debt_to_income', 'interest_rate', 'delinq_2y']
+CATEGORICAL = ['emp_title', 'state', 'grade']
+
+
+def test_record_and_column_binning_agree(loan_df):
+    profile = ReferenceProfile.from_frame(loan_df, NUMERICAL, CATEGORICAL)
+    records = loan_df.head(50).to_dict('records')
+    records[0]['state'] = 'unseen'
+    records[1]['annual_income'] = float('nan')
+    frame = loan_df.head(50).copy()
+    frame.loc[0, 'state'] = 'unseen'
+    frame.loc[1, 'annual_income'] = np.nan
+
+    by_column = np.column_stack(
+        [profile.bin_column(feature, frame[feature]) for feature in profile.features]
+    )
+    by_record = np.array([profile.bin_record(record) for record in records])
+    np.testing.assert_array_equal(by_column, by_record)
+
+
+def test_sliding_window_counts_and_drift(loan_df):
+    reference, current = loan_df.iloc[:1000], loan_df.iloc[1000:].copy()
+    profile = ReferenceProfile.from_frame(reference, NUMERICAL, CATEGORICAL)
+    monitor = StreamingDriftMonitor(profile, window_size=500, drift_share=0.3)
+
+    for record in current.to_dict('records'):
+        monitor.update(record)
+    for feature, counts in zip(profile.features, monitor.current_counts):
+        np.testing.assert_array_equal(
+            counts,
+            np.bincount(
+                profile.bin_column(feature, current.tail(500)[feature]),
+                minlength=profile.n_bins(feature),
+            ),
+        )
+    assert not monitor.scores()['drift_detected']
+
+    shifted = current.assign(
+        annual_income=current['annual_income'] * 3,
+        interest_rate=current['interest_rate'] + 10,
+        state='WA',
+    )
+    monitor.update_frame(shifted)
+    scores = monitor.scores()
+    assert scores['n_current'] == 500
+    assert scores['drift_detected']
+    assert scores['features']['state']['chi2_p_value'] < 0.01
+    assert scores['features']['annual_income']['ks_p_value'] < 0.01
+    assert not scores['features']['grade']['drifted']
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from sklearn.pipeline import make_pipeline
+from sklearn.compose import make_column_transformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from scorer import LinearScorer, FeatureAssembler, MappedLinearScorer
+from export_scorer import export_linear_scorer
+
+NUMERICAL = ['annual_income', 'debt_to_income', 'interest_rate', 'term', 'delinq_2y']
+CATEGORICAL = ['emp_title', 'state', 'grade']
+
+
+def fit_pipeline(df, with_mean=False, min_frequency=None, C=0.05):
+    encoder = OneHotEncoder(handle_unknown='ignore')
+    if min_frequency is not None:
+        encoder = OneHotEncoder(
+            min_frequency=min_frequency, handle_unknown='infrequent_if_exist'
+        )
+    preprocessor = make_column_transformer(
+        (StandardScaler(with_mean=with_mean), NUMERICAL),
+        (encoder, CATEGORICAL),
+    )
+    classifier = LogisticRegression(C=C, penalty='l1', solver='liblinear')
+    X = df.drop(columns=['loan_status'])
+    return make_pipeline(preprocessor, classifier).fit(X, df['loan_status']), X
+
+
+def test_scorer_matches_pipeline_probabilities(loan_df):
+    pipeline, X = fit_pipeline(loan_df)
+    scorer = LinearScorer(export_linear_scorer(pipeline, threshold=0.3))
+
+    np.testing.assert_allclose(
+        scorer.predict_proba(X), pipeline.predict_proba(X), rtol=1e-12, atol=1e-12
+    )
+    np.testing.assert_array_equal(scorer.predict(X), pipeline.predict(X))
+    assert scorer.threshold == 0.3
+
+
+def test_scorer_accepts_records_and_unknown_categories(loan_df):
+    pipeline, X = fit_pipeline(loan_df, with_mean=True)
+    scorer = LinearScorer(export_linear_scorer(pipeline, threshold=0.5))
+    X = X.head(20).assign(emp_title='astronaut')
+    expected = pipeline.predict_proba(X)[:, 1]
+
+    record_array = X.to_records(index=False)
+    single_record = X.iloc[0].to_dict()
+
+    np.testing.assert_allclose(scorer.predict_proba(record_array)[:, 1], expected)
+    np.testing.assert_allclose(scorer.predict_proba(single_record)[0, 1], expected[0])
+
+
+def test_export_drops_zero_weight_features(loan_df):
+    pipeline, _ = fit_pipeline(loan_df)
+    artifact = export_linear_scorer(pipeline, threshold=0.5)
+
+    assert 0 not in artifact['numerical_weights']
+    for lookup in artifact['categorical_weights'].values():
+        assert 0 not in lookup.values()
+
+
+def test_mapped_scorer_matches_scorer(loan_df, tmp_path):
+    pipeline, X = fit_pipeline(loan_df, with_mean=True)
+    scorer = LinearScorer(export_linear_scorer(pipeline, threshold=0.4))
+    MappedLinearScorer.write(scorer, str(tmp_path))
+    mapped = MappedLinearScorer(str(tmp_path))
+    X = X.assign(emp_title=X['emp_title'].where(X.index % 7 != 0, 'astronaut'))
+
+    assert isinstance(mapped.numerical_weights, np.memmap)
+    assert mapped.threshold == 0.4
+    np.testing.assert_allclose(mapped.predict_proba(X), scorer.predict_proba(X))
+    np.testing.assert_allclose(
+        mapped.predict_proba(X.to_records(index=False)), scorer.predict_proba(X)
+    )
+    np.testing.assert_allclose(
+        mapped.predict_proba(X.iloc[0].to_dict()), scorer.predict_proba(X.head(1))
+    )
+
+
+def test_scorers_apply_the_infrequent_category_weight(loan_df, tmp_path):
+    rare = loan_df.index % 10 == 0
+    df = loan_df.assign(
+        emp_title=loan_df['emp_title'].where(
+            ~rare, 'title-' + loan_df.index.astype(str)
+        )
+    )
+    pipeline, X = fit_pipeline(df, min_frequency=20, C=1.0)
+    artifact = export_linear_scorer(pipeline, threshold=0.5)
+    scorer = LinearScorer(artifact)
+    MappedLinearScorer.write(scorer, str(tmp_path))
+    mapped = MappedLinearScorer(str(tmp_path))
+    # Rare titles seen in training and unseen ones share the "other" weight
+    X = X.assign(emp_title=X['emp_title'].where(X.index % 7 != 0, 'astronaut'))
+    expected = pipeline.predict_proba(X)
+
+    assert len(artifact['categorical_weights']['emp_title']) <= 4
+    assert artifact['categorical_defaults']['emp_title'] != 0
+    np.testing.assert_allclose(scorer.predict_proba(X), expected)
+    np.testing.assert_allclose(mapped.predict_proba(X), expected)
+    assembler = FeatureAssembler(mapped)
+    for i in (0, 7, 10):
+        record = X.iloc[i].to_dict()
+        assert assembler.predict_proba(record) == pytest.approx(expected[i, 1])
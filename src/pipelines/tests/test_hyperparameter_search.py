@@ -0,0 +1,96 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sklearn.compose import make_column_transformer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+import hyperparameter_search
+from hyperparameter_search import HyperparameterSearch, generate_candidates
+
+BASE_PARAMS = {'C': 0.5, 'penalty': 'l2', 'solver': 'liblinear'}
+
+
+def thread_pool(max_workers, initializer, initargs):
+    """Stand-in for the process pool, so tests can patch the trial function."""
+    initializer(*initargs)
+    return ThreadPoolExecutor(max_workers)
+
+
+@pytest.fixture(name='search_data')
+def search_data_fixture(loan_df, tmp_path, monkeypatch):
+    monkeypatch.setenv('MLFLOW_TRACKING_URI', (tmp_path / 'mlruns').as_uri())
+    monkeypatch.setenv('MLFLOW_ALLOW_FILE_STORE', 'true')
+    monkeypatch.setattr(hyperparameter_search, 'ProcessPoolExecutor', thread_pool)
+    preprocessor = make_column_transformer(
+        (StandardScaler(), ['annual_income', 'debt_to_income', 'interest_rate']),
+        (OneHotEncoder(handle_unknown='ignore'), ['emp_title', 'state', 'grade']),
+    )
+    return preprocessor, loan_df.drop(columns='loan_status'), loan_df['loan_status']
+
+
+def test_generate_candidates():
+    grid = generate_candidates('grid', 6, c_range=(0.01, 1.0))
+    assert grid == [
+        {'C': pytest.approx(c), 'penalty': penalty}
+        for penalty in ('l1', 'l2')
+        for c in (0.01, 0.1, 1.0)
+    ]
+
+    random = generate_candidates('random', 8, random_state=3)
+    assert random == generate_candidates('halving', 8, random_state=3)
+    assert [c['penalty'] for c in random] == ['l1'] * 4 + ['l2'] * 4
+    assert all(1e-3 <= c['C'] <= 10.0 for c in random)
+    assert random != generate_candidates('random', 8, random_state=4)
+
+    with pytest.raises(ValueError):
+        generate_candidates('bayesian', 8)
+
+
+def test_successive_halving_keeps_the_best_third_on_growing_samples(
+    search_data, monkeypatch
+):
+    trials = []
+
+    def evaluate(params, n_rows):
+        trials.append((params['C'], n_rows))
+        return params['C']
+
+    monkeypatch.setattr(hyperparameter_search, '_evaluate_candidate', evaluate)
+    search = HyperparameterSearch(
+        BASE_PARAMS, strategy='halving', n_candidates=10, n_folds=2, n_jobs=2
+    )
+    best = search.run(*search_data)
+
+    rungs = {}
+    for c, n_rows in trials:
+        rungs.setdefault(n_rows, []).append(c)
+    # 10 candidates, then the best 3 and the best 1, each on 3 times more rows
+    n_train = len(search_data[2]) // 2
+    assert sorted(rungs) == [n_train // 9, n_train // 3, n_train]
+    assert [len(rungs[n_rows]) for n_rows in sorted(rungs)] == [10, 3, 1]
+    top_three = sorted(rungs[n_train // 9], reverse=True)[:3]
+    assert sorted(rungs[n_train // 3], reverse=True) == top_three
+    assert best['C'] == top_three[0] and best['solver'] == 'liblinear'
+    assert rungs[n_train] == [top_three[0]]
+
+
+def test_time_budget_returns_base_params_without_waiting(search_data, monkeypatch):
+    release = threading.Event()
+
+    def slow_evaluate(_params, _n_rows):
+        release.wait(10)
+        return 1.0
+
+    monkeypatch.setattr(hyperparameter_search, '_evaluate_candidate', slow_evaluate)
+    search = HyperparameterSearch(
+        BASE_PARAMS, n_candidates=4, n_folds=2, time_budget_s=0.5, n_jobs=2
+    )
+    try:
+        started = time.monotonic()
+        assert search.run(*search_data) == BASE_PARAMS
+        # The trials still running are not waited for
+        assert time.monotonic() - started < 5
+    finally:
+        release.set()
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+import pandas as pd
+from sklearn.pipeline import make_pipeline
+from sklearn.compose import make_column_transformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from train import DEFAULT_PARAMS
+from incremental import ReservoirSample, extend_pipeline
+
+NUMERICAL = ['annual_income', 'debt_to_income', 'interest_rate']
+CATEGORICAL = ['emp_title', 'state', 'grade']
+
+
+def test_reservoir_is_a_bounded_uniform_sample(tmp_path):
+    reservoir = ReservoirSample(capacity=1000, seed=0)
+    for start in range(0, 20000, 2500):
+        reservoir.update(pd.DataFrame({'i': np.arange(start, start + 2500)}))
+
+    assert reservoir.n_seen == 20000 and len(reservoir.rows) == 1000
+    assert reservoir.rows['i'].is_unique
+    # Each quarter of the stream holds about a quarter of the sample
+    counts = np.bincount(reservoir.rows['i'] // 5000)
+    assert counts.min() > 200 and counts.max() < 300
+
+    reservoir.save(str(tmp_path))
+    loaded = ReservoirSample.load(str(tmp_path))
+    assert loaded.n_seen == reservoir.n_seen
+    pd.testing.assert_frame_equal(loaded.rows, reservoir.rows)
+
+
+@pytest.mark.parametrize('with_mean', [False, True])
+def test_extended_pipeline_starts_from_base_coefficients(loan_df, with_mean):
+    base_df, new_df = loan_df.iloc[:1000], loan_df.iloc[1000:].copy()
+    new_df['emp_title'] = new_df['emp_title'].where(new_df.index % 3 != 0, 'pilot')
+    new_df['annual_income'] *= 1.5
+    base = make_pipeline(
+        make_column_transformer(
+            (StandardScaler(with_mean=with_mean), NUMERICAL),
+            (OneHotEncoder(handle_unknown='ignore'), CATEGORICAL),
+        ),
+        LogisticRegression(C=0.3, penalty='l1', solver='liblinear'),
+    ).fit(base_df.drop(columns=['loan_status']), base_df['loan_status'])
+
+    X_new, y_new = new_df.drop(columns=['loan_status']), new_df['loan_status']
+    preprocessor, classifier = extend_pipeline(base, X_new, {'C': 0.3, 'penalty': 'l1'})
+    encoder = preprocessor.named_transformers_['onehotencoder']
+    assert 'pilot' in encoder.categories_[0]
+
+    # Before fitting, the extended pipeline scores exactly like the base one
+    np.testing.assert_allclose(
+        classifier.decision_function(preprocessor.transform(X_new)),
+        base.decision_function(X_new),
+    )
+    classifier.fit(preprocessor.transform(X_new), y_new)
+    assert classifier.solver == 'saga' and classifier.n_iter_[0] < 1000
+
+
+def test_extended_pipeline_keeps_base_regularization(loan_df):
+    # As if the production model came out of the search with its own C and penalty
+    base = make_pipeline(
+        make_column_transformer(
+            (StandardScaler(with_mean=False), NUMERICAL),
+            (OneHotEncoder(handle_unknown='ignore'), CATEGORICAL),
+        ),
+        LogisticRegression(C=5.0, penalty='l2'),
+    ).fit(loan_df.drop(columns=['loan_status']), loan_df['loan_status'])
+
+    _, classifier = extend_pipeline(
+        base, loan_df.drop(columns=['loan_status']), DEFAULT_PARAMS
+    )
+
+    assert DEFAULT_PARAMS['C'] != 5.0
+    assert (classifier.C, classifier.penalty) == (5.0, 'l2')
+    assert classifier.random_state == DEFAULT_PARAMS['random_state']
+    assert classifier.warm_start and classifier.solver == 'saga'
+
+
+def test_extended_pipeline_keeps_frequency_capped_encoders(loan_df):
+    base_df, new_df = loan_df.iloc[:1000], loan_df.iloc[1000:].copy()
+    new_df['emp_title'] = new_df['emp_title'].where(new_df.index % 3 != 0, 'pilot')
+    base = make_pipeline(
+        make_column_transformer(
+            (StandardScaler(), NUMERICAL),
+            (OneHotEncoder(handle_unknown='ignore'), ['state', 'grade']),
+            (
+                OneHotEncoder(min_frequency=250, handle_unknown='infrequent_if_exist'),
+                ['emp_title'],
+            ),
+        ),
+        LogisticRegression(C=0.3, penalty='l1', solver='liblinear'),
+    ).fit(base_df.drop(columns=['loan_status']), base_df['loan_status'])
+
+    X_new = new_df.drop(columns=['loan_status'])
+    preprocessor, classifier = extend_pipeline(base, X_new, {'C': 0.3, 'penalty': 'l1'})
+    capped = preprocessor.named_transformers_['onehotencoder-2']
+
+    assert capped is base.steps[0][1].named_transformers_['onehotencoder-2']
+    np.testing.assert_allclose(
+        classifier.decision_function(preprocessor.transform(X_new)),
+        base.decision_function(X_new),
+    )
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from schema import RAW_CSV_DTYPES
+from make_dataset import (
+    COLUMNS_TO_IMPUTE,
+    median_from_counts,
+    process_csv_in_chunks,
+    clean_and_process_data,
+)
+
+
+def make_raw_csv(path: str, n_rows: int = 500) -> None:
+    """CSV in the raw Kaggle layout, with missing values to impute."""
+    rng = np.random.default_rng(0)
+    columns = {}
+    for name, dtype in RAW_CSV_DTYPES.items():
+        if dtype == 'category':
+            columns[name] = rng.choice([f'{name}-{i}' for i in range(4)], n_rows)
+        elif dtype.startswith('float'):
+            columns[name] = rng.integers(0, 30, n_rows).astype(float)
+        else:
+            columns[name] = rng.poisson(5, n_rows)
+    df = pd.DataFrame(columns)
+    df['loan_status'] = rng.choice(
+        ['Current', 'Charged Off', 'Late (16-30 days)'], n_rows
+    )
+    for column in [*COLUMNS_TO_IMPUTE, 'emp_title', 'num_accounts_120d_past_due']:
+        df.loc[rng.random(n_rows) < 0.2, column] = np.nan
+    df['months_since_90d_late'] = np.nan
+    df.to_csv(path)
+
+
+def test_median_from_counts():
+    values = pd.Series([3.0, 1.0, 1.0, 7.0, 2.0, 2.0])
+    assert median_from_counts(values.value_counts()) == values.median()
+    assert median_from_counts(values.iloc[:5].value_counts()) == 2.0
+    assert np.isnan(median_from_counts(pd.Series(dtype='float64')))
+
+
+def test_chunked_processing_matches_in_memory_cleaning(tmp_path):
+    csv_path = str(tmp_path / 'loans.csv')
+    output_path = str(tmp_path / 'loans.parquet')
+    make_raw_csv(csv_path)
+
+    process_csv_in_chunks(csv_path, output_path, chunksize=64)
+    chunked = pd.read_parquet(output_path)
+    expected = clean_and_process_data(
+        pd.read_csv(csv_path, index_col=0, dtype=RAW_CSV_DTYPES)
+    ).reset_index(drop=True)
+
+    assert chunked['months_since_90d_late'].isna().all()
+    pd.testing.assert_frame_equal(
+        chunked, expected, check_dtype=False, check_categorical=False
+    )
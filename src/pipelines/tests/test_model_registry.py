@@ -0,0 +1,71 @@
+import json
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from model_registry import ModelManager, ServedModel, FileRegistrySource
+
+
+class ConstantModel:
+    def __init__(self, probability):
+        self.probability = probability
+
+    def predict_proba(self, X):
+        p = np.full(len(X), self.probability)
+        return np.column_stack([1 - p, p])
+
+
+MODELS = {
+    'v1': ConstantModel(0.1),
+    'v2': ConstantModel(0.2),
+    'broken': ConstantModel(np.nan),
+}
+
+
+def load(version, _artifact_uri):
+    return ServedModel(MODELS[version], 0.5, version)
+
+
+async def canary():
+    return pd.DataFrame({'loan_amount': [1000, 2000, 3000]})
+
+
+def publish(path, version):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'artifact_uri': f'runs:/{version}'}, f)
+
+
+def test_manager_swaps_rejects_and_rolls_back(tmp_path):
+    registry_file = str(tmp_path / 'registry.json')
+    swapped = []
+    manager = ModelManager(
+        load('v1', None),
+        FileRegistrySource(registry_file),
+        load,
+        canary,
+        on_swap=lambda served: swapped.append(served.version),
+    )
+
+    async def run():
+        assert not await manager.check()
+        publish(registry_file, 'v2')
+        assert await manager.check()
+        assert manager.current.version == 'v2'
+        assert manager.previous.version == 'v1'
+
+        publish(registry_file, 'broken')
+        assert not await manager.check()
+        assert manager.current.version == 'v2'
+        assert 'broken' in manager.rejected
+
+        publish(registry_file, 'v2')
+        manager.rollback()
+        # The rolled back version is not swapped in again
+        assert not await manager.check()
+
+    asyncio.run(run())
+    assert manager.current.version == 'v1'
+    assert swapped == ['v2', 'v1']
+    assert manager.current.predict_proba(pd.DataFrame({'a': [1]})).tolist() == [0.1]
+    assert manager.status()['rejected_versions'] == ['broken', 'v2']
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+import fastparquet
+from sklearn.metrics import roc_auc_score
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from schema import apply_schema
+from out_of_core import TEST, TRAIN, StreamingLoanModel, assign_splits
+from train import DEFAULT_PARAMS, LoanPredictionModel
+from incremental import extend_pipeline
+
+
+def write_row_groups(df, path, size=250):
+    for start in range(0, len(df), size):
+        fastparquet.write(
+            path, df.iloc[start : start + size], write_index=False, append=start > 0
+        )
+    return path
+
+
+@pytest.fixture(name='loan_parquet')
+def loan_parquet_fixture(loan_df, tmp_path):
+    return write_row_groups(loan_df, str(tmp_path / 'loans.parquet'))
+
+
+def test_assign_splits_is_stable_across_row_groups(loan_df):
+    splits = assign_splits(loan_df, 42, 0.7, 0.15)
+    chunked = np.concatenate(
+        [
+            assign_splits(loan_df.iloc[i : i + 300], 42, 0.7, 0.15)
+            for i in range(0, 2000, 300)
+        ]
+    )
+
+    np.testing.assert_array_equal(splits, chunked)
+    np.testing.assert_allclose(
+        np.bincount(splits) / len(splits), [0.7, 0.15, 0.15], atol=0.03
+    )
+    assert not np.array_equal(splits, assign_splits(loan_df, 7, 0.7, 0.15))
+
+
+def test_streaming_model_matches_in_memory_training(loan_df, loan_parquet):
+    model = StreamingLoanModel(loan_parquet, DEFAULT_PARAMS, epochs=5)
+    model.fit_statistics()
+    # Rows are hashed as read back, in the cleaned schema
+    loan_df = apply_schema(loan_df)
+    splits = assign_splits(loan_df, 42, 0.7, 0.15)
+    train = loan_df[splits == TRAIN]
+    in_memory = LoanPredictionModel(train)
+
+    expected_scaler = StandardScaler(with_mean=False).fit(
+        train[in_memory.numerical_features]
+    )
+    np.testing.assert_allclose(model.scaler.scale_, expected_scaler.scale_)
+    assert model.categorical_features == in_memory.categorical_features
+    for column in model.categorical_features:
+        assert model.categories[column] == set(train[column])
+
+    model.fit()
+    y_test, probabilities = model.predict_splits((TEST,))[TEST]
+    test = loan_df[splits == TEST]
+    preprocessor = in_memory.preprocessor.fit(in_memory.X)
+    classifier = LogisticRegression(**in_memory.params).fit(
+        preprocessor.transform(in_memory.X), in_memory.y
+    )
+    expected = classifier.predict_proba(
+        preprocessor.transform(test.drop(columns='loan_status'))
+    )[:, 1]
+
+    np.testing.assert_array_equal(y_test, test['loan_status'])
+    assert roc_auc_score(y_test, probabilities) == pytest.approx(
+        roc_auc_score(y_test, expected), abs=0.02
+    )
+
+
+def test_streaming_model_caps_categories_from_counts(loan_df, tmp_path):
+    rare = loan_df.index % 10 == 0
+    df = apply_schema(
+        loan_df.assign(
+            emp_title=loan_df['emp_title'].where(
+                ~rare, 'title-' + loan_df.index.astype(str)
+            )
+        )
+    )
+    splits = assign_splits(df, 42, 0.7, 0.15)
+    # No training rows in the first row group
+    df = pd.concat([df[splits != TRAIN].head(100), df[splits == TRAIN]])
+    path = write_row_groups(df, str(tmp_path / 'loans.parquet'), size=100)
+    model = StreamingLoanModel(
+        path,
+        DEFAULT_PARAMS,
+        epochs=1,
+        frequency_encoded_features=['emp_title'],
+        min_category_frequency=20,
+    )
+    model.fit_statistics()
+
+    train = df.iloc[100:]
+    expected = OneHotEncoder(
+        min_frequency=20, handle_unknown='infrequent_if_exist'
+    ).fit(train[['emp_title']])
+    (encoder,) = [
+        transformer
+        for _, transformer, columns in model.preprocessor.transformers_
+        if columns == ['emp_title']
+    ]
+    assert 'emp_title' not in model.categories
+    np.testing.assert_array_equal(encoder.categories_[0], expected.categories_[0])
+    np.testing.assert_array_equal(
+        encoder.infrequent_categories_[0], expected.infrequent_categories_[0]
+    )
+
+    model.fit()
+    X = train.drop(columns='loan_status')
+    # The capped encoder's output layout is recorded for extend_pipeline
+    preprocessor, classifier = extend_pipeline(model.pipeline, X, DEFAULT_PARAMS)
+    np.testing.assert_allclose(
+        classifier.decision_function(preprocessor.transform(X)),
+        model.pipeline.decision_function(X),
+    )
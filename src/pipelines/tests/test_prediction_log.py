@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import sqlalchemy
+
+from models import LOAN_DTYPES, LoanData
+from prediction_log import (
+    PREDICTION_DTYPES,
+    PredictionLogWriter,
+    metadata,
+    predictions,
+    load_last_predictions,
+)
+
+pytest.importorskip('aiosqlite')
+Database = pytest.importorskip('databases').Database
+
+FIELD_VALUES = {str: 'A', int: 3, float: 1.5}
+
+
+def make_row(i: int) -> dict:
+    return {
+        'created_at': datetime(2023, 1, 1) + timedelta(seconds=i),
+        **{
+            name: FIELD_VALUES[annotation]
+            for name, annotation in LoanData.__annotations__.items()
+        },
+        'loan_amount': 1000 + i,
+        'prediction': 'Charged Off',
+        'probability': 0.75,
+        'model_version': 'run-1',
+        'latency_ms': 2.0,
+    }
+
+
+def run_with_database(tmp_path, coroutine_fn):
+    url = f"sqlite:///{tmp_path / 'predictions.db'}"
+    metadata.create_all(sqlalchemy.create_engine(url))
+
+    async def run():
+        database = Database(url)
+        await database.connect()
+        try:
+            return await coroutine_fn(database)
+        finally:
+            await database.disconnect()
+
+    return asyncio.run(run())
+
+
+def test_writer_bulk_inserts_and_flushes_on_stop(tmp_path):
+    async def write(database):
+        writer = PredictionLogWriter(
+            database, batch_size=50, flush_interval_ms=10_000, max_queue_size=20
+        )
+        await writer.start()
+        for i in range(120):
+            await writer.log(make_row(i))
+        # The last 20 rows are below batch_size and only written by the final flush
+        await writer.stop()
+        return writer, await database.fetch_all(predictions.select())
+
+    writer, rows = run_with_database(tmp_path, write)
+    assert len(rows) == 120
+    assert len({row['id'] for row in rows}) == 120
+    assert writer.stats()['rows_written'] == 120
+    assert writer.stats()['flushes'] == 3
+
+
+def test_writer_drops_only_the_rows_the_database_rejects(tmp_path):
+    async def write(database):
+        writer = PredictionLogWriter(database, batch_size=10, flush_interval_ms=10)
+        await writer.start()
+        for i in range(10):
+            # created_at is NOT NULL, so the whole bulk insert fails
+            await writer.log(
+                {**make_row(i), 'created_at': None} if i == 3 else make_row(i)
+            )
+        await writer.stop()
+        return writer, await database.fetch_all(predictions.select())
+
+    writer, rows = run_with_database(tmp_path, write)
+    assert sorted(row['loan_amount'] for row in rows) == [
+        1000 + i for i in range(10) if i != 3
+    ]
+    assert writer.stats()['rows_written'] == 9
+    assert writer.stats()['rows_dropped'] == 1
+
+
+def test_load_last_predictions_returns_typed_frame(tmp_path):
+    async def write_and_load(database):
+        await database.execute_many(
+            predictions.insert(),
+            # Above the int16 range of LOAN_DTYPES
+            [{**make_row(i), 'total_credit_lines': 40000 + i} for i in range(10)],
+        )
+        return await load_last_predictions(database, window_size=4)
+
+    df = run_with_database(tmp_path, write_and_load)
+    assert df.dtypes.astype(str).to_dict() == PREDICTION_DTYPES
+    assert df['loan_amount'].tolist() == [1009, 1008, 1007, 1006]
+    assert df['total_credit_lines'].tolist() == [40009, 40008, 40007, 40006]
+    assert set(LOAN_DTYPES) < set(df.columns)
@@ -0,0 +1,65 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+import sqlalchemy
+
+from schema import TARGET, CLEAN_DTYPES, apply_schema
+from models import LoanData
+from prediction_log import metadata, predictions
+from prediction_window import load_last_predictions
+
+pytest.importorskip('aiosqlite')
+Database = pytest.importorskip('databases').Database
+
+FIELD_VALUES = {str: 'A', int: 3, float: 1.5}
+
+
+def make_row(i: int) -> dict:
+    return {
+        'created_at': datetime(2023, 1, 1) + timedelta(seconds=i),
+        **{
+            name: FIELD_VALUES[annotation]
+            for name, annotation in LoanData.__annotations__.items()
+        },
+        'loan_status': 'Current',
+        # Outside the int16 range of the cleaned schema
+        'total_credit_lines': 100000 + i,
+        'emp_title': f'title-{i}',
+        'prediction': 'Fully Paid',
+        'probability': 0.25,
+        'model_version': 'run-1',
+        'latency_ms': 2.0,
+    }
+
+
+def test_load_last_predictions_reads_the_reference_features(tmp_path):
+    url = f"sqlite:///{tmp_path / 'predictions.db'}"
+    metadata.create_all(sqlalchemy.create_engine(url))
+    reference = apply_schema(
+        pd.DataFrame(
+            {
+                name: ['A'] if dtype == 'category' else [1]
+                for name, dtype in CLEAN_DTYPES.items()
+            }
+        )
+    )
+
+    async def write_and_load():
+        database = Database(url)
+        await database.connect()
+        try:
+            await database.execute_many(
+                predictions.insert(), [make_row(i) for i in range(5)]
+            )
+            return await load_last_predictions(database, 3, reference.dtypes.to_dict())
+        finally:
+            await database.disconnect()
+
+    current = asyncio.run(write_and_load())
+    assert list(current.columns) == [name for name in CLEAN_DTYPES if name != TARGET]
+    assert current['total_credit_lines'].tolist() == [100004, 100003, 100002]
+    # Categories the reference data has not seen are kept, not turned into NaN
+    assert current['emp_title'].dtype == 'category'
+    assert current['emp_title'].tolist() == ['title-4', 'title-3', 'title-2']
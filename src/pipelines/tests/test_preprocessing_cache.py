@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import StandardScaler
+
+from preprocessing_cache import (
+    PreprocessingCache,
+    make_cache_key,
+    data_fingerprint,
+    transformer_config,
+)
+
+
+def test_entries_round_trip(tmp_path):
+    cache = PreprocessingCache(str(tmp_path))
+    X = np.random.default_rng(0).normal(size=(50, 3))
+    scaler = StandardScaler().fit(X)
+    matrix = sparse.random(50, 20, density=0.1, format='csr', random_state=0)
+
+    cache.put('key', {'Xt': matrix, 'y': X[:, 0], 'preprocessor': scaler})
+    entry = cache.get('key')
+
+    assert sparse.issparse(entry['Xt'])
+    assert (entry['Xt'] != matrix).nnz == 0
+    np.testing.assert_array_equal(entry['y'], X[:, 0])
+    np.testing.assert_array_equal(
+        entry['preprocessor'].transform(X), scaler.transform(X)
+    )
+    assert cache.get('other') is None
+
+
+def test_key_changes_with_data_and_transformer_params(loan_df):
+    def key(df, scaler):
+        return make_cache_key(
+            'design', data_fingerprint(df), transformer_config(scaler)
+        )
+
+    changed = loan_df.copy()
+    changed.loc[0, 'annual_income'] += 1
+
+    assert key(loan_df, StandardScaler()) == key(loan_df.copy(), StandardScaler())
+    assert key(loan_df, StandardScaler()) != key(changed, StandardScaler())
+    assert key(loan_df, StandardScaler()) != key(
+        loan_df, StandardScaler(with_mean=False)
+    )
+    assert data_fingerprint(loan_df) != data_fingerprint(
+        loan_df.rename(columns={'state': 'region'})
+    )
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    values = np.zeros(1000)
+    cache = PreprocessingCache(str(tmp_path), max_size_bytes=2 * values.nbytes + 512)
+    cache.put('a', {'values': values})
+    cache.put('b', {'values': values})
+    # Entry directory mtimes record the last access
+    os.utime(tmp_path / 'a', (1000, 1000))
+    os.utime(tmp_path / 'b', (2000, 2000))
+    assert cache.get('a') is not None
+
+    cache.put('c', {'values': values})
+
+    assert sorted(os.listdir(tmp_path)) == ['a', 'c']
+    assert cache.get('b') is None
+    np.testing.assert_array_equal(cache.get('c')['values'], values)
@@ -0,0 +1,53 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from models import LoanData
+from scorer import LinearScorer, FeatureAssembler, MappedLinearScorer
+from record_decoder import decode_record
+
+FIELD_VALUES = {str: 'A', int: 3, float: 1.5}
+RECORD = {
+    name: FIELD_VALUES[annotation]
+    for name, annotation in LoanData.__annotations__.items()
+}
+
+
+def test_decode_record_matches_pydantic():
+    body = json.dumps({**RECORD, 'annual_income': 85000, 'unknown': 1}).encode()
+    record = decode_record(body)
+    assert record == LoanData.parse_raw(body).dict()
+    assert isinstance(record['annual_income'], float)
+
+    # Coercible values take the pydantic path
+    assert decode_record(json.dumps({**RECORD, 'term': '60'}).encode())['term'] == 60
+    for body in [json.dumps({**RECORD, 'term': None}).encode(), b'{"term": 60']:
+        with pytest.raises(ValidationError):
+            decode_record(body)
+
+
+def test_assembler_matches_scorer(tmp_path):
+    scorer = LinearScorer(
+        {
+            'numerical_features': ['annual_income', 'term'],
+            'numerical_weights': [1e-5, 0.02],
+            'categorical_weights': {
+                'grade': {'A': -0.5, 'G': 0.7},
+                'state': {'A': 0.1},
+            },
+            'intercept': -1.2,
+            'threshold': 0.5,
+        }
+    )
+    MappedLinearScorer.write(scorer, str(tmp_path))
+    records = [RECORD, {**RECORD, 'grade': 'G', 'state': 'NY', 'term': 60}]
+    expected = scorer.predict_proba(pd.DataFrame(records))[:, 1]
+
+    for model in [scorer, MappedLinearScorer(str(tmp_path))]:
+        assembler = FeatureAssembler(model)
+        np.testing.assert_allclose(
+            [assembler.predict_proba(record) for record in records], expected
+        )
@@ -0,0 +1,46 @@
+import os
+import filecmp
+
+import numpy as np
+
+from reference_profile import ReferenceProfile
+from conftest import PIPELINES_DIR, FASTAPI_BACKEND_DIR
+
+NUMERICAL = ['annual_income', 'debt_to_income', 'interest_rate', 'delinq_2y']
+CATEGORICAL = ['emp_title', 'state', 'grade']
+
+
+def test_reference_profile_module_is_shared_with_backend():
+    assert filecmp.cmp(
+        os.path.join(PIPELINES_DIR, 'reference_profile.py'),
+        os.path.join(FASTAPI_BACKEND_DIR, 'reference_profile.py'),
+        shallow=False,
+    )
+
+
+def test_profile_summaries_and_json_round_trip(tmp_path, loan_df):
+    loan_df.loc[:99, 'annual_income'] = np.nan
+    loan_df.to_parquet(tmp_path / 'reference.parquet')
+    profile = ReferenceProfile.from_parquet(
+        str(tmp_path / 'reference.parquet'), NUMERICAL, CATEGORICAL, 'loan_status'
+    )
+
+    assert profile.n_rows == len(loan_df)
+    assert profile.missing_rates['annual_income'] == 100 / len(loan_df)
+    assert profile.target_rate == loan_df['loan_status'].mean()
+    assert (
+        profile.quantiles['interest_rate']['0.5'] == loan_df['interest_rate'].median()
+    )
+    assert profile.frequencies('state') == (
+        loan_df['state'].value_counts(normalize=True).sort_index().to_dict()
+    )
+    # Missing values land in the last bin
+    assert profile.counts['annual_income'][-1] == 100
+
+    profile.save(str(tmp_path / 'profile.json'))
+    loaded = ReferenceProfile.load(str(tmp_path / 'profile.json'))
+    assert loaded.to_dict() == profile.to_dict()
+    np.testing.assert_array_equal(
+        loaded.bin_column('grade', loan_df['grade']),
+        profile.bin_column('grade', loan_df['grade']),
+    )
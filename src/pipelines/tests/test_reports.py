@@ -0,0 +1,67 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from reports import ReportService
+
+
+def write_html(report_type, current_data, _reference_path, threshold, output_path):
+    if current_data is None:
+        raise ValueError("no predictions")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(f'<html>{report_type} {len(current_data)} {threshold}</html>')
+    return output_path
+
+
+def test_jobs_are_cached_by_key_and_expire(tmp_path):
+    service = ReportService(
+        str(tmp_path), ttl_s=60, executor=ThreadPoolExecutor(1), build_fn=write_html
+    )
+    n_prepared = []
+
+    async def prepare():
+        n_prepared.append(1)
+        return [1, 2, 3], 'reference.parquet', 0.4
+
+    async def run():
+        job = service.submit('model', ('model', 3, 10), prepare)
+        assert service.submit('model', ('model', 3, 10), prepare) is job
+        await service.wait(job)
+        other = service.submit('model', ('model', 3, 11), prepare)
+        await service.wait(other)
+        return job, other
+
+    job, other = asyncio.run(run())
+    assert len(n_prepared) == 2
+    assert job.status == 'done' and job.path != other.path
+    with open(job.path, encoding='utf-8') as f:
+        assert f.read() == '<html>model 3 0.4</html>'
+
+    # Expiry counts from the last request, not from when the report was written
+    job.finished_at -= 61
+    assert service.get(job.job_id) is job
+    job.last_accessed -= 61
+    assert service.get(job.job_id) is None
+    assert not os.path.exists(job.path)
+    assert service.get(other.job_id) is other
+    service.shutdown()
+
+
+def test_failed_jobs_are_retried(tmp_path):
+    service = ReportService(
+        str(tmp_path), executor=ThreadPoolExecutor(1), build_fn=write_html
+    )
+    results = [None, [1]]
+
+    async def prepare():
+        return results.pop(0), 'reference.parquet', 0.5
+
+    async def run():
+        failed = await service.wait(service.submit('target', ('target',), prepare))
+        retried = await service.wait(service.submit('target', ('target',), prepare))
+        return failed, retried
+
+    failed, retried = asyncio.run(run())
+    assert failed.status == 'failed' and failed.error == 'no predictions'
+    assert retried.status == 'done'
+    service.shutdown()
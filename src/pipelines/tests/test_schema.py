@@ -0,0 +1,18 @@
+import pandas as pd
+
+from models import LOAN_DTYPES as SERVING_LOAN_DTYPES
+from schema import CLEAN_DTYPES, LOAN_DTYPES, apply_schema
+
+
+def test_pipeline_schema_mirrors_serving_schema():
+    assert LOAN_DTYPES == SERVING_LOAN_DTYPES
+
+
+def test_apply_schema_casts_known_columns_only(loan_df):
+    df = apply_schema(loan_df.assign(extra=1.0))
+
+    assert isinstance(df['grade'].dtype, pd.CategoricalDtype)
+    assert df['interest_rate'].dtype == 'float32'
+    assert df['term'].dtype == 'int16'
+    assert df['loan_status'].dtype == CLEAN_DTYPES['loan_status']
+    assert df['extra'].dtype == 'float64'
@@ -0,0 +1,57 @@
+import os
+import filecmp
+
+import pandas as pd
+
+from storage import LocalBackend, CachedStorage
+from conftest import PIPELINES_DIR, FASTAPI_BACKEND_DIR
+
+
+class CountingBackend(LocalBackend):
+    def __init__(self, root):
+        super().__init__(root)
+        self.downloads = 0
+
+    def download(self, bucket, key, path):
+        self.downloads += 1
+        super().download(bucket, key, path)
+
+
+def test_storage_module_is_shared_with_backend():
+    assert filecmp.cmp(
+        os.path.join(PIPELINES_DIR, 'storage.py'),
+        os.path.join(FASTAPI_BACKEND_DIR, 'storage.py'),
+        shallow=False,
+    )
+
+
+def test_cached_storage_downloads_only_when_etag_changes(tmp_path, loan_df):
+    backend = CountingBackend(str(tmp_path / 'remote'))
+    storage = CachedStorage(backend, str(tmp_path / 'cache'), revalidate_after_s=0)
+    local_file = str(tmp_path / 'reference.parquet')
+
+    loan_df.to_parquet(local_file)
+    storage.upload(local_file, 'bucket', '/reference/data.parquet')
+    pd.testing.assert_frame_equal(
+        storage.read_parquet('bucket', '/reference/data.parquet'), loan_df
+    )
+    storage.fetch('bucket', '/reference/data.parquet')
+    assert backend.downloads == 1
+
+    loan_df.head(10).to_parquet(local_file)
+    storage.upload(local_file, 'bucket', '/reference/data.parquet')
+    assert len(storage.read_parquet('bucket', '/reference/data.parquet')) == 10
+    assert backend.downloads == 2
+
+
+def test_cached_storage_skips_revalidation_within_window(tmp_path, loan_df):
+    backend = CountingBackend(str(tmp_path / 'remote'))
+    storage = CachedStorage(backend, str(tmp_path / 'cache'), revalidate_after_s=60)
+    local_file = str(tmp_path / 'reference.parquet')
+    loan_df.to_parquet(local_file)
+    backend.upload(local_file, 'bucket', 'data.parquet')
+
+    storage.fetch('bucket', 'data.parquet')
+    os.remove(os.path.join(backend.root, 'bucket', 'data.parquet'))
+    # Served from the cache without contacting the (now empty) backend
+    assert os.path.exists(storage.fetch('bucket', 'data.parquet'))
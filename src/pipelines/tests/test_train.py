@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import fbeta_score, recall_score, precision_score
+
+from train import LoanPredictionModel, find_best_threshold, train_val_test_indices
+
+
+@pytest.fixture(name='scores')
+def scores_fixture():
+    rng = np.random.default_rng(0)
+    y_true = (rng.random(3000) < 0.15).astype(int)
+    # Rounded so that many probabilities are tied
+    probabilities = np.round(
+        np.clip(0.15 + 0.3 * y_true + rng.normal(0, 0.2, 3000), 0, 1), 3
+    )
+    return y_true, probabilities
+
+
+def brute_force_scores(y_true, probabilities, metric):
+    thresholds = np.unique(probabilities)
+    return max(metric(y_true, (probabilities > t).astype(int)) for t in thresholds)
+
+
+@pytest.mark.parametrize('beta', [1.0, 2.0])
+def test_find_best_threshold_matches_exhaustive_search(scores, beta):
+    y_true, probabilities = scores
+    objective = 'f1' if beta == 1.0 else 'fbeta'
+    threshold, score = find_best_threshold(y_true, probabilities, objective, beta=beta)
+
+    preds = (probabilities > threshold).astype(int)
+    assert score == pytest.approx(fbeta_score(y_true, preds, beta=beta))
+    assert (
+        score
+        >= brute_force_scores(
+            y_true, probabilities, lambda y, p: fbeta_score(y, p, beta=beta)
+        )
+        - 1e-12
+    )
+
+
+def test_find_best_threshold_recall_floor(scores):
+    y_true, probabilities = scores
+    threshold, score = find_best_threshold(
+        y_true, probabilities, 'recall_floor', min_recall=0.9
+    )
+
+    preds = (probabilities > threshold).astype(int)
+    assert recall_score(y_true, preds) >= 0.9
+    assert score == pytest.approx(precision_score(y_true, preds))
+
+
+def test_train_val_test_indices_partition_rows():
+    # 100000 rows used to round the second split to 85001 rows out of 85000
+    y = pd.Series((np.random.default_rng(0).random(100000) < 0.15).astype(int))
+    train, val, test = train_val_test_indices(y, 0.7, 0.15, 0.15, random_state=42)
+
+    assert (len(train), len(val), len(test)) == (69999, 15001, 15000)
+    np.testing.assert_array_equal(
+        np.sort(np.concatenate([train, val, test])), np.arange(len(y))
+    )
+    for indices in (train, val, test):
+        assert y.iloc[indices].mean() == pytest.approx(y.mean(), abs=1e-3)
+
+
+def test_loan_prediction_model_takes_rows_without_the_label(loan_df):
+    model = LoanPredictionModel(loan_df)
+    X, y = model.take(np.array([5, 1, 3]))
+
+    pd.testing.assert_frame_equal(
+        X, loan_df.drop(columns='loan_status').iloc[[5, 1, 3]]
+    )
+    pd.testing.assert_series_equal(y, loan_df['loan_status'].iloc[[5, 1, 3]])
+    counts = loan_df['loan_status'].value_counts()
+    assert model.class_weights == pytest.approx(
+        {label: len(loan_df) / (2 * counts[label]) for label in (0, 1)}
+    )
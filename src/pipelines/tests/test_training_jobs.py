@@ -0,0 +1,47 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from training_jobs import TrainingQueue
+
+
+def test_triggers_are_deduplicated_while_a_job_is_active():
+    release = threading.Event()
+    n_runs = []
+
+    def train():
+        n_runs.append(1)
+        release.wait(5)
+
+    training_queue = TrainingQueue(train, lambda: ThreadPoolExecutor(1))
+    job, deduplicated = training_queue.submit()
+    assert not deduplicated
+    assert training_queue.submit() == (job, True)
+    release.set()
+    # Shutting down waits for the queued jobs
+    training_queue.shutdown()
+    assert job.status == 'succeeded' and job.duration_s >= 0
+
+    other, deduplicated = training_queue.submit()
+    training_queue.shutdown()
+    assert not deduplicated and other.job_id != job.job_id
+    assert len(n_runs) == 2
+
+
+def test_failed_jobs_are_recorded_and_history_is_bounded():
+    errors = [ValueError("no data"), None]
+
+    def train():
+        error = errors.pop(0)
+        if error is not None:
+            raise error
+
+    training_queue = TrainingQueue(train, lambda: ThreadPoolExecutor(1), max_history=1)
+    failed, _ = training_queue.submit()
+    training_queue.shutdown()
+    assert failed.status == 'failed' and failed.error == 'no data'
+
+    retried, _ = training_queue.submit()
+    training_queue.shutdown()
+    assert retried.status == 'succeeded'
+    assert training_queue.list_jobs() == [retried]
+    assert training_queue.get(failed.job_id) is None
@@ -1,64 +1,196 @@
 import os
 import logging
-from typing import Any, Dict, Tuple
+import tempfile
+from typing import Any, Dict, List, Tuple, Optional
 
-import boto3
 import numpy as np
 import mlflow
 import pandas as pd
+from sklearn.base import clone
 from sklearn.compose import make_column_transformer
 from sklearn.metrics import f1_score, recall_score, precision_score
-from sklearn.pipeline import make_pipeline
+from sklearn.pipeline import Pipeline, make_pipeline
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.model_selection import train_test_split
 
+from schema import NUMERICAL_FEATURES, CATEGORICAL_FEATURES, TARGET, apply_schema
+from storage import get_storage
+from export_scorer import export_linear_scorer
+from reference_profile import PROFILE_FILENAME, ReferenceProfile
+from preprocessing_cache import (
+    PreprocessingCache,
+    make_cache_key,
+    data_fingerprint,
+    transformer_config,
+)
+from hyperparameter_search import HyperparameterSearch
+from incremental import ReservoirSample, extend_pipeline, warm_start_params
+from out_of_core import VAL, TEST, StreamingLoanModel, balanced_class_weights
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+REGISTERED_MODEL_NAME = "loan-prediction"
+DEFAULT_PARAMS = {
+    'C': 0.31303873900972606,
+    'penalty': 'l1',
+    'solver': 'liblinear',
+    'random_state': 42,
+}
+
+
+def _threshold_sweep(
+    y_true: np.ndarray, probabilities: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Every distinct probability cut with its true and false positive counts."""
+    y_true = np.asarray(y_true)
+    probabilities = np.asarray(probabilities, dtype=float)
+    order = np.argsort(-probabilities, kind='mergesort')
+    sorted_probas = probabilities[order]
+    sorted_labels = y_true[order]
+
+    # Cumulative counts at the last position of each distinct probability
+    cut_idx = np.append(np.flatnonzero(np.diff(sorted_probas)), sorted_probas.size - 1)
+    true_positives = np.cumsum(sorted_labels)[cut_idx]
+    false_positives = cut_idx + 1 - true_positives
+
+    # Threshold halfway to the next lower distinct value keeps the cut intact
+    values = sorted_probas[cut_idx]
+    thresholds = np.append(
+        (values[:-1] + values[1:]) / 2, np.nextafter(values[-1], -np.inf)
+    )
+    return thresholds, true_positives, false_positives
+
+
+def find_best_threshold(
+    y_true: np.ndarray,
+    probabilities: np.ndarray,
+    objective: str = 'f1',
+    beta: float = 1.0,
+    min_recall: float = 0.8,
+) -> Tuple[float, float]:
+    """Sweep every distinct probability cut in one sorted pass.
+
+    Predictions are positive when ``probability > threshold``. Supported
+    objectives are ``'f1'``, ``'fbeta'`` (``beta > 1`` weights recall) and
+    ``'recall_floor'``, which maximizes precision among the thresholds whose
+    recall is at least ``min_recall``. Returns the threshold and its score.
+    """
+    thresholds, true_positives, false_positives = _threshold_sweep(
+        y_true, probabilities
+    )
+    n_positives = true_positives[-1]
+    recall = true_positives / max(n_positives, 1)
+    if objective == 'f1':
+        beta = 1.0
+    if objective in ('f1', 'fbeta'):
+        beta2 = beta**2
+        scores = (
+            (1 + beta2)
+            * true_positives
+            / (
+                (1 + beta2) * true_positives
+                + beta2 * (n_positives - true_positives)
+                + false_positives
+            )
+        )
+    elif objective == 'recall_floor':
+        scores = np.where(
+            recall >= min_recall,
+            true_positives / (true_positives + false_positives),
+            -1.0,
+        )
+    else:
+        raise ValueError(f"Unknown threshold objective: {objective}")
+
+    best = int(np.argmax(scores))
+    return float(thresholds[best]), float(scores[best])
+
 
 class LoanPredictionModel:
-    def __init__(self, data_frame: pd.DataFrame):
+    def __init__(
+        self,
+        data_frame: pd.DataFrame,
+        threshold_objective: str = 'f1',
+        threshold_beta: float = 1.0,
+        min_recall: float = 0.8,
+        frequency_encoded_features: Optional[List[str]] = None,
+        min_category_frequency: int = 20,
+    ):
         self.df = data_frame
-        self.X, self.y = self._split_features_labels()
+        self.frequency_encoded_features = frequency_encoded_features or []
+        self.min_category_frequency = min_category_frequency
+        self.y = self.df[TARGET]
         self.n_classes = 2
         self.class_weights = self._compute_class_weights()
-        self.categorical_features = self.X.select_dtypes(
-            include=['object']
+        # Feature dtypes from an empty slice, so no rows are copied
+        features = self.df.iloc[:0].drop(columns=[TARGET])
+        self.categorical_features = features.select_dtypes(
+            include=['object', 'category']
         ).columns.tolist()
-        self.numerical_features = self.X.select_dtypes(
-            include=['int64', 'float64']
+        self.numerical_features = features.select_dtypes(
+            include=['number']
         ).columns.tolist()
         self.preprocessor = self._build_preprocessor()
-        self.params = {
-            'C': 0.31303873900972606,
-            'class_weight': self.class_weights,
-            'penalty': 'l1',
-            'solver': 'liblinear',
-            'random_state': 42,
-        }
-
-    def _split_features_labels(self) -> Tuple[pd.DataFrame, pd.Series]:
-        """Split dataframe into features and labels."""
-        return self.df.drop(columns=['loan_status']), self.df['loan_status']
+        self.params = {**DEFAULT_PARAMS, 'class_weight': self.class_weights}
+        self.threshold_objective = threshold_objective
+        self.threshold_beta = threshold_beta
+        self.min_recall = min_recall
+
+    @property
+    def X(self) -> pd.DataFrame:
+        """All feature columns, copied on every access; prefer ``take``."""
+        return self.df.drop(columns=[TARGET])
+
+    def take(self, indices: np.ndarray) -> Tuple[pd.DataFrame, pd.Series]:
+        """Features and labels of the rows at positions ``indices``.
+
+        The rows are copied once; the label column is then split off
+        without copying the features again.
+        """
+        X = self.df.take(indices)
+        y = X.pop(TARGET)
+        return X, y
 
     def _compute_class_weights(self) -> Dict[int, float]:
         """Compute class weights for imbalanced dataset."""
-        count_majority_class = self.df['loan_status'].value_counts()[0]
-        count_minority_class = self.df['loan_status'].value_counts()[1]
-        total_samples = count_majority_class + count_minority_class
-        weight_majority_class = total_samples / (self.n_classes * count_majority_class)
-        weight_minority_class = total_samples / (self.n_classes * count_minority_class)
-        return {0: weight_majority_class, 1: weight_minority_class}
+        class_counts = np.bincount(self.y.to_numpy(), minlength=self.n_classes)
+        return balanced_class_weights(class_counts)
 
     def _build_preprocessor(self) -> Any:
-        """Build column transformer for preprocessing."""
+        """Build column transformer for preprocessing.
+
+        Categorical features are one-hot encoded. Those listed in
+        ``frequency_encoded_features`` only get a column for categories seen
+        at least ``min_category_frequency`` times in training; rarer and
+        unseen categories share one "other" column.
+        """
         numerical_transformer = StandardScaler(with_mean=False)
         categorical_transformer = OneHotEncoder(handle_unknown='ignore')
-        return make_column_transformer(
+        transformers = [
             (numerical_transformer, self.numerical_features),
-            (categorical_transformer, self.categorical_features),
-        )
+            (
+                categorical_transformer,
+                [
+                    column
+                    for column in self.categorical_features
+                    if column not in self.frequency_encoded_features
+                ],
+            ),
+        ]
+        capped_features = [
+            column
+            for column in self.categorical_features
+            if column in self.frequency_encoded_features
+        ]
+        if capped_features:
+            capped_transformer = OneHotEncoder(
+                min_frequency=self.min_category_frequency,
+                handle_unknown='infrequent_if_exist',
+            )
+            transformers.append((capped_transformer, capped_features))
+        return make_column_transformer(*transformers)
 
     def train_and_log(
         self,
@@ -68,80 +200,214 @@ class LoanPredictionModel:
         y_val: pd.Series,
         X_test: pd.DataFrame,
         y_test: pd.Series,
+        cache: Optional[PreprocessingCache] = None,
+        reference_profile: Optional[ReferenceProfile] = None,
+        base_pipeline: Optional[Pipeline] = None,
+        reservoir: Optional[ReservoirSample] = None,
     ) -> None:
-        """Train the model and log parameters, metrics, and the model itself."""
-        mlflow.log_params(self.params)
-        pipeline = make_pipeline(self.preprocessor, LogisticRegression(**self.params))
-        pipeline.fit(X_train, y_train)
-        best_threshold = self._find_best_threshold(pipeline, X_val, y_val)
-        self._log_metrics_and_model(pipeline, X_test, y_test, best_threshold)
+        """Train the model and log parameters, metrics, and the model itself.
+
+        With a ``base_pipeline`` the classifier is warm-started from its
+        coefficients, over its preprocessor extended with the training
+        split's new categories. A given ``reference_profile`` and
+        ``reservoir`` are logged next to the model, for the serving app's
+        drift monitoring and the next incremental training respectively.
+        """
+        pipeline, Xt_val, Xt_test = self._fit(
+            X_train, y_train, X_val, X_test, cache, base_pipeline
+        )
+        best_threshold = self._find_best_threshold(pipeline[-1], Xt_val, y_val)
+        self._log_metrics_and_model(
+            pipeline, Xt_test, y_test, best_threshold, reference_profile, reservoir
+        )
+
+    def _fit(
+        self,
+        X_train: pd.DataFrame,
+        y_train: pd.Series,
+        X_val: pd.DataFrame,
+        X_test: pd.DataFrame,
+        cache: Optional[PreprocessingCache] = None,
+        base_pipeline: Optional[Pipeline] = None,
+    ) -> Tuple[Pipeline, Any, Any]:
+        """Fit the pipeline on the train split; also returns the transformed
+        validation and test splits."""
+        if base_pipeline is not None:
+            preprocessor, classifier = extend_pipeline(
+                base_pipeline, X_train, self.params
+            )
+            Xt_train, Xt_val, Xt_test = (
+                preprocessor.transform(X) for X in (X_train, X_val, X_test)
+            )
+        else:
+            preprocessor, Xt_train, Xt_val, Xt_test = self._preprocess_splits(
+                X_train, X_val, X_test, cache
+            )
+            classifier = LogisticRegression(**self.params)
+        classifier.fit(Xt_train, y_train)
+        return make_pipeline(preprocessor, classifier), Xt_val, Xt_test
+
+    def _preprocess_splits(
+        self,
+        X_train: pd.DataFrame,
+        X_val: pd.DataFrame,
+        X_test: pd.DataFrame,
+        cache: Optional[PreprocessingCache] = None,
+    ) -> Tuple[Any, Any, Any, Any]:
+        """Fit the preprocessor on the train split and transform all splits.
+
+        With a cache, the fitted preprocessor and transformed matrices are
+        reused whenever the split data and preprocessor configuration match.
+        """
+        if cache is not None:
+            key = make_cache_key(
+                'splits',
+                data_fingerprint(X_train, X_val, X_test),
+                transformer_config(self.preprocessor),
+            )
+            entry = cache.get(key)
+            if entry is not None:
+                return (
+                    entry['preprocessor'],
+                    entry['X_train'],
+                    entry['X_val'],
+                    entry['X_test'],
+                )
+
+        preprocessor = clone(self.preprocessor)
+        Xt_train = preprocessor.fit_transform(X_train)
+        Xt_val = preprocessor.transform(X_val)
+        Xt_test = preprocessor.transform(X_test)
+        if cache is not None:
+            cache.put(
+                key,
+                {
+                    'preprocessor': preprocessor,
+                    'X_train': Xt_train,
+                    'X_val': Xt_val,
+                    'X_test': Xt_test,
+                },
+            )
+        return preprocessor, Xt_train, Xt_val, Xt_test
 
     def _find_best_threshold(
-        self, pipeline: Any, X_val: pd.DataFrame, y_val: pd.Series
+        self, classifier: Any, Xt_val: Any, y_val: pd.Series
     ) -> float:
-        """Find the best threshold for classification based on F1 score."""
-        probabilities = pipeline.predict_proba(X_val)[:, 1]
-        thresholds = np.linspace(0, 1, 100)
-        scores = [
-            f1_score(y_val, [1 if prob > threshold else 0 for prob in probabilities])
-            for threshold in thresholds
-        ]
-        return thresholds[np.argmax(scores)]
+        """Find the best classification threshold for the configured objective."""
+        probabilities = classifier.predict_proba(Xt_val)[:, 1]
+        threshold, score = find_best_threshold(
+            y_val,
+            probabilities,
+            objective=self.threshold_objective,
+            beta=self.threshold_beta,
+            min_recall=self.min_recall,
+        )
+        logger.info(
+            "Best threshold %.4f (%s = %.4f)",
+            threshold,
+            self.threshold_objective,
+            score,
+        )
+        return threshold
 
     def _log_metrics_and_model(
         self,
         pipeline: Any,
-        X_test: pd.DataFrame,
+        Xt_test: Any,
         y_test: pd.Series,
         best_threshold: float,
+        reference_profile: Optional[ReferenceProfile] = None,
+        reservoir: Optional[ReservoirSample] = None,
     ) -> None:
         """Log model metrics and save the model to mlflow."""
-        with mlflow.start_run():
-            y_preds = pipeline.predict_proba(X_test)[:, 1]
-            y_preds_threshold = [1 if prob > best_threshold else 0 for prob in y_preds]
-            f1 = f1_score(y_test, y_preds_threshold)
-            precision = precision_score(y_test, y_preds_threshold)
-            recall = recall_score(y_test, y_preds_threshold)
+        log_training_run(
+            self.params,
+            pipeline,
+            y_test,
+            pipeline[-1].predict_proba(Xt_test)[:, 1],
+            best_threshold,
+            reference_profile,
+            reservoir,
+        )
+
+
+def log_training_run(
+    params: Dict[str, Any],
+    pipeline: Any,
+    y_test: Any,
+    test_probabilities: np.ndarray,
+    best_threshold: float,
+    reference_profile: Optional[ReferenceProfile] = None,
+    reservoir: Optional[ReservoirSample] = None,
+) -> None:
+    """Log the parameters, test metrics, model and its side artifacts as a run."""
+    with mlflow.start_run():
+        mlflow.log_params(params)
+        y_preds_threshold = (test_probabilities > best_threshold).astype(int)
+        f1 = f1_score(y_test, y_preds_threshold)
+        precision = precision_score(y_test, y_preds_threshold)
+        recall = recall_score(y_test, y_preds_threshold)
 
-            mlflow.log_metric("f1-score", f1)
-            mlflow.log_metric("precision", precision)
-            mlflow.log_metric("recall", recall)
-            mlflow.sklearn.log_model(pipeline, artifact_path="model")
+        mlflow.log_metric("f1-score", f1)
+        mlflow.log_metric("precision", precision)
+        mlflow.log_metric("recall", recall)
+        mlflow.log_metric("threshold", best_threshold)
+        # The serving app reads the decision threshold from the model metadata
+        mlflow.sklearn.log_model(
+            pipeline,
+            artifact_path="model",
+            metadata={'threshold': float(best_threshold)},
+        )
+        mlflow.log_dict(
+            export_linear_scorer(pipeline, best_threshold), "scorer/scorer.json"
+        )
+        if reference_profile is not None:
+            mlflow.log_dict(
+                reference_profile.to_dict(),
+                f"reference_profile/{PROFILE_FILENAME}",
+            )
+        if reservoir is not None:
+            with tempfile.TemporaryDirectory() as reservoir_dir:
+                reservoir.save(reservoir_dir)
+                mlflow.log_artifacts(reservoir_dir, "reservoir")
 
 
-def train_val_test_split(
-    X: pd.DataFrame,
+def train_val_test_indices(
     y: pd.Series,
     train_size: float,
     val_size: float,
     test_size: float,
     random_state: int,
-) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.Series, pd.Series, pd.Series]:
-    """Split the dataset into train, validation and test sets."""
-    if train_size + val_size + test_size != 1:
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Stratified row positions of the train, validation and test sets.
+
+    Only integer positions are shuffled; rows are copied once per split
+    when the positions are applied.
+    """
+    if not np.isclose(train_size + val_size + test_size, 1):
         raise ValueError("train_size, val_size, and test_size should sum up to 1")
 
-    X_train_val, X_test, y_train_val, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=random_state, stratify=y
+    labels = np.asarray(y)
+    train_val, test = train_test_split(
+        np.arange(len(labels)),
+        test_size=test_size,
+        random_state=random_state,
+        stratify=labels,
     )
-    relative_train_size = train_size / (val_size + train_size)
-    X_train, X_val, y_train, y_val = train_test_split(
-        X_train_val,
-        y_train_val,
-        train_size=relative_train_size,
-        test_size=1 - relative_train_size,
+    # Given both sizes, rounding can ask for one row more than there is
+    train, val = train_test_split(
+        train_val,
+        test_size=val_size / (train_size + val_size),
         random_state=random_state,
-        stratify=y_train_val,
+        stratify=labels[train_val],
     )
-    return X_train, X_val, X_test, y_train, y_val, y_test
+    return train, val, test
 
 
 def load_data_from_s3(bucket_name: str, key_path: str) -> pd.DataFrame:
-    """Load data from S3 and return as a dataframe."""
-    s3 = boto3.client('s3')
+    """Load data from S3 (through the local cache) and return as a dataframe."""
     try:
-        obj = s3.get_object(Bucket=bucket_name, Key=key_path)
-        return pd.read_parquet(obj['Body'])
+        return apply_schema(get_storage().read_parquet(bucket_name, key_path))
     except Exception as e:
         logger.error("Error loading data from S3: %s", e)
         raise
@@ -159,50 +425,271 @@ def post_training_tasks() -> None:
     latest_run_id = latest_run["run_id"]
 
     model_uri = f"runs:/{latest_run_id}/model"
-    model_details = mlflow.register_model(model_uri, "loan-prediction")
+    model_details = mlflow.register_model(model_uri, REGISTERED_MODEL_NAME)
 
     client = mlflow.tracking.MlflowClient()
     # Transition model version to 'Production' stage
     client.transition_model_version_stage(
-        name="loan-prediction",
+        name=REGISTERED_MODEL_NAME,
         version=model_details.version,
         stage="Production",
     )
 
 
-def main() -> None:
-    """Main function to execute the entire flow of training, logging, and post-training tasks."""
-    ARTIFACT_BUCKET_NAME = os.environ.get(
-        "ARTIFACT_BUCKET_NAME", "your_default_bucket_name"
+def load_production_run() -> Tuple[Pipeline, Optional[ReservoirSample]]:
+    """Load the Production model and the reservoir sample logged with it."""
+    client = mlflow.tracking.MlflowClient()
+    versions = client.get_latest_versions(REGISTERED_MODEL_NAME, stages=["Production"])
+    if not versions:
+        raise RuntimeError("No Production model to continue training from")
+    run_id = max(versions, key=lambda v: int(v.version)).run_id
+    pipeline = mlflow.sklearn.load_model(f"runs:/{run_id}/model")
+    try:
+        reservoir_dir = mlflow.artifacts.download_artifacts(f"runs:/{run_id}/reservoir")
+    except Exception as e:
+        logger.warning("No reservoir sample logged with run %s: %s", run_id, e)
+        return pipeline, None
+    return pipeline, ReservoirSample.load(reservoir_dir)
+
+
+def _train_out_of_core(settings: Dict[str, Any]) -> None:
+    """Train on a parquet file one row group at a time and log the run.
+
+    Validation and test rows are picked by hashing, and only their labels
+    and predicted probabilities are held in memory.
+    """
+    # Only the local copy is opened, row group by row group
+    data_path = get_storage().fetch(
+        settings['ARTIFACT_BUCKET_NAME'], settings['REFERENCE_DATA_KEY_PATH']
+    )
+    model = StreamingLoanModel(
+        data_path,
+        DEFAULT_PARAMS,
+        epochs=settings['OUT_OF_CORE_EPOCHS'],
+        random_state=settings['RANDOM_STATE'],
+        frequency_encoded_features=settings['FREQUENCY_ENCODED_FEATURES'],
+        min_category_frequency=settings['MIN_CATEGORY_FREQUENCY'],
+    )
+    reservoir = ReservoirSample(settings['RESERVOIR_SIZE'], settings['RANDOM_STATE'])
+    model.fit_statistics(reservoir)
+    logger.info(
+        "Streamed %d row groups, %d training rows.",
+        model.n_row_groups,
+        model.class_counts.sum(),
     )
-    REFERENCE_DATA_KEY_PATH = os.environ.get(
-        "REFERENCE_DATA_KEY_PATH", "your_default_key_path"
+    model.fit()
+    predictions = model.predict_splits((VAL, TEST))
+    best_threshold, score = find_best_threshold(
+        *predictions[VAL],
+        objective=settings['THRESHOLD_OBJECTIVE'],
+        beta=settings['THRESHOLD_BETA'],
+        min_recall=settings['MIN_RECALL'],
+    )
+    logger.info(
+        "Best threshold %.4f (%s = %.4f)",
+        best_threshold,
+        settings['THRESHOLD_OBJECTIVE'],
+        score,
+    )
+    reference_profile = ReferenceProfile.from_parquet(
+        data_path, NUMERICAL_FEATURES, CATEGORICAL_FEATURES, target=TARGET
+    )
+    log_training_run(
+        {**model.sgd_params, 'epochs': settings['OUT_OF_CORE_EPOCHS']},
+        model.pipeline,
+        *predictions[TEST],
+        best_threshold,
+        reference_profile,
+        reservoir,
     )
-    TRACKING_URI = os.environ.get("MLFLOW_TRACKING_URI", "your_default_mlflow_uri")
-    RANDOM_STATE = int(os.environ.get("RANDOM_STATE", 42))
 
-    mlflow.set_tracking_uri(TRACKING_URI)
 
-    # Load data
-    df = load_data_from_s3(
-        bucket_name=ARTIFACT_BUCKET_NAME, key_path=REFERENCE_DATA_KEY_PATH
+def _search_params(
+    loan_model: LoanPredictionModel,
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    cache: Optional[PreprocessingCache],
+    settings: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Classifier parameters from the configured search, or the defaults."""
+    if not settings['SEARCH_STRATEGY']:
+        return loan_model.params
+    search = HyperparameterSearch(
+        loan_model.params,
+        strategy=settings['SEARCH_STRATEGY'],
+        n_candidates=settings['SEARCH_N_CANDIDATES'],
+        time_budget_s=settings['SEARCH_TIME_BUDGET_S'],
+        random_state=settings['RANDOM_STATE'],
+        cache=cache,
+    )
+    params = search.run(loan_model.preprocessor, X_train, y_train)
+    logger.info("Hyperparameter search completed successfully.")
+    return params
+
+
+def _fit_and_log(
+    df: pd.DataFrame,
+    reservoir: ReservoirSample,
+    settings: Dict[str, Any],
+    base_pipeline: Optional[Pipeline] = None,
+) -> None:
+    """Split ``df``, train on it (continuing ``base_pipeline`` if given) and
+    log the run."""
+    reference_profile = ReferenceProfile.from_frame(
+        df, NUMERICAL_FEATURES, CATEGORICAL_FEATURES, target=TARGET
     )
-    logger.info("Data loaded from S3 successfully.")
 
     # Splitting data
-    loan_model = LoanPredictionModel(df)
-    X_train, X_val, X_test, y_train, y_val, y_test = train_val_test_split(
-        loan_model.X,
-        loan_model.y,
-        train_size=0.7,
-        val_size=0.15,
-        test_size=0.15,
-        random_state=RANDOM_STATE,
+    loan_model = LoanPredictionModel(
+        df,
+        threshold_objective=settings['THRESHOLD_OBJECTIVE'],
+        threshold_beta=settings['THRESHOLD_BETA'],
+        min_recall=settings['MIN_RECALL'],
+        frequency_encoded_features=settings['FREQUENCY_ENCODED_FEATURES'],
+        min_category_frequency=settings['MIN_CATEGORY_FREQUENCY'],
+    )
+    (X_train, y_train), (X_val, y_val), (X_test, y_test) = (
+        loan_model.take(indices)
+        for indices in train_val_test_indices(
+            loan_model.y,
+            train_size=0.7,
+            val_size=0.15,
+            test_size=0.15,
+            random_state=settings['RANDOM_STATE'],
+        )
     )
     logger.info("Data splitted successfully.")
 
-    # Train, log and post-training tasks
-    loan_model.train_and_log(X_train, y_train, X_val, y_val, X_test, y_test)
+    cache = (
+        PreprocessingCache(
+            settings['PREPROCESSING_CACHE_DIR'],
+            settings['PREPROCESSING_CACHE_MAX_BYTES'],
+        )
+        if settings['PREPROCESSING_CACHE_DIR']
+        else None
+    )
+    if base_pipeline is not None:
+        loan_model.params = warm_start_params(base_pipeline[-1], loan_model.params)
+    else:
+        loan_model.params = _search_params(
+            loan_model, X_train, y_train, cache, settings
+        )
+
+    loan_model.train_and_log(
+        X_train,
+        y_train,
+        X_val,
+        y_val,
+        X_test,
+        y_test,
+        cache=cache,
+        reference_profile=reference_profile,
+        base_pipeline=base_pipeline,
+        reservoir=reservoir,
+    )
+
+
+def _train_full(settings: Dict[str, Any]) -> None:
+    """Retrain from scratch on the reference data."""
+    df = load_data_from_s3(
+        bucket_name=settings['ARTIFACT_BUCKET_NAME'],
+        key_path=settings['REFERENCE_DATA_KEY_PATH'],
+    )
+    logger.info("Data loaded from S3 successfully.")
+    reservoir = ReservoirSample(settings['RESERVOIR_SIZE'], settings['RANDOM_STATE'])
+    reservoir.update(df)
+    _fit_and_log(df, reservoir, settings)
+
+
+def _train_incremental(settings: Dict[str, Any]) -> None:
+    """Continue the Production model on the newly labelled rows plus a
+    reservoir sample of the rows trained on before."""
+    base_pipeline, reservoir = load_production_run()
+    window = load_data_from_s3(
+        bucket_name=settings['ARTIFACT_BUCKET_NAME'],
+        key_path=settings['NEW_DATA_KEY_PATH'],
+    )
+    if reservoir is None:
+        reservoir = ReservoirSample(
+            settings['RESERVOIR_SIZE'], settings['RANDOM_STATE']
+        )
+        reservoir.update(
+            load_data_from_s3(
+                bucket_name=settings['ARTIFACT_BUCKET_NAME'],
+                key_path=settings['REFERENCE_DATA_KEY_PATH'],
+            )
+        )
+    df = apply_schema(pd.concat([window, reservoir.rows], ignore_index=True))
+    reservoir.update(window)
+    logger.info(
+        "Training on %d new rows and %d sampled from history.",
+        len(window),
+        len(df) - len(window),
+    )
+    _fit_and_log(df, reservoir, settings, base_pipeline=base_pipeline)
+
+
+TRAINING_MODES = {
+    'full': _train_full,
+    'incremental': _train_incremental,
+    'out_of_core': _train_out_of_core,
+}
+
+
+def read_settings() -> Dict[str, Any]:
+    """Training settings from the environment."""
+    return {
+        'ARTIFACT_BUCKET_NAME': os.environ.get(
+            "ARTIFACT_BUCKET_NAME", "your_default_bucket_name"
+        ),
+        'REFERENCE_DATA_KEY_PATH': os.environ.get(
+            "REFERENCE_DATA_KEY_PATH", "your_default_key_path"
+        ),
+        'TRACKING_URI': os.environ.get(
+            "MLFLOW_TRACKING_URI", "your_default_mlflow_uri"
+        ),
+        'RANDOM_STATE': int(os.environ.get("RANDOM_STATE", 42)),
+        'THRESHOLD_OBJECTIVE': os.environ.get("THRESHOLD_OBJECTIVE", "f1"),
+        'THRESHOLD_BETA': float(os.environ.get("THRESHOLD_BETA", 2.0)),
+        'MIN_RECALL': float(os.environ.get("MIN_RECALL", 0.8)),
+        # One of 'grid', 'random' or 'halving'; unset keeps the default C
+        'SEARCH_STRATEGY': os.environ.get("SEARCH_STRATEGY", ""),
+        'SEARCH_N_CANDIDATES': int(os.environ.get("SEARCH_N_CANDIDATES", 20)),
+        'SEARCH_TIME_BUDGET_S': float(os.environ.get("SEARCH_TIME_BUDGET_S", 1800)),
+        # Local directory for transformed design matrices; unset disables caching
+        'PREPROCESSING_CACHE_DIR': os.environ.get("PREPROCESSING_CACHE_DIR", ""),
+        'PREPROCESSING_CACHE_MAX_BYTES': int(
+            os.environ.get("PREPROCESSING_CACHE_MAX_BYTES", 5 * 1024**3)
+        ),
+        # 'full' retrains on the reference data; 'incremental' continues the
+        # Production model on the newly labelled rows under NEW_DATA_KEY_PATH
+        # plus a reservoir sample of the rows trained on before; 'out_of_core'
+        # streams the reference data one parquet row group at a time
+        'TRAINING_MODE': os.environ.get("TRAINING_MODE", "full"),
+        'NEW_DATA_KEY_PATH': os.environ.get("NEW_DATA_KEY_PATH", "/new"),
+        'RESERVOIR_SIZE': int(os.environ.get("RESERVOIR_SIZE", 50000)),
+        'OUT_OF_CORE_EPOCHS': int(os.environ.get("OUT_OF_CORE_EPOCHS", 5)),
+        # Comma-separated high-cardinality features whose categories seen fewer
+        # than MIN_CATEGORY_FREQUENCY times are encoded as one "other" category
+        'FREQUENCY_ENCODED_FEATURES': [
+            feature
+            for feature in os.environ.get(
+                "FREQUENCY_ENCODED_FEATURES", "emp_title"
+            ).split(",")
+            if feature
+        ],
+        'MIN_CATEGORY_FREQUENCY': int(os.environ.get("MIN_CATEGORY_FREQUENCY", 20)),
+    }
+
+
+def main() -> None:
+    """Main function to execute the entire flow of training, logging, and post-training tasks."""
+    settings = read_settings()
+    if settings['TRAINING_MODE'] not in TRAINING_MODES:
+        raise ValueError(f"Unknown training mode: {settings['TRAINING_MODE']}")
+
+    mlflow.set_tracking_uri(settings['TRACKING_URI'])
+    TRAINING_MODES[settings['TRAINING_MODE']](settings)
     post_training_tasks()
     logger.info("Training and post-training tasks completed successfully.")
 
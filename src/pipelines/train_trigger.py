@@ -1,19 +1,33 @@
-import subprocess
-
 from flask import Flask
 
+from training_jobs import TrainingQueue
+
 app = Flask(__name__)
 
+# Trainings run one at a time in a persistent worker process; triggers while
+# one is queued or running return that job
+training_queue = TrainingQueue()
+
 
 @app.route('/trigger-training', methods=['POST'])
 def trigger_training():
-    try:
-        # Execute the train.py script using subprocess
-        subprocess.run(["python", "train.py"], check=True)
-        return {"message": "Training triggered successfully"}
-    except subprocess.CalledProcessError as e:
-        return {"message": f"Error triggering training: {e}"}, 500
+    job, deduplicated = training_queue.submit()
+    return {**job.to_dict(), 'deduplicated': deduplicated}, 202
+
+
+@app.route('/training-jobs', methods=['GET'])
+def list_training_jobs():
+    return {'jobs': [job.to_dict() for job in training_queue.list_jobs()]}
+
+
+@app.route('/training-jobs/<job_id>', methods=['GET'])
+def get_training_job(job_id: str):
+    job = training_queue.get(job_id)
+    if job is None:
+        return {'message': f"Unknown training job: {job_id}"}, 404
+    return job.to_dict()
 
 
 if __name__ == '__main__':
+    training_queue.start()
     app.run(host='0.0.0.0', port=5001)
@@ -0,0 +1,171 @@
+import time
+import uuid
+import queue
+import logging
+import threading
+import multiprocessing
+from typing import Any, Dict, List, Tuple, Callable, Optional
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up() -> None:
+    """Import the training code once when the worker process starts."""
+    import train  # pylint: disable=import-outside-toplevel,unused-import
+
+
+def run_training() -> None:
+    import train  # pylint: disable=import-outside-toplevel
+
+    train.main()
+
+
+def make_worker_pool() -> Executor:
+    # A single long-lived spawned worker, so imports are paid once and not per
+    # job, and the worker does not inherit the web server's threads
+    return ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=warm_up,
+    )
+
+
+class TrainingJob:
+    """State of one training run."""
+
+    def __init__(self, job_id: str, key: Tuple):
+        self.job_id = job_id
+        self.key = key
+        self.status = 'queued'
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def duration_s(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'error': self.error,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'duration_s': self.duration_s,
+        }
+
+
+class TrainingQueue:
+    """Runs training jobs one at a time in a persistent worker process.
+
+    A dispatcher thread takes jobs off the queue in order and runs
+    ``run_fn`` in the worker pool, which keeps the training imports warm
+    between jobs. A trigger for a key that already has a queued or running
+    job returns that job instead of starting another. The last
+    ``max_history`` jobs stay queryable.
+    """
+
+    def __init__(
+        self,
+        run_fn: Callable[[], Any] = run_training,
+        pool_factory: Callable[[], Executor] = make_worker_pool,
+        max_history: int = 100,
+    ):
+        self.run_fn = run_fn
+        self.pool_factory = pool_factory
+        self.max_history = max_history
+        self.jobs: Dict[str, TrainingJob] = OrderedDict()
+        self._active_by_key: Dict[Tuple, str] = {}
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pool: Optional[Executor] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the dispatcher and the worker process, warming its imports."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._pool = self.pool_factory()
+            # The pool starts its worker, and runs the initializer, on first use
+            self._pool.submit(int)
+            self._thread = threading.Thread(target=self._dispatch, daemon=True)
+            self._thread.start()
+
+    def submit(self, key: Tuple = ()) -> Tuple[TrainingJob, bool]:
+        """Queue a job for ``key`` and return it, with whether it already existed."""
+        self.start()
+        with self._lock:
+            job_id = self._active_by_key.get(key)
+            if job_id is not None:
+                return self.jobs[job_id], True
+            job = TrainingJob(uuid.uuid4().hex, key)
+            self.jobs[job.job_id] = job
+            self._active_by_key[key] = job.job_id
+            self._prune()
+        self._queue.put(job)
+        logger.info("Queued training job %s", job.job_id)
+        return job, False
+
+    def _prune(self) -> None:
+        finished = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.status in ('succeeded', 'failed')
+        ]
+        for job_id in finished[: max(0, len(self.jobs) - self.max_history)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[TrainingJob]:
+        with self._lock:
+            return list(self.jobs.values())
+
+    def _dispatch(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            self._run(job)
+
+    def _run(self, job: TrainingJob) -> None:
+        job.status = 'running'
+        job.started_at = time.time()
+        logger.info("Starting training job %s", job.job_id)
+        try:
+            self._pool.submit(self.run_fn).result()
+            job.status = 'succeeded'
+        except BrokenProcessPool as e:
+            # The worker died, e.g. out of memory; later jobs get a fresh one
+            job.status = 'failed'
+            job.error = f"Training worker exited: {e}"
+            self._pool = self.pool_factory()
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+        job.finished_at = time.time()
+        logger.info(
+            "Training job %s %s after %.1f s", job.job_id, job.status, job.duration_s
+        )
+        with self._lock:
+            del self._active_by_key[job.key]
+
+    def shutdown(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
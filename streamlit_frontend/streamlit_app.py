@@ -1,4 +1,5 @@
 import os
+import time
 
 import requests
 import streamlit as st
@@ -6,6 +7,10 @@ import streamlit.components.v1 as components
 from PIL import Image
 from pydantic import BaseModel
 
+# Reports are generated asynchronously by the backend and polled for
+REPORT_POLL_INTERVAL_S = float(os.getenv('REPORT_POLL_INTERVAL_S', '1'))
+REPORT_TIMEOUT_S = float(os.getenv('REPORT_TIMEOUT_S', '300'))
+
 
 class LoanData(BaseModel):
     emp_title: str
@@ -107,6 +112,32 @@ def display_header(name: str, size: int) -> None:
     st.caption(f'Window size: {size}')
 
 
+def fetch_report(route: str, kind: str, size: int) -> bytes:
+    """Start a report job and poll its status until the HTML is ready."""
+    response = requests.post(
+        f'{route}/reports/{kind}',
+        params={'window_size': size},
+        timeout=10,
+    )
+    response.raise_for_status()
+    job = response.json()
+    deadline = time.monotonic() + REPORT_TIMEOUT_S
+    with st.spinner('Generating report...'):
+        while job['status'] in ('pending', 'running'):
+            if time.monotonic() > deadline:
+                raise TimeoutError('Report generation timed out')
+            time.sleep(REPORT_POLL_INTERVAL_S)
+            response = requests.get(f"{route}/reports/jobs/{job['job_id']}", timeout=10)
+            response.raise_for_status()
+            job = response.json()
+
+    if job['status'] != 'done':
+        raise RuntimeError(f"Report generation failed: {job['error']}")
+    response = requests.get(f"{route}/reports/jobs/{job['job_id']}/html", timeout=10)
+    response.raise_for_status()
+    return response.content
+
+
 @st.cache_data
 def display_report(report: str) -> str:
     """Display report."""
@@ -166,26 +197,26 @@ if __name__ == '__main__':
         clicked_make_prediction: bool = st.sidebar.button(label='Make Prediction')
 
         report_selected: bool = False
-        request_url: str = base_route
+        report_type: str = ''
         report_name: str = ''
 
         if clicked_model_performance:
             report_selected = True
-            request_url += f'/monitor-model?window_size={window_size}'
+            report_type = 'model'
             report_name = 'Model performance'
 
         if clicked_target_drift:
             report_selected = True
-            request_url += f'/monitor-target?window_size={window_size}'
+            report_type = 'target'
             report_name = 'Target drift'
 
         if clicked_make_prediction:
             display_prediction_form()
 
         if report_selected:
-            resp: requests.Response = requests.get(request_url, timeout=10)
+            report_html = fetch_report(base_route, report_type, window_size)
             display_header(report_name, window_size)
-            display_report(resp.content)
+            display_report(report_html)
 
     except requests.RequestException as req_e:
         st.error(f"Request failed: {req_e}")